@@ -2,196 +2,389 @@
 API 라우터
 
 - 프론트(Streamlit)가 보내는 멀티파트(이미지 + 텍스트)를 받음
-- LLM/TTS/Video 순서대로 실행
+- LLM/TTS/Video 순서대로 실행 (services/pipeline.py)
 - 결과 URL 반환
+
+엔드포인트
+- POST /api/generate          : 동기 생성 (완료될 때까지 기다렸다가 결과 반환)
+- POST /api/jobs              : 비동기 생성 (입력만 저장하고 job id 즉시 반환)
+- GET  /api/jobs/{id}         : 단계/진행률 조회
+- GET  /api/jobs/{id}/result  : 결과(영상 URL + 카피) 조회
+- POST /api/jobs/{id}/recaption : 카피/톤만 바꿔 다시 만들기 (슬라이드쇼 재사용)
+- POST /api/jobs/{id}/cancel  : 대기/진행 중인 작업 취소 (FFmpeg 즉시 종료)
+- GET  /api/jobs/{id}/events  : 진행 상황 스트림 (Server-Sent Events, 렌더 중 FFmpeg 진행률 포함)
+
+렌더는 이벤트 루프가 아니라 워커 풀/threadpool에서 돈다 (/health가 안 막히게)
 """
 
 from __future__ import annotations
 
-import re
+import asyncio
+import shutil
+import time
 from pathlib import Path
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
 from backend.app.core.logger import get_logger
-from backend.app.core.config import settings
-from backend.app.schemas import GenerateResponse
-
-from backend.app.services.storage import make_job_dir, public_video_path
-from backend.app.services.llm import generate_copy
-from backend.app.services.tts import synthesize_voice_lines
-from backend.app.services.video import (
-    build_slideshow,
-    burn_text_overlays,
-    mix_audio,
-    get_audio_duration_sec,
+from backend.app.core.config import ASPECT_RATIOS, ENCODING_PROFILES, get_encoding_profile
+from backend.app.schemas import (
+    GenerateResponse,
+    JobStatusResponse,
+    JobSubmitResponse,
+    RecaptionRequest,
+    RenderQueueResponse,
+    RenderStatusResponse,
+)
+
+from backend.app.services import job_queue, jobs, scheduler, supervisor
+from backend.app.services.ingest import UploadTooLarge, save_uploads
+from backend.app.services.pipeline import (
+    MAX_VARIANTS,
+    GenerateRequest,
+    RecaptionBusy,
+    hls_url,
+    recaption,
+    render_final,
+    run_generate,
+    video_url,
+)
+from backend.app.services.plan import RenderPlan, plan_path
+from backend.app.services.storage import (
+    aspect_video_path,
+    find_job_dir,
+    make_job_dir,
+    preview_video_path,
+    public_video_path,
+    render_error_path,
 )
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/api", tags=["generator"])
 
+# SSE: 상태 확인 간격 / 변화가 없을 때 연결 유지용 주석 간격(초)
+_EVENTS_POLL_SEC = 0.5
+_EVENTS_KEEPALIVE_SEC = 15.0
 
-def _project_root() -> Path:
-    """
-    routes.py 위치: backend/app/api/routes.py
-    parents[0]=api, [1]=app, [2]=backend, [3]=PROJECT_ROOT
-    """
-    return Path(__file__).resolve().parents[3]
 
+def _generate_form(
+    menu_name: str = Form(..., description="메뉴 이름"),
+
+    store_name: str = Form("", description="가게 이름(선택)"),
+    tone: str = Form("감성", description="광고 톤(힙/감성/고급/가성비)"),
 
-def _normalize_for_tts(s: str) -> str:
+    # 추가 입력(선택)
+    price: str = Form("", description="가격(선택)"),
+    location: str = Form("", description="위치(선택)"),
+    benefit: str = Form("", description="혜택(선택)"),
+    cta: str = Form("", description="콜투액션(선택)"),
+
+    # 렌더 옵션(선택)
+    motion: str = Form("", description="컷 모션 백엔드(zoompan/opencv, 비우면 서버 기본값)"),
+    profile: str = Form("", description="인코딩 프로필(draft/standard/archival, 비우면 서버 기본값)"),
+    preview: bool = Form(False, description="저해상도 미리보기를 먼저 받고 최종본은 백그라운드 렌더"),
+    variants: str = Form("", description="톤 A/B 테스트: 쉼표로 구분한 톤 목록(예: 힙,감성,고급). 1회 렌더로 톤별 영상"),
+    aspects: str = Form("", description="추가 화면비: 쉼표로 구분(1:1,4:5,16:9). 1회 렌더로 화면비별 영상"),
+) -> GenerateRequest:
     """
-    TTS가 또박또박 읽게끔 최소 보정
-    - 너무 공격적으로 정리하면 감성(…/이모지)이 죽으니 최소만
+    /api/generate, /api/jobs 공통 폼 파싱 + 입력 검증
     """
-    s = (s or "").strip()
-    s = re.sub(r"\s+", " ", s)
-    s = s.replace("…", ".")
-    s = s.replace("·", " ")
-    return s.strip()
+    if not (menu_name or "").strip():
+        raise HTTPException(400, "메뉴 이름은 필수입니다.")
+
+    profile = (profile or "").strip().lower()
+    if profile and profile not in ENCODING_PROFILES:
+        raise HTTPException(400, f"알 수 없는 인코딩 프로필입니다: {profile} ({'/'.join(ENCODING_PROFILES)})")
+
+    tones = [t.strip() for t in (variants or "").split(",") if t.strip()]
+    if len(tones) > MAX_VARIANTS:
+        raise HTTPException(400, f"톤 변형은 최대 {MAX_VARIANTS}개까지 가능합니다.")
+
+    ratios = [a.strip() for a in (aspects or "").split(",") if a.strip()]
+    unknown = [a for a in ratios if a not in ASPECT_RATIOS]
+    if unknown:
+        raise HTTPException(400, f"알 수 없는 화면비입니다: {', '.join(unknown)} ({'/'.join(ASPECT_RATIOS)})")
+    if ratios and tones:
+        raise HTTPException(400, "톤 변형(variants)과 화면비(aspects)는 동시에 요청할 수 없습니다.")
+
+    return GenerateRequest(
+        menu_name=menu_name.strip(),
+        store_name=(store_name or "").strip() or None,
+        tone=(tone or "감성").strip(),
+        price=(price or "").strip() or None,
+        location=(location or "").strip() or None,
+        benefit=(benefit or "").strip() or None,
+        cta=(cta or "").strip() or None,
+        motion=(motion or "").strip() or None,
+        profile=get_encoding_profile(profile).name,
+        # 톤 변형은 한 번에 렌더하므로 미리보기 단계 없음
+        preview=bool(preview) and not tones,
+        variants=tones or None,
+        aspects=ratios or None,
+    )
 
 
-def _safe_segments() -> int:
+async def _save_uploads(images: list[UploadFile], job_dir: Path) -> list[Path]:
+    # 이미지 저장: 청크 스트리밍 + 용량 제한 (초과 시 413)
+    # 어떤 이유로든 저장이 실패하면 방금 만든 job 폴더도 같이 정리 (빈 job이 남지 않게)
+    try:
+        return await save_uploads(images, job_dir / "inputs")
+    except UploadTooLarge as e:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise HTTPException(413, str(e))
+    except BaseException:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+
+
+def _require_job_dir(job_id: str) -> Path:
+    job_dir = find_job_dir(job_id)
+    if job_dir is None:
+        raise HTTPException(404, "작업을 찾을 수 없습니다.")
+    return job_dir
+
+
+async def _watch_disconnect(request: Request, scope_name: str) -> None:
+    # 클라이언트가 끊기면 그 요청이 띄운 FFmpeg/say를 kill
+    while True:
+        await asyncio.sleep(1.0)
+        if await request.is_disconnected():
+            logger.info("클라이언트 연결 끊김 → 렌더 취소(%s)", scope_name)
+            supervisor.cancel(scope_name)
+            return
+
+
+async def _run_cancellable(request: Request, scope_name: str, fn, *args, **kwargs):
     """
-    settings.VIDEO_SEGMENTS가 없거나 이상한 값이면 6으로 안전하게 보정
+    동기 요청의 렌더를 threadpool에서 취소 범위(scope_name) 안에서 실행
+
+    - 요청이 끝나기 전에 클라이언트가 끊기면 범위를 취소 -> 남은 FFmpeg는 즉시 종료
     """
+    watcher = asyncio.create_task(_watch_disconnect(request, scope_name))
     try:
-        v = int(getattr(settings, "VIDEO_SEGMENTS", 6))
-    except Exception:
-        v = 6
-    return max(1, min(12, v))  # 너무 많으면 오히려 산만해져서 상한 12
+        return await run_in_threadpool(supervisor.run_in_scope, scope_name, fn, *args, **kwargs)
+    except supervisor.ProcessCancelled:
+        raise HTTPException(499, "요청이 취소되었습니다.")
+    finally:
+        watcher.cancel()
 
 
 @router.post("/generate", response_model=GenerateResponse)
 async def generate(
+    request: Request,
     images: list[UploadFile] = File(..., description="음식 사진들 (2~6장 권장)"),
-    menu_name: str = Form(..., description="메뉴 이름"),
+    req: GenerateRequest = Depends(_generate_form),
+):
+    """
+    동기 생성 (기존 API 호환)
+    - 렌더 자체는 threadpool에서 -> 이벤트 루프는 안 막힘
+    - preview=true면 미리보기까지만 기다리고, 최종본은 워커 풀에 예약
+    - 클라이언트가 끊기면 렌더도 중단
+    """
+    if len(images) < 1:
+        raise HTTPException(400, "이미지를 1장 이상 업로드해주세요.")
 
-    store_name: str = Form("", description="가게 이름(선택)"),
-    tone: str = Form("감성", description="광고 톤(힙/감성/고급/가성비)"),
+    job_dir = make_job_dir()
+    img_paths = await _save_uploads(images, job_dir)
+
+    result = await _run_cancellable(
+        request, job_dir.name, run_generate, job_dir, img_paths, req, include_final=not req.preview
+    )
+
+    if req.preview:
+        jobs.submit(job_dir.name, render_final, job_dir)
+
+    return GenerateResponse(**result)
 
-    # 추가 입력(선택)
-    price: str = Form("", description="가격(선택)"),
-    location: str = Form("", description="위치(선택)"),
-    benefit: str = Form("", description="혜택(선택)"),
-    cta: str = Form("", description="콜투액션(선택)"),
-):
-   
 
-    # 0) 입력 검증
+@router.get("/generate/{job_id}/status", response_model=RenderStatusResponse)
+def render_status(job_id: str):
+    """
+    미리보기 모드에서 최종본이 준비됐는지 조회
+    - final.mp4는 완성 후 rename으로 생기므로 "파일이 있으면 완료"
+    """
+    job_dir = _require_job_dir(job_id)
+
+    final_path = public_video_path(job_dir)
+    preview_path = preview_video_path(job_dir)
+    err_path = render_error_path(job_dir)
+
+    # 추가 화면비는 최종본과 같은 렌더에서 나오므로 파일이 있는 것만
+    aspects = []
+    try:
+        requested = RenderPlan.load(plan_path(job_dir)).extra.get("aspects", [])
+    except (OSError, ValueError):
+        requested = []
+    for a in requested:
+        p = aspect_video_path(job_dir, a)
+        if p.exists():
+            aspects.append({"aspect": a, "video_url": video_url(p)})
+
+    return RenderStatusResponse(
+        job_id=job_id,
+        ready=final_path.exists(),
+        video_url=video_url(final_path),
+        preview_url=video_url(preview_path) if preview_path.exists() else None,
+        error=err_path.read_text(encoding="utf-8") if err_path.exists() else None,
+        aspects=aspects,
+        hls_url=hls_url(job_dir),
+    )
+
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(
+    images: list[UploadFile] = File(..., description="음식 사진들 (2~6장 권장)"),
+    req: GenerateRequest = Depends(_generate_form),
+):
+    """
+    비동기 생성: 검증 + 입력 저장 후 job id 즉시 반환, 렌더는 워커 풀에서
+    """
     if len(images) < 1:
         raise HTTPException(400, "이미지를 1장 이상 업로드해주세요.")
-    if not (menu_name or "").strip():
-        raise HTTPException(400, "메뉴 이름은 필수입니다.")
 
-    menu_name = menu_name.strip()
-    store_name = (store_name or "").strip() or None
-    tone = (tone or "감성").strip()
+    job_dir = make_job_dir()
+    img_paths = await _save_uploads(images, job_dir)
+
+    job_id = job_dir.name
+    if job_queue.enabled():
+        # SQLite 쓰기(BEGIN IMMEDIATE)는 락을 기다릴 수 있으므로 이벤트 루프 밖에서
+        await run_in_threadpool(job_queue.enqueue_generate, job_dir, img_paths, req)
+    else:
+        jobs.submit(job_id, run_generate, job_dir, img_paths, req)
 
-    price = (price or "").strip() or None
-    location = (location or "").strip() or None
-    benefit = (benefit or "").strip() or None
-    cta = (cta or "").strip() or None
+    return JobSubmitResponse(
+        job_id=job_id,
+        status_url=f"/api/jobs/{job_id}",
+        result_url=f"/api/jobs/{job_id}/result",
+        events_url=f"/api/jobs/{job_id}/events",
+    )
 
 
-    # 1) 작업 디렉토리 생성
-    job_dir = make_job_dir()
-    inputs_dir = job_dir / "inputs"
-    artifacts_dir = job_dir / "artifacts"
-
-    
-    # 2) 이미지 저장
-    img_paths: list[Path] = []
-    for i, uf in enumerate(images, start=1):
-        suffix = Path(uf.filename).suffix.lower() or ".jpg"
-        save_path = inputs_dir / f"img_{i}{suffix}"
-        save_path.write_bytes(await uf.read())
-        img_paths.append(save_path)
-
-
-    # 3) 쇼츠 템포용 컷 수 확정
-    target_cuts = _safe_segments()
-
-    # 이미지가 적으면 반복해서 컷 수 맞춤 (템포 유지)
-    image_paths_for_video = [img_paths[i % len(img_paths)] for i in range(target_cuts)]
-
- 
-    # 4) LLM 카피 생성 (컷 수 = 캡션 줄 수)
-    llm_out = generate_copy(
-        menu_name=menu_name,
-        store_name=store_name,
-        tone=tone,
-        n_lines=target_cuts,
-        price=price,
-        location=location,
-        benefit=benefit,
-        cta=cta,
+def _job_status(job: jobs.Job) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job.job_id,
+        status=job.status,
+        stage=job.stage,
+        progress=round(job.progress, 3),
+        error=job.error,
+        preview_url=job.result.get("preview_url"),
+        detail=job.detail,
     )
 
-    caption_lines = (llm_out.caption_lines or [])[:target_cuts]
-    if len(caption_lines) < target_cuts:
-        caption_lines += [""] * (target_cuts - len(caption_lines))
 
-    # 빈 줄 제거 (자막/내레이션 둘 다 깔끔)
-    caption_lines_clean = [_normalize_for_tts(s) for s in caption_lines if s and s.strip()]
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def job_status(job_id: str):
+    job = jobs.lookup(job_id)
+    if job is None:
+        raise HTTPException(404, "작업을 찾을 수 없습니다.")
 
+    return _job_status(job)
 
-    # 완전 빈 경우 대비
-    if not caption_lines_clean:
-        fallback = _normalize_for_tts(llm_out.promo_text) if getattr(llm_out, "promo_text", "") else ""
-        caption_lines_clean = [fallback] if fallback else ["지금 바로 방문해보세요!"]
 
-   # 프론트에 보여줄 전체 카피 텍스트(복사/공유용)
-    tts_text = "\n".join(caption_lines_clean)
+@router.get("/jobs/{job_id}/events")
+async def job_events(request: Request, job_id: str):
+    """
+    진행 상황 스트림 (text/event-stream)
 
+    - 상태가 바뀔 때마다 `data: <JobStatusResponse JSON>` 한 건
+    - 변화가 없으면 주기적으로 주석(: keepalive)만 보내서 프록시가 연결을 안 끊게
+    - done/failed/cancelled가 되면 마지막 상태를 보내고 종료
+    """
+    if await run_in_threadpool(jobs.lookup, job_id) is None:
+        raise HTTPException(404, "작업을 찾을 수 없습니다.")
+
+    async def _stream():
+        last_update = None
+        last_sent = time.monotonic()
+        while not await request.is_disconnected():
+            # SQLite 큐 조회는 블로킹이므로 threadpool에서
+            job = await run_in_threadpool(jobs.lookup, job_id)
+            if job is None:
+                return
+            if job.updated_at != last_update:
+                last_update = job.updated_at
+                last_sent = time.monotonic()
+                yield f"data: {_job_status(job).model_dump_json()}\n\n"
+                if job.status in (jobs.DONE, jobs.FAILED, jobs.CANCELLED):
+                    return
+            elif time.monotonic() - last_sent > _EVENTS_KEEPALIVE_SEC:
+                last_sent = time.monotonic()
+                yield ": keepalive\n\n"
+            await asyncio.sleep(_EVENTS_POLL_SEC)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        # nginx 등 리버스 프록시가 버퍼링하면 이벤트가 몰려서 도착함
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    # 5) TTS (줄별 생성 → 싱크 정확)
-    voice_path = None
-    timings = None
 
+@router.get("/jobs/{job_id}/result", response_model=GenerateResponse)
+def job_result(job_id: str):
+    job = jobs.lookup(job_id)
+    if job is None:
+        raise HTTPException(404, "작업을 찾을 수 없습니다.")
+    if job.status == jobs.FAILED:
+        raise HTTPException(500, f"작업 실패: {job.error}")
+    if job.status != jobs.DONE:
+        raise HTTPException(409, f"아직 완료되지 않았습니다. (stage={job.stage})")
 
-   
-    # 6) 슬라이드쇼(무음) 생성: 항상 18초
-    silent_video = build_slideshow(image_paths_for_video, artifacts_dir / "silent.mp4")
+    return GenerateResponse(**job.result)
 
 
+@router.post("/jobs/{job_id}/cancel", response_model=JobStatusResponse)
+def cancel_job(job_id: str):
+    """
+    작업 취소
+    - 대기 중이면 시작하지 않고, 진행 중이면 FFmpeg/say를 즉시 종료
+    - 이미 끝난 작업은 상태만 그대로 돌려줌
+    """
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(404, "작업을 찾을 수 없습니다.")
 
-    # 8) drawtext로 자막 burn-in
-    sub_video = burn_text_overlays(
-        in_video=silent_video,
-        image_paths=image_paths_for_video,
-        lines=caption_lines_clean,
-        out_video=artifacts_dir / "subtitled.mp4",
-        timings=timings,  # video.py와 맞춤
-    )
+    return _job_status(job)
 
-    # 9) BGM 선택: 실행 위치 상관없이 프로젝트 루트 기준
-    bgm_dir = _project_root() / "assets" / "bgm"
-    bgm_candidates = list(bgm_dir.glob("*.mp3")) + list(bgm_dir.glob("*.wav"))
-    bgm_path = bgm_candidates[0] if bgm_candidates else None
 
+@router.post("/jobs/{job_id}/recaption", response_model=GenerateResponse)
+async def recaption_job(request: Request, job_id: str, body: RecaptionRequest):
+    """
+    카피/톤만 바꿔서 최종본 다시 만들기
+    - 저장된 무음 슬라이드쇼(artifacts/silent.mp4)에 자막 + 오디오만 다시 입힘
+    - 같은 job이 아직 렌더 중이거나 다른 재자막이 진행 중이면 409
+    """
+    job_dir = _require_job_dir(job_id)
+    if not plan_path(job_dir).exists():
+        raise HTTPException(409, "아직 렌더 계획이 준비되지 않았습니다.")
 
-    logger.info(
-    "AUDIO DEBUG | voice_path=%s exists=%s | bgm_path=%s exists=%s",
-    str(voice_path) if voice_path else None,
-    bool(voice_path and Path(voice_path).exists()),
-    str(bgm_path) if bgm_path else None,
-    bool(bgm_path and Path(bgm_path).exists()),
-    )
+    job = await run_in_threadpool(jobs.lookup, job_id)
+    if job is not None and job.status in (jobs.QUEUED, jobs.RUNNING):
+        raise HTTPException(409, f"작업이 아직 진행 중입니다. (stage={job.stage})")
 
- 
-    # 10) 오디오 믹스해서 최종 mp4
-    final_path = mix_audio(sub_video, None, bgm_path, public_video_path(job_dir))
+    if not body.lines and not (body.tone or "").strip():
+        raise HTTPException(400, "lines 또는 tone 중 하나는 필요합니다.")
 
+    try:
+        result = await _run_cancellable(
+            request, job_id, recaption, job_dir, lines=body.lines, tone=(body.tone or "").strip() or None
+        )
+    except RecaptionBusy:
+        raise HTTPException(409, "이 작업은 이미 재자막 중입니다.")
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
+    return GenerateResponse(**result)
 
-    # 11) 결과 반환
-    job_id = job_dir.name
-    video_url = f"/outputs/{job_id}/artifacts/final.mp4"
 
-    return GenerateResponse(
-        job_id=job_id,
-        video_url=video_url,
-        caption_text=tts_text,
-        hashtags=llm_out.hashtags,
-    )
+@router.get("/render-queue", response_model=RenderQueueResponse)
+def render_queue():
+    """
+    렌더 스케줄러 상태 (동시 렌더 상한/실행 중/대기 중, 작업당 스레드)
+    - JOB_QUEUE=sqlite 면 영속 큐의 대기 작업 수도 같이
+    """
+    snap = scheduler.get_scheduler().snapshot()
+    queued = job_queue.get_queue().depth()[jobs.QUEUED] if job_queue.enabled() else None
+    return RenderQueueResponse(**snap, queued_jobs=queued)
@@ -8,6 +8,7 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass, replace
 from typing import Optional
 
 from pydantic import Field
@@ -29,11 +30,90 @@ class Settings(BaseSettings):
     # 6이면 1컷당 2.5초라서 쇼츠 느낌이 꽤 살아납니다.
     VIDEO_SEGMENTS: int = 10
 
+    # 기본 인코딩 프로필 (preview | draft | standard | archival), 요청별로 덮어쓸 수 있음
+    ENCODING_PROFILE: str = "standard"
+    # 미리보기(preview=true) 렌더에 쓸 프로필
+    PREVIEW_PROFILE: str = "preview"
+
+    # 렌더 방식
+    # - fused : 슬라이드쇼+자막+오디오를 FFmpeg 1회 인코딩 (기본, 빠르고 화질 손실 적음)
+    # - segmented: 컷별 병렬 렌더 + stream-copy concat 후 자막/오디오 1회 인코딩
+    # - legacy: silent.mp4 -> subtitled.mp4 -> final.mp4 3단계 (fused 실패 시 fallback)
+    RENDER_MODE: str = "fused"
+    # segmented 모드에서 작업 1개가 동시에 띄우는 FFmpeg 수 (0이면 작업당 스레드 몫만큼)
+    RENDER_WORKERS: int = 0
+    # 프로세스당 동시 렌더 작업 수 (0이면 코어 4개당 1개). 넘치는 작업은 대기열에서 순서대로
+    RENDER_CONCURRENCY: int = 0
+    # 렌더 작업 1개의 FFmpeg 스레드 수 (0이면 코어 수 / RENDER_CONCURRENCY)
+    FFMPEG_THREADS: int = 0
+    # 컷 모션 백엔드 (요청별로 덮어쓸 수 있음)
+    # - zoompan: FFmpeg zoompan 필터
+    # - opencv : crop 좌표를 미리 계산 + warpAffine 서브픽셀 렌더 (빠르고 떨림 없음, segmented 경로)
+    MOTION_BACKEND: str = "zoompan"
+
+    # --- Upload / Ingest ---
+    UPLOAD_MAX_FILE_MB: int = 25      # 사진 1장 최대 용량
+    UPLOAD_MAX_TOTAL_MB: int = 200    # 요청 1건 전체 최대 용량
+    # 업로드 직후 렌더에 필요한 해상도(출력 x 최대줌 1.2)로 줄여두기
+    INGEST_DOWNSCALE: bool = True
+    # 사진 분석(흐림/노출/중복 검사) 후 약한 컷/중복 컷 정리
+    IMAGE_ANALYSIS: bool = True
+    ANALYSIS_MIN_SHARPNESS: float = 60.0   # Laplacian 분산 이 값 미만이면 흐린 사진
+    ANALYSIS_DUP_MAX_DISTANCE: int = 6     # dHash 해밍거리 이하면 같은 사진으로 봄 (64bit 중)
+
+    # 렌더 job 워커 수 (이벤트 루프와 분리된 스레드 풀)
+    JOB_WORKERS: int = 2
+    # 메모리 레지스트리에 끝난 job(완료/실패/취소)을 남겨두는 시간(초)과 최대 개수
+    # 지나면 정리하고, 조회는 job 폴더의 결과 파일(plan.json/final.mp4)로 재구성
+    JOB_RETENTION_SEC: int = 3600
+    JOB_REGISTRY_MAX: int = 1000
+
+    # /api/jobs 작업 저장소: "memory"(API 프로세스 스레드 풀) / "sqlite"(영속 큐 + 별도 워커 프로세스)
+    JOB_QUEUE: str = "memory"
+    # SQLite 큐 파일 경로 (비우면 OUTPUT_DIR/jobs.sqlite3)
+    JOB_QUEUE_PATH: str = ""
+    # 워커 lease 길이(초). heartbeat가 이 시간 안에 안 오면 다른 워커가 가져감
+    JOB_LEASE_SEC: int = 60
+    # 작업당 최대 시도 횟수 (실패/워커 중단 포함)
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # 외부 프로세스(FFmpeg/ffprobe/say) 제한 시간(초). 0이면 제한 없음
+    FFMPEG_TIMEOUT_SEC: int = 900           # 전체 인코딩 1회
+    FFMPEG_SEGMENT_TIMEOUT_SEC: int = 180   # 컷 1개 렌더
+    FFPROBE_TIMEOUT_SEC: int = 30
+    # 실패 메시지에 남길 stderr 마지막 줄 수 (전체를 메모리에 쌓지 않음)
+    PROCESS_STDERR_LINES: int = 200
+    # 렌더 프로세스 nice 값(0~19, 0이면 그대로)과 CPU 고정("0-3,6", 비우면 그대로)
+    PROCESS_NICE: int = 0
+    PROCESS_CPU_AFFINITY: str = ""
+    # FFmpeg -progress로 렌더 진행률(frame/fps/배속)을 job 상태/SSE에 보고
+    FFMPEG_PROGRESS: bool = True
+
+    # --- Cache ---
+    # 렌더 결과/분석 결과 재사용용 캐시 루트 폴더
+    CACHE_DIR: str = ".cache"
+    # 렌더된 컷(세그먼트) 캐시 최대 용량(MB). 0이면 캐시 끔
+    SEGMENT_CACHE_MAX_MB: int = 2048
+    # 래스터라이즈된 자막 PNG 캐시 최대 용량(MB)
+    CAPTION_CACHE_MAX_MB: int = 256
+    # 자막 위치 분석 결과(json) 캐시 최대 용량(MB)
+    PLACEMENT_CACHE_MAX_MB: int = 64
+    # 후처리된 줄 음성(TTS) 캐시 최대 용량(MB)
+    TTS_CACHE_MAX_MB: int = 256
+
         # --- Caption (자막 UI) ---
     CAPTION_FONT_SIZE: int = 104      # 자막 글자 크기 (92~118 추천)
     CAPTION_BORDER_W: int = 12        # 글자 테두리 두께
     CAPTION_BOX_ALPHA: float = 0.35   # 자막 배경 박스 투명도(0~1)
     CAPTION_BOX_BORDER: int = 18      # 박스 여백(패딩 느낌)
+    # 자막 렌더러
+    # - overlay : 줄마다 Pillow로 투명 PNG 1장 -> overlay (인코딩 중 텍스트 셰이핑 없음)
+    # - drawtext: 줄마다 drawtext 필터 (PNG 생성 실패 시 fallback)
+    CAPTION_RENDERER: str = "overlay"
+    # 자막 위치 선정
+    # - sat  : 엣지 맵 적분 영상으로 실제 자막 박스 크기의 후보를 y 전 구간에서 평가
+    # - bands: 위/중/아래 3개 밴드 중 덜 복잡한 곳
+    CAPTION_PLACEMENT: str = "sat"
 
 
 
@@ -48,5 +128,90 @@ class Settings(BaseSettings):
     # 말하기 속도(1.0=기본). 예전 .env에서 tts_speed 로 쓰던 값도 받아줌
     TTS_SPEED: float = Field(default=1.0, validation_alias="tts_speed")
 
+    # 내레이션(TTS) 생성 여부 (false면 무음 내레이션 + BGM만)
+    TTS_ENABLED: bool = False
+
+    # 줄별 TTS 동시 합성 수 (= TTS 제공자 동시 호출 상한, 1이면 순차)
+    TTS_MAX_CONCURRENCY: int = 4
+    # 줄 1개(TTS+후처리) 제한 시간(초). 넘으면 그 줄은 스킵
+    TTS_LINE_TIMEOUT_SEC: int = 60
+
+    # HLS(fMP4/CMAF) 사다리를 최종 렌더와 같은 FFmpeg 실행에서 같이 만들지
+    HLS_ENABLED: bool = False
+    # 화질 단계 (짧은 변 기준 px, 출력보다 큰 단계는 건너뜀)
+    HLS_LADDER: str = "1080,720,480"
+    # 세그먼트 길이(초). GOP도 여기에 맞춰 고정
+    HLS_SEGMENT_SEC: int = 2
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    """
+    x264 인코딩 프로필 (모든 FFmpeg 인코딩 단계가 같은 값을 씀)
+
+    - size가 None이면 settings.VIDEO_SIZE를 따른다
+    - threads=0이면 렌더 스케줄러가 나눠준 몫 (scheduler.py)
+    - fit: 사진을 캔버스에 맞추는 방식 ("pad"=전체 보이게 여백, "crop"=꽉 채우고 잘라냄)
+    """
+    name: str
+    preset: str
+    crf: int
+    tune: Optional[str] = None
+    threads: int = 0
+    gop: int = 60
+    size: Optional[str] = None
+    fit: str = "pad"
+
+
+# 고객 등급별로 품질 <-> 처리량을 코드 수정 없이 고르기 위한 프리셋
+ENCODING_PROFILES = {
+    # 미리보기: 몇 초 안에 보여주기 위한 360p 저비트레이트
+    "preview": EncodingProfile("preview", preset="ultrafast", crf=34, tune="fastdecode", gop=30, size="360x640"),
+    # 빠른 확인용: 해상도/화질 낮추고 최대한 빨리
+    "draft": EncodingProfile("draft", preset="ultrafast", crf=30, tune="fastdecode", gop=30, size="540x960"),
+    # 기본 서비스 품질
+    "standard": EncodingProfile("standard", preset="veryfast", crf=23, gop=60),
+    # 보관/재편집용 고화질
+    "archival": EncodingProfile("archival", preset="slow", crf=18, tune="film", gop=60),
+}
+
+
+def get_encoding_profile(name: Optional[str] = None) -> EncodingProfile:
+    # 이름이 비었거나 모르는 값이면 settings.ENCODING_PROFILE -> standard 순으로
+    key = (name or "").strip().lower() or (settings.ENCODING_PROFILE or "").strip().lower()
+    return ENCODING_PROFILES.get(key) or ENCODING_PROFILES["standard"]
+
+
+# 멀티 화면비 출력 (피드별 규격). 9:16이 기본(VIDEO_SIZE)
+ASPECT_RATIOS = {
+    "9:16": (9, 16),
+    "1:1": (1, 1),
+    "4:5": (4, 5),
+    "16:9": (16, 9),
+}
+
+
+def _even(v: float) -> int:
+    # x264(yuv420p)는 가로/세로가 짝수여야 함
+    return max(2, int(round(v / 2.0)) * 2)
+
+
+def aspect_profile(profile: EncodingProfile, aspect: str) -> EncodingProfile:
+    """
+    프로필을 화면비 aspect("1:1" 등)용으로 변환
+
+    - 기준 해상도(프로필 size 또는 VIDEO_SIZE)의 짧은 변을 유지하고 긴 변만 비율대로
+      (1080x1920 기준: 1:1=1080x1080, 4:5=1080x1350, 16:9=1920x1080)
+    - 기준과 같은 화면비면 기존 그대로(pad), 다른 화면비는 여백 대신 꽉 채워 자름(crop)
+    """
+    a, b = ASPECT_RATIOS[aspect]
+    w, h = (int(v) for v in (profile.size or settings.VIDEO_SIZE).split("x"))
+    if w * b == h * a:
+        return profile
+
+    short = min(w, h)
+    size = (short, _even(short * b / a)) if a <= b else (_even(short * a / b), short)
+    return replace(profile, size=f"{size[0]}x{size[1]}", fit="crop")
+
 
 settings = Settings()
@@ -1,7 +1,8 @@
 """
 FastAPI 엔트리포인트
 
-- /api/generate : 영상 생성
+- /api/generate : 영상 생성 (동기)
+- /api/jobs     : 영상 생성 (비동기 job 제출/상태/결과)
 - /outputs/...  : 결과 mp4 정적 서빙
 
 왜 정적 서빙?
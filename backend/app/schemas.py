@@ -1,7 +1,70 @@
+from typing import Any, Dict, Optional
+
 from pydantic import BaseModel, Field
 
+class VariantResult(BaseModel):
+    tone: str = Field(..., description="이 변형의 광고 톤")
+    video_url: str = Field(..., description="이 변형의 mp4 URL")
+    caption_text: str = Field(..., description="이 변형의 자막/카피")
+    hashtags: list[str] = Field(default_factory=list, description="이 변형의 해시태그")
+
+
+class AspectResult(BaseModel):
+    aspect: str = Field(..., description="화면비 (1:1/4:5/16:9)")
+    video_url: str = Field(..., description="이 화면비의 mp4 URL")
+
+
 class GenerateResponse(BaseModel):
     job_id: str = Field(..., description="생성 작업 ID")
     video_url: str = Field(..., description="결과 mp4 다운로드/스트리밍 URL")
     caption_text: str = Field(..., description="생성된 상세/홍보 문구")
     hashtags: list[str] = Field(default_factory=list, description="추천 해시태그 리스트")
+    preview_url: Optional[str] = Field(None, description="미리보기 mp4 URL (preview 모드일 때)")
+    final_ready: bool = Field(True, description="video_url의 최종본이 이미 준비됐는지")
+    variants: list[VariantResult] = Field(default_factory=list, description="톤 변형 결과 (variants 요청 시, 0번 = video_url)")
+    aspects: list[AspectResult] = Field(default_factory=list, description="추가 화면비 결과 (aspects 요청 시)")
+    hls_url: Optional[str] = Field(None, description="HLS master.m3u8 URL (HLS_ENABLED일 때)")
+
+
+class RenderStatusResponse(BaseModel):
+    job_id: str = Field(..., description="생성 작업 ID")
+    ready: bool = Field(..., description="최종본 렌더 완료 여부")
+    video_url: str = Field(..., description="최종 mp4 URL (ready일 때 유효)")
+    preview_url: Optional[str] = Field(None, description="미리보기 mp4 URL")
+    error: Optional[str] = Field(None, description="백그라운드 렌더 실패 시 에러 메시지")
+    aspects: list[AspectResult] = Field(default_factory=list, description="준비된 추가 화면비 결과")
+    hls_url: Optional[str] = Field(None, description="준비된 HLS master.m3u8 URL")
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str = Field(..., description="생성 작업 ID")
+    status_url: str = Field(..., description="진행 상황 조회 URL")
+    result_url: str = Field(..., description="결과 조회 URL")
+    events_url: str = Field(..., description="진행 상황 스트림(SSE) URL")
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str = Field(..., description="생성 작업 ID")
+    status: str = Field(..., description="queued/running/done/failed/cancelled")
+    stage: str = Field(..., description="현재 단계(copy/preview/render/...)")
+    progress: float = Field(0.0, description="진행률 0~1")
+    error: Optional[str] = Field(None, description="실패 시 에러 메시지")
+    preview_url: Optional[str] = Field(None, description="미리보기가 준비됐으면 URL")
+    detail: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="렌더 중 FFmpeg 진행 상세(stage/fraction/frame/fps/speed/out_time_sec)",
+    )
+
+
+class RenderQueueResponse(BaseModel):
+    capacity: int = Field(..., description="동시 렌더 작업 수 상한 (이 프로세스)")
+    running: int = Field(..., description="지금 렌더 중인 작업 수")
+    waiting: int = Field(..., description="렌더 자리를 기다리는 작업 수")
+    cores: int = Field(..., description="사용 가능한 CPU 코어 수")
+    threads_per_job: int = Field(..., description="렌더 작업 1개의 FFmpeg 스레드 수")
+    queued_jobs: Optional[int] = Field(None, description="SQLite 작업 큐 대기 수 (JOB_QUEUE=sqlite일 때)")
+
+
+class RecaptionRequest(BaseModel):
+    lines: Optional[list[str]] = Field(None, description="새 자막 문구(줄 단위). 비우면 tone으로 카피 재생성")
+    tone: Optional[str] = Field(None, description="카피를 다시 만들 톤(힙/감성/고급/가성비)")
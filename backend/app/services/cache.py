@@ -0,0 +1,236 @@
+"""
+디스크 캐시 (content-addressed + 용량 제한 LRU)
+
+왜 필요?
+- 같은 가게가 같은 사진으로 톤/CTA만 바꿔서 여러 번 만드는 경우가 대부분
+- 사진 내용 + 렌더 파라미터가 같으면 결과물도 같으므로, 파일째로 재사용하면 됨
+
+구조
+- key = 파라미터들을 이어붙인 문자열의 sha1 (사진은 "경로"가 아니라 "내용 해시"로 넣는다)
+- 값 = 캐시 폴더 안의 파일 1개 (key.확장자)
+- LRU: 조회/저장 시 mtime을 갱신하고, 용량 초과 시 mtime이 오래된 것부터 삭제
+- 용량은 저장할 때마다 폴더를 훑지 않고 누적 합계로 추적 -> 넘었을 때만 전체 스캔 + 삭제
+  (다른 프로세스도 같은 폴더에 쓰므로 RESCAN_EVERY번 저장마다 한 번은 실제 크기로 다시 맞춤)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from backend.app.core.config import settings
+from backend.app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 이 횟수만큼 저장하면 누적 합계를 실제 폴더 크기로 다시 맞춤
+RESCAN_EVERY = 256
+# 용량을 넘으면 이 비율까지 지움 (한계에 딱 맞춰 지우면 다음 저장마다 또 스캔하게 됨)
+EVICT_LOW_WATER = 0.9
+
+
+# (경로, mtime, 크기) -> 내용 해시 : 같은 파일을 여러 단계에서 다시 읽지 않게
+_hash_memo: "OrderedDict[tuple, str]" = OrderedDict()
+_hash_memo_lock = threading.Lock()
+_HASH_MEMO_MAX = 1024
+
+
+def content_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    # 파일 내용 sha1 (파일명/업로드 순서가 달라도 같은 사진이면 같은 값)
+    st = os.stat(path)
+    memo_key = (str(Path(path).resolve()), st.st_mtime_ns, st.st_size)
+    with _hash_memo_lock:
+        hit = _hash_memo.get(memo_key)
+        if hit is not None:
+            _hash_memo.move_to_end(memo_key)
+            return hit
+
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _hash_memo_lock:
+        _hash_memo[memo_key] = digest
+        while len(_hash_memo) > _HASH_MEMO_MAX:
+            _hash_memo.popitem(last=False)
+    return digest
+
+
+def make_key(*parts: object) -> str:
+    # 캐시 키: 파라미터를 순서대로 이어붙여 해시
+    raw = "|".join(str(p) for p in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def cache_root() -> Path:
+    return Path(getattr(settings, "CACHE_DIR", ".cache"))
+
+
+@dataclass
+class CacheStats:
+    # 작업(job) 단위로 로그에 찍을 통계
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return (self.hits / total) if total else 0.0
+
+
+class DiskCache:
+    """
+    폴더 1개 = 캐시 1종류 (segments / captions / tts ...)
+
+    - max_bytes <= 0 이면 캐시 비활성 (get은 항상 miss, put은 no-op)
+    - 여러 스레드에서 동시에 써도 되도록 저장은 tmp 파일 -> os.replace(원자적)
+    """
+
+    def __init__(self, root: Path, max_bytes: int, suffix: str = ""):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None   # 추적 중인 폴더 크기 (None = 아직 스캔 전)
+        self._puts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def path_for(self, key: str) -> Path:
+        # 한 폴더에 파일이 너무 많아지지 않게 앞 2글자로 샤딩
+        return self.root / key[:2] / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[Path]:
+        if not self.enabled:
+            return None
+        p = self.path_for(key)
+        try:
+            os.utime(p)  # LRU: 최근 사용 표시
+        except OSError:
+            return None
+        return p
+
+    def _store(self, key: str, write) -> Optional[Path]:
+        # tmp에 쓰고 os.replace로 교체 (읽는 쪽은 항상 완성된 파일만 봄)
+        if not self.enabled:
+            return None
+        dst = self.path_for(key)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            write(tmp)
+            size = tmp.stat().st_size
+            try:
+                replaced = dst.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp, dst)
+        except OSError as e:
+            logger.warning("캐시 저장 실패(%s): %s", dst, e)
+            try:
+                tmp.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return None
+        self._added(size - replaced)
+        return dst
+
+    def _added(self, delta: int) -> None:
+        # 누적 합계만 갱신하고, 넘었거나 다시 맞출 때가 됐을 때만 폴더 스캔
+        with self._lock:
+            self._puts += 1
+            if self._total is not None and self._puts % RESCAN_EVERY != 0:
+                self._total += delta
+                if self._total <= self.max_bytes:
+                    return
+        self.evict()
+
+    def put(self, key: str, src: Path) -> Optional[Path]:
+        """
+        src 파일을 캐시에 복사해 넣고 캐시 경로를 리턴
+        (src는 그대로 둔다 - 호출자가 계속 쓰는 파일이므로)
+        """
+        return self._store(key, lambda tmp: shutil.copyfile(src, tmp))
+
+    def put_bytes(self, key: str, data: bytes) -> Optional[Path]:
+        # 작은 값(분석 결과 json 등)을 바로 저장
+        return self._store(key, lambda tmp: tmp.write_bytes(data))
+
+    def materialize(self, key: str, dst: Path) -> Optional[Path]:
+        """
+        캐시 hit이면 dst에 하드링크(안 되면 복사)로 꺼내 놓고 dst를 리턴
+
+        - 캐시 파일을 직접 참조하면 사용 중에 eviction으로 지워질 수 있어서
+          작업 폴더로 꺼내 쓰는 게 안전함
+        """
+        p = self.get(key)
+        if p is None:
+            return None
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            dst.unlink(missing_ok=True)
+            try:
+                os.link(p, dst)
+            except OSError:
+                shutil.copyfile(p, dst)
+        except OSError:
+            return None
+        return dst
+
+    def evict(self) -> None:
+        # 폴더를 훑어서 실제 크기를 다시 맞추고, 용량 초과면 오래 안 쓴 파일부터 삭제
+        with self._lock:
+            entries = []
+            total = 0
+            for f in self.root.glob("*/*"):
+                if f.name.startswith("."):
+                    continue
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, f))
+                total += st.st_size
+
+            if total <= self.max_bytes:
+                self._total = total
+                return
+
+            target = int(self.max_bytes * EVICT_LOW_WATER)
+            entries.sort(key=lambda e: e[0])
+            for _mtime, size, f in entries:
+                if total <= target:
+                    break
+                try:
+                    f.unlink()
+                    total -= size
+                except OSError:
+                    continue
+            self._total = total
+
+
+_segment_cache: Optional[DiskCache] = None
+
+
+def segment_cache() -> DiskCache:
+    # 렌더된 컷(세그먼트) 캐시
+    global _segment_cache
+    if _segment_cache is None:
+        max_mb = int(getattr(settings, "SEGMENT_CACHE_MAX_MB", 2048))
+        _segment_cache = DiskCache(cache_root() / "segments", max_mb * 1024 * 1024, suffix=".mp4")
+    return _segment_cache
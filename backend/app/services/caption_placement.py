@@ -15,11 +15,21 @@
 """
 
 from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, Optional
 
 import cv2
 import numpy as np
+from PIL import Image
+
+from backend.app.core.config import settings
+from backend.app.services.cache import DiskCache, cache_root, content_hash
 
 
 @dataclass(frozen=True)
@@ -36,39 +46,283 @@ ANCHORS = {
     "bottom": Anchor("bottom", ass_an=2, x=540, y=1700),
 }
 
+# 분석 해상도 (세로 쇼츠 기준, 작게 줄여서 빠르게 계산)
+ANALYSIS_W, ANALYSIS_H = 540, 960
+
+# 위/중/아래 밴드 (너무 극단적으로 나누면 오판 가능 -> 적당한 비율)
+BANDS = {
+    "top": (0.0, 0.28),
+    "mid": (0.36, 0.64),
+    "bottom": (0.72, 1.0),
+}
+
 
-def _band_complexity(gray: np.ndarray) -> float:
+def _band_complexity(edges: np.ndarray) -> float:
     """
     복잡도 측정:
     - Canny edge 결과의 평균(엣지 픽셀 비율)로 간단히 측정
     값이 낮을수록 '덜 복잡' = 자막 올리기 좋음
     """
-    edges = cv2.Canny(gray, 80, 160)
     return float(edges.mean())  # 0~255 평균
 
 
-def pick_anchor_for_image(image_path: Path) -> Anchor:
-    img = cv2.imread(str(image_path))
-    if img is None:
-        # 파일 읽기 실패 시 기본값: 상단
-        return ANCHORS["top"]
+def _reduced_flag(image_path: Path, min_w: int = ANALYSIS_W, min_h: int = ANALYSIS_H) -> int:
+    """
+    디코딩 단계에서 바로 1/2, 1/4, 1/8로 줄여 읽기 (JPEG은 DCT 단계에서 줄여서 훨씬 빠름)
+    - 줄인 결과가 분석 해상도(min_w x min_h)보다는 커야 해서, 헤더로 원본 크기만 먼저 확인
+    """
+    try:
+        with Image.open(image_path) as im:
+            iw, ih = im.size
+    except Exception:
+        return cv2.IMREAD_GRAYSCALE
 
-    # 세로 쇼츠 기준이므로 일단 작은 사이즈로 줄여서 빠르게 계산
-    img = cv2.resize(img, (540, 960))
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    for factor, flag in (
+        (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+        (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+        (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+    ):
+        if iw // factor >= min_w and ih // factor >= min_h:
+            return flag
+    return cv2.IMREAD_GRAYSCALE
 
-    h = gray.shape[0]
-    # 위/중/아래 밴드 분할 (너무 극단적으로 나누면 오판 가능 -> 적당한 비율)
-    top = gray[0:int(h*0.28), :]
-    mid = gray[int(h*0.36):int(h*0.64), :]
-    bot = gray[int(h*0.72):h, :]
 
-    scores = {
-        "top": _band_complexity(top),
-        "mid": _band_complexity(mid),
-        "bottom": _band_complexity(bot),
+def _edge_map(image_path: Path) -> Optional[np.ndarray]:
+    # 축소 디코딩 -> 분석 해상도 -> Canny 1회
+    gray = cv2.imread(str(image_path), _reduced_flag(image_path))
+    if gray is None:
+        return None
+    gray = cv2.resize(gray, (ANALYSIS_W, ANALYSIS_H), interpolation=cv2.INTER_AREA)
+    return cv2.Canny(gray, 80, 160)
+
+
+def _band_scores(edges: np.ndarray) -> Dict[str, float]:
+    # 엣지 맵 1장에서 밴드별 점수만 잘라서 계산
+    h = edges.shape[0]
+    return {
+        name: _band_complexity(edges[int(h * lo):int(h * hi), :])
+        for name, (lo, hi) in BANDS.items()
     }
 
+
+# --- 캐시: 프로세스 내 LRU + 디스크(json) ---
+# 키는 파일 "내용" 해시 -> 반복 컷/다른 job의 같은 사진도 한 번만 분석
+_MEMO_MAX = 512
+_memo: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+_memo_lock = threading.Lock()
+_disk: Optional[DiskCache] = None
+
+
+def _disk_cache() -> DiskCache:
+    global _disk
+    if _disk is None:
+        max_mb = int(getattr(settings, "PLACEMENT_CACHE_MAX_MB", 64))
+        _disk = DiskCache(cache_root() / "placement", max_mb * 1024 * 1024, suffix=".json")
+    return _disk
+
+
+def _memo_get(key: str) -> Optional[Dict[str, float]]:
+    with _memo_lock:
+        hit = _memo.get(key)
+        if hit is not None:
+            _memo.move_to_end(key)
+        return hit
+
+
+def _memo_put(key: str, scores: Dict[str, float]) -> None:
+    with _memo_lock:
+        _memo[key] = scores
+        _memo.move_to_end(key)
+        while len(_memo) > _MEMO_MAX:
+            _memo.popitem(last=False)
+
+
+def _band_key(image_path: Path) -> str:
+    return "band-v1-" + content_hash(image_path)
+
+
+def seed_band_scores(image_path: Path, scores: Dict[str, float]) -> None:
+    """
+    다른 분석 단계(image_analysis)가 같은 디코딩에서 이미 계산한 밴드 점수를 넣어둠
+    -> 자막 위치 선정 때 사진을 다시 읽지 않음
+    """
+    try:
+        _memo_put(_band_key(image_path), dict(scores))
+    except OSError:
+        pass
+
+
+def band_scores_for_image(image_path: Path) -> Optional[Dict[str, float]]:
+    """
+    사진 1장의 밴드별 복잡도 (메모리 LRU -> 디스크 캐시 -> 계산 순)
+    읽기 실패면 None
+    """
+    try:
+        key = _band_key(image_path)
+    except OSError:
+        return None
+
+    scores = _memo_get(key)
+    if scores is not None:
+        return scores
+
+    disk = _disk_cache()
+    p = disk.get(key)
+    if p is not None:
+        try:
+            scores = json.loads(p.read_text(encoding="utf-8"))
+            _memo_put(key, scores)
+            return scores
+        except (OSError, ValueError):
+            pass
+
+    edges = _edge_map(image_path)
+    if edges is None:
+        return None
+    scores = _band_scores(edges)
+    _memo_put(key, scores)
+    disk.put_bytes(key, json.dumps(scores).encode("utf-8"))
+    return scores
+
+
+# --- 적분 영상(summed-area table) 기반 위치 선정 ---
+# 3개 밴드 대신 "실제 자막 박스 크기"의 후보 사각형을 y 전 구간에서 평가
+# 엣지 맵의 적분 영상을 한 번 만들어 두면 사각형 하나의 엣지 합은 O(1) (네 모서리 덧셈/뺄셈)
+
+# 쇼츠 UI(상단 제목/하단 버튼)에 가리지 않게 후보 y 범위 제한 (출력 높이 대비)
+SAFE_TOP = 0.06
+SAFE_BOTTOM = 0.90
+
+
+@dataclass(frozen=True)
+class PlacementIndex:
+    """
+    사진 1장 + 출력 해상도 1개에 대한 자막 위치 인덱스
+
+    - sat: 출력 프레임 모양(scale=decrease + pad)으로 맞춘 엣지 맵의 적분 영상 (분석 해상도)
+    - 자막 문구가 바뀌어도 박스 크기만 다시 넣으면 되므로 재사용 가능
+    """
+    sat: np.ndarray      # (ah+1, aw+1) int32
+    out_w: int
+    out_h: int
+
+    @property
+    def scale(self) -> float:
+        # 출력 px -> 분석 px
+        return (self.sat.shape[0] - 1) / self.out_h
+
+    def best_y(self, box_w: int, box_h: int, *, step: int = 8) -> Optional[int]:
+        """
+        (box_w x box_h) 박스를 가운데 정렬로 놓을 때 엣지 밀도가 가장 낮은 박스 top y (출력 px)
+        후보가 없으면(박스가 너무 큼) None
+        """
+        ah, aw = self.sat.shape[0] - 1, self.sat.shape[1] - 1
+        f = self.scale
+
+        y_min = int(self.out_h * SAFE_TOP)
+        y_max = int(self.out_h * SAFE_BOTTOM) - box_h
+        if y_max < y_min:
+            return None
+
+        ys = np.arange(y_min, y_max + 1, max(1, step))
+        x0 = int(np.clip(round((self.out_w - box_w) / 2 * f), 0, aw))
+        x1 = int(np.clip(round((self.out_w + box_w) / 2 * f), 0, aw))
+        y0 = np.clip(np.round(ys * f).astype(np.int64), 0, ah)
+        y1 = np.clip(np.round((ys + box_h) * f).astype(np.int64), 0, ah)
+
+        sat = self.sat
+        sums = sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]
+        area = np.maximum((y1 - y0) * max(1, x1 - x0), 1)
+        density = sums / area
+        return int(ys[int(np.argmin(density))])
+
+
+_INDEX_MAX = 128
+_index_memo: "OrderedDict[str, PlacementIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def _fitted_edge_map(image_path: Path, out_w: int, out_h: int, fit: str = "pad") -> Optional[np.ndarray]:
+    """
+    출력 프레임과 같은 배치로 놓인 엣지 맵 (분석 해상도)
+    - fit="pad" : scale=decrease + 중앙 pad, pad 영역은 엣지 0 (검은 여백 = 자막 올리기 좋은 곳)
+    - fit="crop": scale=increase + 중앙 crop (화면비별 출력에서 잘려나간 부분은 제외)
+    """
+    ah = ANALYSIS_H
+    aw = max(1, int(round(out_w * ah / out_h)))
+
+    gray = cv2.imread(str(image_path), _reduced_flag(image_path, aw, ah))
+    if gray is None:
+        return None
+
+    ih, iw = gray.shape[:2]
+    s = max(aw / iw, ah / ih) if fit == "crop" else min(aw / iw, ah / ih)
+    nw, nh = max(1, int(round(iw * s))), max(1, int(round(ih * s)))
+    gray = cv2.resize(gray, (nw, nh), interpolation=cv2.INTER_AREA)
+
+    if fit == "crop":
+        ox, oy = (nw - aw) // 2, (nh - ah) // 2
+        return cv2.Canny(np.ascontiguousarray(gray[oy:oy + ah, ox:ox + aw]), 80, 160)
+
+    canvas = np.zeros((ah, aw), dtype=np.uint8)
+    ox, oy = (aw - nw) // 2, (ah - nh) // 2
+    canvas[oy:oy + nh, ox:ox + nw] = cv2.Canny(gray, 80, 160)
+    return canvas
+
+
+def placement_index(image_path: Path, out_w: int, out_h: int, fit: str = "pad") -> Optional[PlacementIndex]:
+    """
+    사진별 PlacementIndex (내용 해시 + 출력 크기 + 배치 방식으로 프로세스 내 LRU 캐시)
+    읽기 실패면 None
+    """
+    try:
+        key = f"{content_hash(image_path)}-{out_w}x{out_h}-{fit}"
+    except OSError:
+        return None
+
+    with _index_lock:
+        hit = _index_memo.get(key)
+        if hit is not None:
+            _index_memo.move_to_end(key)
+            return hit
+
+    edges = _fitted_edge_map(image_path, out_w, out_h, fit)
+    if edges is None:
+        return None
+    index = PlacementIndex(sat=cv2.integral((edges > 0).astype(np.uint8)), out_w=out_w, out_h=out_h)
+
+    with _index_lock:
+        _index_memo[key] = index
+        while len(_index_memo) > _INDEX_MAX:
+            _index_memo.popitem(last=False)
+    return index
+
+
+def pick_caption_y(
+    image_path: Path,
+    box_w: int,
+    box_h: int,
+    out_w: int,
+    out_h: int,
+    fit: str = "pad",
+) -> Optional[int]:
+    """
+    자막 박스(box_w x box_h, 출력 px)를 놓을 top y (출력 px)
+    - fit: 출력 프레임에 사진을 놓는 방식 (화면비별 출력은 "crop")
+    - 인덱스를 못 만들거나 박스가 안 들어가면 None -> 호출자가 밴드 방식으로 fallback
+    """
+    index = placement_index(image_path, out_w, out_h, fit)
+    if index is None:
+        return None
+    return index.best_y(box_w, box_h)
+
+
+def pick_anchor_for_image(image_path: Path) -> Anchor:
+    scores = band_scores_for_image(image_path)
+    if scores is None:
+        # 파일 읽기 실패 시 기본값: 상단
+        return ANCHORS["top"]
+
     # 가장 덜 복잡한 곳 선택
     best = min(scores, key=scores.get)
     return ANCHORS[best]
@@ -78,5 +332,14 @@ def pick_anchors_for_images(image_paths: list[Path]) -> list[Anchor]:
     """
     슬라이드쇼는 이미지 1장당 caption 1줄로 대응시키는 게 가장 자연스러움.
     (이미지 N장 -> 문구 N줄 권장)
+
+    - 컷 수만큼 반복된 같은 파일은 1번만 분석
+    - 고유 사진들은 스레드 풀에서 병렬 분석 (cv2는 GIL을 풀어줌)
     """
-    return [pick_anchor_for_image(p) for p in image_paths]
+    unique = list(dict.fromkeys(str(p) for p in image_paths))
+    if not unique:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(8, len(unique))) as pool:
+        anchors = dict(zip(unique, pool.map(lambda k: pick_anchor_for_image(Path(k)), unique)))
+    return [anchors[str(p)] for p in image_paths]
@@ -0,0 +1,167 @@
+"""
+자막 래스터라이즈 - Pillow
+
+왜?
+- drawtext는 자막 줄마다 필터가 하나씩 붙고, 모든 필터가 "매 프레임" 평가됨
+  (enable=between(...) 검사 + 폰트 로딩도 필터 인스턴스마다)
+- 자막 한 줄은 영상 내내 모양이 같으니, 한 번만 투명 PNG로 그려두고
+  overlay로 시간 구간에만 얹으면 인코딩 중 텍스트 셰이핑 비용이 사라짐
+
+스타일은 drawtext와 같은 settings 값을 사용
+- 흰 글자 + 검은 테두리(CAPTION_BORDER_W) + 그림자(3,3 / black@0.7)
+- 반투명 검은 박스(CAPTION_BOX_ALPHA) + 여백(CAPTION_BOX_BORDER)
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from backend.app.core.config import settings
+from backend.app.core.logger import get_logger
+from backend.app.services.cache import DiskCache, cache_root, make_key
+
+logger = get_logger(__name__)
+
+
+def _project_root() -> Path:
+    return Path(__file__).resolve().parents[3]
+
+
+FONT_PATH = (_project_root() / "assets" / "fonts" / "BMHANNAPro.ttf").resolve()
+
+SHADOW_X = 3
+SHADOW_Y = 3
+SHADOW_ALPHA = 0.7
+
+
+@dataclass(frozen=True)
+class CaptionStyle:
+    fontsize: int
+    borderw: int
+    box_alpha: float
+    boxborder: int
+
+    @classmethod
+    def from_settings(cls, scale: float = 1.0) -> "CaptionStyle":
+        # scale: 출력 해상도가 VIDEO_SIZE와 다를 때(draft 등) 크기 값만 비례 조정
+        return cls(
+            fontsize=max(1, int(round(int(getattr(settings, "CAPTION_FONT_SIZE", 104)) * scale))),
+            borderw=int(round(int(getattr(settings, "CAPTION_BORDER_W", 12)) * scale)),
+            box_alpha=float(getattr(settings, "CAPTION_BOX_ALPHA", 0.35)),
+            boxborder=int(round(int(getattr(settings, "CAPTION_BOX_BORDER", 18)) * scale)),
+        )
+
+
+@dataclass(frozen=True)
+class CaptionImage:
+    path: Path
+    width: int
+    height: int
+    pad: int     # PNG 위쪽 끝 ~ 글자 위쪽 끝 거리 (drawtext의 y는 글자 기준이라 보정용)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_font(size: int) -> ImageFont.FreeTypeFont:
+    # 폰트는 프로세스당 크기별로 1번만 로딩
+    return ImageFont.truetype(str(FONT_PATH), size)
+
+
+_caption_cache: Optional[DiskCache] = None
+
+
+def caption_cache() -> DiskCache:
+    global _caption_cache
+    if _caption_cache is None:
+        max_mb = int(getattr(settings, "CAPTION_CACHE_MAX_MB", 256))
+        _caption_cache = DiskCache(cache_root() / "captions", max_mb * 1024 * 1024, suffix=".png")
+    return _caption_cache
+
+
+def _measure(text: str, style: CaptionStyle) -> tuple[int, int, int, int]:
+    font = _load_font(style.fontsize)
+    probe = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    return probe.textbbox((0, 0), text, font=font, stroke_width=style.borderw)
+
+
+def measure_caption(text: str, style: Optional[CaptionStyle] = None) -> tuple[int, int]:
+    """
+    렌더될 자막 PNG 크기 (박스 + 여백 + 그림자, 출력 px) - 위치 선정에서 후보 박스 크기로 씀
+    """
+    style = style or CaptionStyle.from_settings()
+    left, top, right, bottom = _measure(text, style)
+    pad = style.boxborder
+    return (right - left) + 2 * pad + SHADOW_X, (bottom - top) + 2 * pad + SHADOW_Y
+
+
+def _draw_caption(text: str, style: CaptionStyle) -> Image.Image:
+    font = _load_font(style.fontsize)
+    left, top, right, bottom = _measure(text, style)
+    tw, th = right - left, bottom - top
+    pad = style.boxborder
+
+    bw, bh = tw + 2 * pad, th + 2 * pad
+    img = Image.new("RGBA", (bw + SHADOW_X, bh + SHADOW_Y), (0, 0, 0, 0))
+
+    # 1) 반투명 박스
+    box = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    ImageDraw.Draw(box).rectangle(
+        [0, 0, bw - 1, bh - 1], fill=(0, 0, 0, int(round(255 * style.box_alpha)))
+    )
+    img.alpha_composite(box)
+
+    origin = (pad - left, pad - top)
+
+    # 2) 그림자 (글자+테두리 모양 그대로 오프셋)
+    shadow = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    a = int(round(255 * SHADOW_ALPHA))
+    ImageDraw.Draw(shadow).text(
+        (origin[0] + SHADOW_X, origin[1] + SHADOW_Y), text, font=font,
+        fill=(0, 0, 0, a), stroke_width=style.borderw, stroke_fill=(0, 0, 0, a),
+    )
+    img.alpha_composite(shadow)
+
+    # 3) 흰 글자 + 검은 테두리
+    glyphs = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    ImageDraw.Draw(glyphs).text(
+        origin, text, font=font,
+        fill=(255, 255, 255, 255), stroke_width=style.borderw, stroke_fill=(0, 0, 0, 255),
+    )
+    img.alpha_composite(glyphs)
+    return img
+
+
+def render_caption(text: str, out_png: Path, style: Optional[CaptionStyle] = None) -> CaptionImage:
+    """
+    자막 1줄 -> 투명 PNG(out_png) (캐시 hit이면 그리지 않고 꺼내 씀)
+
+    캐시 키: (텍스트, 스타일, 출력 해상도, 폰트)
+    - 캐시 파일을 직접 넘기지 않고 작업 폴더로 꺼내 두는 이유:
+      FFmpeg가 읽는 중에 eviction으로 지워지는 걸 막기 위해
+    """
+    style = style or CaptionStyle.from_settings()
+    cache = caption_cache()
+    key = make_key(
+        "caption-v1", text, style.fontsize, style.borderw, style.box_alpha, style.boxborder,
+        settings.VIDEO_SIZE, FONT_PATH.name,
+    )
+
+    hit = cache.materialize(key, out_png)
+    if hit is not None:
+        with Image.open(hit) as im:
+            return CaptionImage(hit, im.width, im.height, style.boxborder)
+
+    img = _draw_caption(text, style)
+    out_png.parent.mkdir(parents=True, exist_ok=True)
+    # out_png가 예전 캐시 hit의 하드링크일 수 있음 (재자막: 같은 caption_XX.png 재사용)
+    # 그대로 덮어쓰면 캐시 파일(같은 inode)까지 바뀌므로 새 파일로 쓰고 교체
+    tmp = out_png.with_name(f".{out_png.name}.tmp")
+    img.save(tmp, format="PNG")
+    os.replace(tmp, out_png)
+    cache.put(key, out_png)
+    return CaptionImage(out_png, img.width, img.height, style.boxborder)
@@ -0,0 +1,195 @@
+"""
+사진 분석 (1회 디코딩으로 한꺼번에)
+
+왜 필요?
+- 예전: 자막 위치 분석이 cv2로 한 번, FFmpeg가 또 한 번 디코딩
+  흔들린 사진/너무 어두운 사진/거의 같은 사진도 검사 없이 그대로 인코딩에 들어감
+- 지금: 사진 1장을 축소 그레이스케일로 "한 번만" 디코딩해서 같은 배열로
+  1) 밴드 복잡도(자막 위치용)  2) 선명도(Laplacian 분산)
+  3) 노출(밝기 히스토그램)     4) 지각 해시(dHash, 중복 검출)
+  를 모두 계산하고, 결과(ImageReport)로 약한 컷/중복 컷을 빼거나 뒤로 보낸다
+
+결과는 내용 해시 기준으로 디스크(json)에 캐시 -> 같은 사진 재업로드 시 디코딩 0회
+"""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.core.logger import get_logger
+from backend.app.services.cache import DiskCache, cache_root, content_hash
+from backend.app.services.caption_placement import (
+    ANALYSIS_H,
+    ANALYSIS_W,
+    _band_scores,
+    _reduced_flag,
+    seed_band_scores,
+)
+
+logger = get_logger(__name__)
+
+# 노출 판정용 밝기 경계 (0~255)
+DARK_LEVEL = 40
+BRIGHT_LEVEL = 225
+
+
+@dataclass
+class ImageReport:
+    path: str
+    ok: bool = True                         # 디코딩 성공 여부
+    sharpness: float = 0.0                  # Laplacian 분산 (클수록 선명)
+    mean_luma: float = 0.0                  # 평균 밝기 0~255
+    dark_frac: float = 0.0                  # DARK_LEVEL 미만 픽셀 비율
+    bright_frac: float = 0.0                # BRIGHT_LEVEL 초과 픽셀 비율
+    dhash: str = ""                         # 64bit 차이 해시 (hex)
+    band_scores: Dict[str, float] = field(default_factory=dict)
+    duplicate_of: Optional[str] = None      # select_shots에서 채움
+
+    @property
+    def blurry(self) -> bool:
+        return self.sharpness < float(getattr(settings, "ANALYSIS_MIN_SHARPNESS", 60.0))
+
+    @property
+    def badly_exposed(self) -> bool:
+        # 화면 절반 이상이 거의 검정/거의 흰색이면 노출 실패로 봄
+        return self.dark_frac > 0.5 or self.bright_frac > 0.5
+
+    @property
+    def weak(self) -> bool:
+        return (not self.ok) or self.blurry or self.badly_exposed
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d.update(blurry=self.blurry, badly_exposed=self.badly_exposed)
+        return d
+
+
+def _dhash(gray: np.ndarray) -> int:
+    # 9x8로 줄여서 가로 이웃 픽셀 대소 비교 -> 64bit
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def _hamming(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def _analyze(image_path: Path) -> ImageReport:
+    # 축소 디코딩 1회 -> 모든 지표를 같은 배열에서 계산
+    gray = cv2.imread(str(image_path), _reduced_flag(image_path))
+    if gray is None:
+        return ImageReport(path=str(image_path), ok=False)
+    gray = cv2.resize(gray, (ANALYSIS_W, ANALYSIS_H), interpolation=cv2.INTER_AREA)
+
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    total = float(hist.sum()) or 1.0
+    levels = np.arange(256, dtype=np.float64)
+
+    return ImageReport(
+        path=str(image_path),
+        sharpness=float(cv2.Laplacian(gray, cv2.CV_64F).var()),
+        mean_luma=float((hist * levels).sum() / total),
+        dark_frac=float(hist[:DARK_LEVEL].sum() / total),
+        bright_frac=float(hist[BRIGHT_LEVEL + 1:].sum() / total),
+        dhash=f"{_dhash(gray):016x}",
+        band_scores=_band_scores(cv2.Canny(gray, 80, 160)),
+    )
+
+
+_disk: Optional[DiskCache] = None
+
+
+def _disk_cache() -> DiskCache:
+    global _disk
+    if _disk is None:
+        max_mb = int(getattr(settings, "PLACEMENT_CACHE_MAX_MB", 64))
+        _disk = DiskCache(cache_root() / "analysis", max_mb * 1024 * 1024, suffix=".json")
+    return _disk
+
+
+def analyze_image(image_path: Path) -> ImageReport:
+    """
+    사진 1장 분석 (디스크 캐시 -> 계산 순)
+    - 계산한 밴드 점수는 caption_placement 메모리 캐시에도 넣어서 자막 위치 선정이 재디코딩 안 하게
+    """
+    try:
+        key = "analysis-v1-" + content_hash(image_path)
+    except OSError:
+        return ImageReport(path=str(image_path), ok=False)
+
+    disk = _disk_cache()
+    report: Optional[ImageReport] = None
+    p = disk.get(key)
+    if p is not None:
+        try:
+            data = json.loads(p.read_text(encoding="utf-8"))
+            data["path"] = str(image_path)
+            report = ImageReport(**data)
+        except (OSError, ValueError, TypeError):
+            report = None
+
+    if report is None:
+        report = _analyze(image_path)
+        if report.ok:
+            data = asdict(report)
+            data.pop("duplicate_of", None)
+            disk.put_bytes(key, json.dumps(data).encode("utf-8"))
+
+    if report.band_scores:
+        seed_band_scores(image_path, report.band_scores)
+    return report
+
+
+def analyze_images(image_paths: List[Path]) -> List[ImageReport]:
+    # 사진별 병렬 분석 (cv2는 GIL을 풀어줌), 입력 순서 유지
+    if not image_paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(image_paths))) as pool:
+        return list(pool.map(analyze_image, image_paths))
+
+
+def select_shots(reports: List[ImageReport], *, min_keep: int = 1) -> List[Path]:
+    """
+    분석 결과로 렌더할 사진 순서 결정
+
+    - 거의 같은 사진(dHash 해밍거리 <= ANALYSIS_DUP_MAX_DISTANCE)은 먼저 나온 1장만 남김
+    - 흐림/노출 실패 컷은 뒤로 보내고, 좋은 컷이 min_keep장 이상이면 아예 뺌
+    - 전부 약하면 업로드 순서 그대로 (아무것도 없는 영상보다는 나음)
+    """
+    max_dist = int(getattr(settings, "ANALYSIS_DUP_MAX_DISTANCE", 6))
+
+    unique: List[ImageReport] = []
+    for r in reports:
+        if r.ok and r.dhash:
+            for kept in unique:
+                if kept.dhash and _hamming(r.dhash, kept.dhash) <= max_dist:
+                    r.duplicate_of = kept.path
+                    break
+        if r.duplicate_of is None:
+            unique.append(r)
+
+    good = [r for r in unique if not r.weak]
+    weak = [r for r in unique if r.weak]
+
+    for r in reports:
+        if r.duplicate_of:
+            logger.info("analysis: 중복 컷 제외 %s (≈ %s)", Path(r.path).name, Path(r.duplicate_of).name)
+    for r in weak:
+        logger.info(
+            "analysis: 약한 컷 %s (sharpness=%.1f dark=%.2f bright=%.2f)",
+            Path(r.path).name, r.sharpness, r.dark_frac, r.bright_frac,
+        )
+
+    chosen = good if len(good) >= max(1, min_keep) else good + weak
+    if not chosen:
+        chosen = [r for r in reports if r.ok] or reports
+    return [Path(r.path) for r in chosen]
@@ -0,0 +1,176 @@
+"""
+업로드 수집(ingest)
+
+1) 스트리밍 저장
+- 예전: save_path.write_bytes(await uf.read()) -> 사진 1장을 통째로 메모리에 올린 뒤
+  이벤트 루프 안에서 동기로 씀 (5~15MB x 15장 x 동시요청이면 금방 터짐)
+- 지금: 1MB 청크로 읽어서 스레드에서 쓰고, 파일당/요청당 용량 제한을 건다
+
+2) 수집 시 다운스케일 (선택, INGEST_DOWNSCALE)
+- 렌더에 실제로 필요한 최대 해상도 = 출력 크기 x 최대 줌(1.20)
+  추가 화면비(16:9, 1:1 ...)는 꽉 채워 자르므로(crop) 9:16보다 가로가 더 필요 -> 캔버스마다 계산해서 최댓값
+- 그보다 큰 사진(12MP 폰 사진 등)은 한 번만 디코딩해서 줄여 둔다
+  -> 이후 FFmpeg/캡션 위치 분석 등 모든 소비자가 작은 파일을 읽음
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import anyio
+import cv2
+
+from backend.app.core.config import ASPECT_RATIOS, EncodingProfile, aspect_profile, settings
+from backend.app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 1 << 20  # 1MB
+
+# 모션 프리셋의 최대 줌 (motion.PRESETS / _effect_zoompan 과 같은 값)
+MAX_ZOOM = 1.20
+
+
+class UploadTooLarge(Exception):
+    """파일당/요청당 업로드 용량 제한 초과"""
+
+
+def _limit_bytes(name: str, default_mb: int) -> int:
+    return int(getattr(settings, name, default_mb)) * 1024 * 1024
+
+
+async def save_uploads(uploads: list, inputs_dir: Path) -> List[Path]:
+    """
+    UploadFile 리스트 -> inputs_dir/img_{i}.{ext} (청크 단위 스트리밍 저장)
+
+    - UPLOAD_MAX_FILE_MB : 파일 1개 상한
+    - UPLOAD_MAX_TOTAL_MB: 요청 전체 상한
+    - 초과하면 쓰던 파일까지 지우고 UploadTooLarge
+    - 다른 이유로 중단돼도(클라이언트 끊김/취소/디스크 오류) 쓰던 파일은 지우고 예외를 그대로 올림
+    """
+    max_file = _limit_bytes("UPLOAD_MAX_FILE_MB", 25)
+    max_total = _limit_bytes("UPLOAD_MAX_TOTAL_MB", 200)
+
+    inputs_dir.mkdir(parents=True, exist_ok=True)
+    saved: List[Path] = []
+    total = 0
+
+    try:
+        for i, uf in enumerate(uploads, start=1):
+            suffix = Path(uf.filename or "").suffix.lower() or ".jpg"
+            save_path = inputs_dir / f"img_{i}{suffix}"
+            saved.append(save_path)
+
+            written = 0
+            f = await anyio.to_thread.run_sync(open, save_path, "wb")
+            try:
+                while True:
+                    chunk = await uf.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    total += len(chunk)
+                    if written > max_file:
+                        raise UploadTooLarge(
+                            f"{uf.filename}: 파일당 최대 {max_file // (1024 * 1024)}MB까지 업로드할 수 있습니다."
+                        )
+                    if total > max_total:
+                        raise UploadTooLarge(
+                            f"요청당 최대 {max_total // (1024 * 1024)}MB까지 업로드할 수 있습니다."
+                        )
+                    await anyio.to_thread.run_sync(f.write, chunk)
+            finally:
+                await anyio.to_thread.run_sync(f.close)
+                await uf.close()
+    except BaseException:
+        for p in saved:
+            p.unlink(missing_ok=True)
+        raise
+
+    return saved
+
+
+Canvas = Tuple[int, int, str]  # (가로, 세로, fit: pad | crop)
+
+
+def _render_canvases(
+    profile: Optional[EncodingProfile] = None,
+    aspects: Optional[List[str]] = None,
+) -> List[Canvas]:
+    """
+    이 job이 렌더할 캔버스 목록 (기본 VIDEO_SIZE + 요청된 추가 화면비)
+    """
+    w, h = (int(v) for v in settings.VIDEO_SIZE.split("x"))
+    canvases: List[Canvas] = [(w, h, "pad")]
+    if profile is not None:
+        for a in aspects or []:
+            if a not in ASPECT_RATIOS:
+                continue
+            ap = aspect_profile(profile, a)
+            aw, ah = (int(v) for v in (ap.size or settings.VIDEO_SIZE).split("x"))
+            canvases.append((aw, ah, ap.fit))
+    return canvases
+
+
+def _required_scale(iw: int, ih: int, canvases: List[Canvas]) -> float:
+    """
+    원본 대비 필요한 최대 배율 (1 이상이면 줄이면 안 됨)
+
+    - pad: 캔버스 안에 다 보이게 맞춤 -> min(W/iw, H/ih)
+    - crop: 캔버스를 꽉 채움 -> max(W/iw, H/ih)
+    - 그 뒤 최대 1.20배 줌
+    """
+    need = 0.0
+    for w, h, fit in canvases:
+        f = max(w / iw, h / ih) if fit == "crop" else min(w / iw, h / ih)
+        need = max(need, f * MAX_ZOOM)
+    return need
+
+
+def downscale_for_render(path: Path, canvases: Optional[List[Canvas]] = None) -> Path:
+    """
+    렌더 최대 해상도보다 큰 사진이면 줄여서 JPEG으로 저장하고 새 경로 리턴
+
+    - 캔버스마다 pad/crop으로 맞춘 뒤 최대 1.20배 줌 -> 그중 가장 큰 배율까지만 줄이면 화질 손실 없음
+    - 디코딩 실패/이미 작으면 원본 그대로
+    """
+    img = cv2.imread(str(path), cv2.IMREAD_COLOR)
+    if img is None:
+        logger.warning("ingest: 디코딩 실패, 원본 유지: %s", path)
+        return path
+
+    ih, iw = img.shape[:2]
+    scale = _required_scale(iw, ih, canvases or _render_canvases())
+    if scale >= 1.0:
+        return path
+
+    nw, nh = max(1, int(round(iw * scale))), max(1, int(round(ih * scale)))
+    img = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_AREA)
+
+    out = path.with_name(f"{path.stem}_ingest.jpg")
+    if not cv2.imwrite(str(out), img, [cv2.IMWRITE_JPEG_QUALITY, 92]):
+        logger.warning("ingest: 저장 실패, 원본 유지: %s", path)
+        return path
+
+    logger.info("ingest: %s %dx%d -> %dx%d", path.name, iw, ih, nw, nh)
+    return out
+
+
+def ingest_images(
+    paths: List[Path],
+    *,
+    profile: Optional[EncodingProfile] = None,
+    aspects: Optional[List[str]] = None,
+) -> List[Path]:
+    """
+    업로드된 사진들을 렌더용으로 정리 (INGEST_DOWNSCALE=false면 그대로)
+
+    - aspects: 추가 화면비가 있으면 그 캔버스(crop)에 필요한 해상도까지 남김
+    """
+    if not getattr(settings, "INGEST_DOWNSCALE", True) or not paths:
+        return list(paths)
+    canvases = _render_canvases(profile, aspects)
+    with ThreadPoolExecutor(max_workers=min(4, len(paths))) as pool:
+        return list(pool.map(lambda p: downscale_for_render(p, canvases), paths))
@@ -0,0 +1,346 @@
+"""
+작업(job) 큐 - SQLite(WAL) 기반, 여러 워커 프로세스가 같이 씀
+
+왜 필요?
+- jobs.py의 레지스트리는 프로세스 메모리에만 있어서
+  서버가 죽으면 진행 중/대기 중 작업이 통째로 사라지고, 렌더를 다른 프로세스로 나눌 수도 없음
+- 외부 브로커(Redis 등) 없이, 같은 호스트(또는 공유 볼륨)의 SQLite 파일 1개로
+  API는 작업을 넣기만 하고, 워커(python -m backend.app.worker)들이 꺼내서 렌더
+
+구조
+- jobs 테이블 1개: 상태(queued/running/done/failed/cancelled) + 입력(payload json) + 결과(result json)
+- lease: 워커가 작업을 가져가면 lease_owner/lease_expires를 기록하고 heartbeat로 연장
+  워커가 죽어서 lease가 만료되면 다른 워커가 다시 가져감
+- 재시도: 실패 시 attempts < max_attempts 이면 backoff 후 다시 queued, 다 쓰면 failed
+- 취소: status를 cancelled로 바꾸면 실행 중인 워커의 heartbeat가 실패 -> 워커가 FFmpeg를 kill
+- WAL 모드: 읽기(상태 조회)가 쓰기(워커 갱신)를 막지 않음
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.app.core.config import settings
+from backend.app.core.logger import get_logger
+from backend.app.services.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, Job
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id        TEXT PRIMARY KEY,
+    kind          TEXT NOT NULL,
+    payload       TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    stage         TEXT NOT NULL DEFAULT 'queued',
+    progress      REAL NOT NULL DEFAULT 0,
+    error         TEXT,
+    result        TEXT NOT NULL DEFAULT '{}',
+    detail        TEXT NOT NULL DEFAULT '{}',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    available_at  REAL NOT NULL,
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at, created_at);
+"""
+
+# 재시도 backoff (초): 5, 10, 20 ... 최대 60
+_RETRY_BASE_SEC = 5
+_RETRY_MAX_SEC = 60
+
+
+@dataclass
+class ClaimedJob:
+    # 워커가 가져간 작업 1건
+    job_id: str
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+def queue_path() -> Path:
+    # JOB_QUEUE_PATH가 비어 있으면 outputs/jobs.sqlite3 (job 폴더와 같은 볼륨)
+    raw = (getattr(settings, "JOB_QUEUE_PATH", "") or "").strip()
+    return Path(raw) if raw else Path(settings.OUTPUT_DIR) / "jobs.sqlite3"
+
+
+def default_worker_id() -> str:
+    # 호스트명:pid:랜덤 (같은 호스트의 여러 워커 구분)
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class JobQueue:
+    """
+    SQLite 작업 큐 (스레드/프로세스 안전)
+
+    - 연결은 스레드마다 1개 (sqlite3 연결은 스레드 간 공유 불가)
+    - 상태를 바꾸는 쿼리는 BEGIN IMMEDIATE 트랜잭션 -> 두 워커가 같은 작업을 동시에 못 가져감
+    """
+
+    def __init__(self, path: Path, *, lease_sec: Optional[float] = None):
+        self.path = Path(path)
+        self.lease_sec = float(lease_sec or getattr(settings, "JOB_LEASE_SEC", 60))
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+        self._migrate()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: 트랜잭션은 직접 BEGIN/COMMIT
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self) -> None:
+        # 예전 스키마로 만든 큐 파일에 없는 컬럼 추가
+        cols = {r["name"] for r in self._conn().execute("PRAGMA table_info(jobs)").fetchall()}
+        if "detail" not in cols:
+            try:
+                self._conn().execute("ALTER TABLE jobs ADD COLUMN detail TEXT NOT NULL DEFAULT '{}'")
+            except sqlite3.OperationalError:
+                # 다른 프로세스가 먼저 추가한 경우
+                pass
+
+    def _write(self, fn):
+        # 쓰기 트랜잭션 헬퍼: BEGIN IMMEDIATE -> fn(conn) -> COMMIT (예외면 ROLLBACK)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            out = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return out
+
+    # --- API 쪽 ---
+
+    def enqueue(
+        self,
+        job_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        *,
+        max_attempts: Optional[int] = None,
+    ) -> None:
+        now = time.time()
+        attempts = max(1, int(max_attempts or getattr(settings, "JOB_MAX_ATTEMPTS", 3)))
+        self._write(lambda c: c.execute(
+            "INSERT INTO jobs (job_id, kind, payload, status, max_attempts, available_at, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload, ensure_ascii=False), QUEUED, attempts, now, now, now),
+        ))
+        logger.info("job 큐 등록(job=%s, kind=%s)", job_id, kind)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return Job(
+            job_id=row["job_id"],
+            status=row["status"],
+            stage=row["stage"],
+            progress=float(row["progress"]),
+            error=row["error"],
+            result=json.loads(row["result"] or "{}"),
+            detail=json.loads(row["detail"] or "{}"),
+            created_at=float(row["created_at"]),
+            updated_at=float(row["updated_at"]),
+        )
+
+    def depth(self) -> Dict[str, int]:
+        # 상태별 작업 수 (queued = 대기열 길이)
+        rows = self._conn().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        out = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+        out.update({r["status"]: int(r["n"]) for r in rows})
+        return out
+
+    def cancel(self, job_id: str) -> bool:
+        # 대기/실행 중인 작업을 취소 표시 (실행 중이면 워커가 다음 heartbeat에서 알아챔)
+        now = time.time()
+        cur = self._write(lambda c: c.execute(
+            "UPDATE jobs SET status = ?, stage = 'cancelled', error = '취소됨', updated_at = ?"
+            " WHERE job_id = ? AND status IN (?, ?)",
+            (CANCELLED, now, job_id, QUEUED, RUNNING),
+        ))
+        return cur.rowcount == 1
+
+    # --- 워커 쪽 ---
+
+    def claim(self, worker_id: str) -> Optional[ClaimedJob]:
+        """
+        가장 오래된 대기 작업 1건을 가져감 (없으면 None)
+
+        - lease가 만료된 running 작업(워커가 죽은 경우)도 다시 가져감
+        - 만료됐는데 재시도 횟수를 다 쓴 작업은 여기서 failed로 정리
+        """
+        def _claim(c: sqlite3.Connection) -> Optional[ClaimedJob]:
+            now = time.time()
+            c.execute(
+                "UPDATE jobs SET status = ?, stage = 'failed', lease_owner = NULL, updated_at = ?,"
+                " error = COALESCE(error, 'lease 만료 (워커 중단)')"
+                " WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (FAILED, now, RUNNING, now),
+            )
+            row = c.execute(
+                "SELECT job_id, kind, payload, attempts, max_attempts FROM jobs"
+                " WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?)"
+                " ORDER BY created_at LIMIT 1",
+                (QUEUED, now, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            c.execute(
+                "UPDATE jobs SET status = ?, stage = 'start', lease_owner = ?, lease_expires = ?,"
+                " attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                (RUNNING, worker_id, now + self.lease_sec, now, row["job_id"]),
+            )
+            return ClaimedJob(
+                job_id=row["job_id"],
+                kind=row["kind"],
+                payload=json.loads(row["payload"]),
+                attempts=int(row["attempts"]) + 1,
+                max_attempts=int(row["max_attempts"]),
+            )
+
+        return self._write(_claim)
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        # lease 연장. False면 lease를 잃었거나(만료 후 다른 워커가 가져감) 취소된 것
+        now = time.time()
+        cur = self._write(lambda c: c.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ?"
+            " WHERE job_id = ? AND lease_owner = ? AND status = ?",
+            (now + self.lease_sec, now, job_id, worker_id, RUNNING),
+        ))
+        return cur.rowcount == 1
+
+    def update(self, job_id: str, worker_id: str, **changes: Any) -> None:
+        # stage/progress 갱신 + result는 기존 값에 병합 (jobs.JobRegistry.update와 같은 규칙)
+        result = changes.pop("result", None)
+
+        def _update(c: sqlite3.Connection) -> None:
+            row = c.execute(
+                "SELECT result FROM jobs WHERE job_id = ? AND lease_owner = ? AND status = ?",
+                (job_id, worker_id, RUNNING),
+            ).fetchone()
+            if row is None:
+                return
+            merged = json.loads(row["result"] or "{}")
+            if result:
+                merged.update(result)
+            cols = {k: v for k, v in changes.items() if k in ("stage", "progress", "error")}
+            if "detail" in changes:
+                cols["detail"] = json.dumps(changes["detail"] or {}, ensure_ascii=False)
+            cols["result"] = json.dumps(merged, ensure_ascii=False)
+            cols["updated_at"] = time.time()
+            sets = ", ".join(f"{k} = ?" for k in cols)
+            c.execute(f"UPDATE jobs SET {sets} WHERE job_id = ?", (*cols.values(), job_id))
+
+        self._write(_update)
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> None:
+        self.update(job_id, worker_id, result=result)
+        self._write(lambda c: c.execute(
+            "UPDATE jobs SET status = ?, stage = 'done', progress = 1, error = NULL,"
+            " lease_owner = NULL, lease_expires = NULL, updated_at = ?"
+            " WHERE job_id = ? AND lease_owner = ? AND status = ?",
+            (DONE, time.time(), job_id, worker_id, RUNNING),
+        ))
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """
+        실패 기록. 재시도가 남았으면 backoff 후 다시 queued (True 리턴), 아니면 failed
+        """
+        def _fail(c: sqlite3.Connection) -> bool:
+            row = c.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE job_id = ? AND lease_owner = ? AND status = ?",
+                (job_id, worker_id, RUNNING),
+            ).fetchone()
+            if row is None:
+                return False
+            now = time.time()
+            retry = int(row["attempts"]) < int(row["max_attempts"])
+            if retry:
+                delay = min(_RETRY_MAX_SEC, _RETRY_BASE_SEC * 2 ** (int(row["attempts"]) - 1))
+                c.execute(
+                    "UPDATE jobs SET status = ?, stage = 'retry', error = ?, lease_owner = NULL,"
+                    " lease_expires = NULL, available_at = ?, updated_at = ? WHERE job_id = ?",
+                    (QUEUED, error, now + delay, now, job_id),
+                )
+            else:
+                c.execute(
+                    "UPDATE jobs SET status = ?, stage = 'failed', error = ?, lease_owner = NULL,"
+                    " lease_expires = NULL, updated_at = ? WHERE job_id = ?",
+                    (FAILED, error, now, job_id),
+                )
+            return retry
+
+        return self._write(_fail)
+
+
+class QueueReporter:
+    # jobs.Reporter와 같은 인터페이스 (파이프라인은 어느 쪽인지 모름)
+
+    def __init__(self, queue: JobQueue, job_id: str, worker_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+
+    def stage(self, name: str, progress: float) -> None:
+        self.queue.update(self.job_id, self.worker_id, stage=name, progress=max(0.0, min(1.0, progress)))
+
+    def publish(self, **result: Any) -> None:
+        self.queue.update(self.job_id, self.worker_id, result=result)
+
+    def detail(self, **info: Any) -> None:
+        self.queue.update(self.job_id, self.worker_id, detail=info)
+
+
+def enabled() -> bool:
+    # JOB_QUEUE=sqlite 면 /api/jobs가 이 큐에 넣고 별도 워커 프로세스가 처리
+    return (getattr(settings, "JOB_QUEUE", "memory") or "").strip().lower() == "sqlite"
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(queue_path())
+        return _queue
+
+
+def enqueue_generate(job_dir: Path, img_paths: List[Path], req) -> None:
+    # /api/jobs 입력을 그대로 직렬화 (워커가 pipeline.run_generate로 복원)
+    get_queue().enqueue(
+        job_dir.name,
+        "generate",
+        {
+            "job_dir": str(job_dir),
+            "img_paths": [str(p) for p in img_paths],
+            "req": asdict(req),
+        },
+    )
@@ -0,0 +1,251 @@
+"""
+작업(job) 상태 관리 + 렌더 워커 풀
+
+왜?
+- 렌더는 FFmpeg/LLM/TTS 호출 때문에 수십 초가 걸리는 "동기" 작업
+- async 라우트 안에서 그대로 돌리면 uvicorn 이벤트 루프가 통째로 막힘 (/health 포함)
+- 그래서 요청은 입력만 저장하고 job id를 바로 돌려주고,
+  실제 렌더는 이벤트 루프와 분리된 워커 풀(스레드)에서 돌린다
+
+상태는 프로세스 메모리에만 있음 (MVP). 결과 파일은 job 폴더에 남는다.
+- 끝난 job은 JOB_RETENTION_SEC/JOB_REGISTRY_MAX를 넘으면 메모리에서 정리
+  이후 조회는 job 폴더(final.mp4/render_error.txt)로 상태를 재구성
+- JOB_QUEUE=sqlite 면 /api/jobs는 job_queue.py(SQLite)에 넣고 별도 워커 프로세스가 처리
+  조회는 lookup()이 두 저장소를 모두 본다
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from backend.app.core.config import settings
+from backend.app.core.logger import get_logger
+from backend.app.services import supervisor
+from backend.app.services.storage import find_job_dir, public_video_path, render_error_path
+
+logger = get_logger(__name__)
+
+# 상태값
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_FINISHED = (DONE, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    job_id: str
+    status: str = QUEUED
+    stage: str = "queued"
+    progress: float = 0.0                   # 0.0 ~ 1.0
+    error: Optional[str] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    detail: Dict[str, Any] = field(default_factory=dict)   # 렌더 중 FFmpeg 진행 상세(frame/fps/speed ...)
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+
+class JobRegistry:
+    """
+    job 상태 저장소 (스레드 안전)
+
+    - 워커 스레드가 update()로 stage/progress를 갱신하고
+    - API는 get()으로 스냅샷을 읽는다
+    - create() 때 오래된 끝난 job을 정리 (대기/실행 중 job은 그대로)
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str) -> Job:
+        with self._lock:
+            self._evict_locked()
+            job = Job(job_id=job_id)
+            self._jobs[job_id] = job
+            return job
+
+    def _evict_locked(self) -> None:
+        # 끝난 job만, 오래된 것부터: 보관 시간이 지났거나 개수 상한을 넘은 만큼
+        finished = sorted(
+            (j for j in self._jobs.values() if j.status in _FINISHED),
+            key=lambda j: j.updated_at,
+        )
+        ttl = float(getattr(settings, "JOB_RETENTION_SEC", 3600))
+        over = len(self._jobs) + 1 - max(1, int(getattr(settings, "JOB_REGISTRY_MAX", 1000)))
+        now = time.time()
+        for k, job in enumerate(finished):
+            if k >= over and not (ttl > 0 and now - job.updated_at > ttl):
+                break
+            del self._jobs[job.job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            # 읽는 쪽에서 수정해도 원본이 안 바뀌게 복사본
+            return Job(**{**job.__dict__, "result": dict(job.result), "detail": dict(job.detail)})
+
+    def update(self, job_id: str, **changes: Any) -> None:
+        self.update_if(job_id, None, **changes)
+
+    def update_if(self, job_id: str, expected_status: Optional[str], **changes: Any) -> bool:
+        """
+        상태가 expected_status일 때만 갱신 (compare-and-set, None이면 무조건)
+
+        - 워커가 끝낸 직후 cancel()이 CANCELLED로 바꿨으면 DONE/FAILED로 덮어쓰지 않게
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            if expected_status is not None and job.status != expected_status:
+                return False
+            result = changes.pop("result", None)
+            for k, v in changes.items():
+                setattr(job, k, v)
+            if result:
+                job.result.update(result)
+            job.updated_at = time.time()
+            return True
+
+
+registry = JobRegistry()
+
+
+def lookup(job_id: str) -> Optional[Job]:
+    # 메모리 레지스트리 -> (켜져 있으면) SQLite 큐 -> job 폴더 순으로 조회
+    job = registry.get(job_id)
+    if job is not None:
+        return job
+    from backend.app.services import job_queue  # job_queue가 이 모듈을 import하므로 지연 import
+
+    if job_queue.enabled():
+        job = job_queue.get_queue().get(job_id)
+        if job is not None:
+            return job
+    return _from_disk(job_id)
+
+
+def _from_disk(job_id: str) -> Optional[Job]:
+    """
+    레지스트리에서 정리된 job을 결과 파일로 재구성 (/generate/{id}/status와 같은 기준)
+
+    - final.mp4가 있으면 완료, render_error.txt가 있으면 실패, 둘 다 없으면 모름(None)
+    """
+    job_dir = find_job_dir(job_id)
+    if job_dir is None:
+        return None
+    final_path = public_video_path(job_dir)
+    if final_path.exists():
+        from backend.app.services.pipeline import saved_result  # 렌더 모듈까지 끌고 오므로 지연 import
+
+        ts = final_path.stat().st_mtime
+        return Job(
+            job_id=job_id, status=DONE, stage="done", progress=1.0,
+            result=saved_result(job_dir), created_at=ts, updated_at=ts,
+        )
+    err_path = render_error_path(job_dir)
+    if err_path.exists():
+        ts = err_path.stat().st_mtime
+        return Job(
+            job_id=job_id, status=FAILED, stage="failed",
+            error=err_path.read_text(encoding="utf-8"), created_at=ts, updated_at=ts,
+        )
+    return None
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _worker_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            n = max(1, int(getattr(settings, "JOB_WORKERS", 2)))
+            _pool = ThreadPoolExecutor(max_workers=n, thread_name_prefix="render-job")
+        return _pool
+
+
+class Reporter:
+    """
+    파이프라인 쪽에서 진행상황을 알리는 콜백 묶음
+    - stage(name, progress): 단계 전환
+    - publish(**result): 중간 결과(미리보기 URL 등) 공개
+    - detail(**info): 렌더 진행 상세(frame/fps/speed ...) 교체
+    - 실행 중(RUNNING)일 때만 반영 (취소된 job의 단계가 다시 바뀌지 않게)
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+    def stage(self, name: str, progress: float) -> None:
+        registry.update_if(self.job_id, RUNNING, stage=name, progress=max(0.0, min(1.0, progress)))
+
+    def publish(self, **result: Any) -> None:
+        registry.update_if(self.job_id, RUNNING, result=result)
+
+    def detail(self, **info: Any) -> None:
+        registry.update_if(self.job_id, RUNNING, detail=info)
+
+
+def submit(job_id: str, fn: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any) -> Future:
+    """
+    워커 풀에 job 실행 예약
+
+    fn(*args, reporter=Reporter, **kwargs) 는 결과 dict를 리턴해야 함
+    """
+    if registry.get(job_id) is None:
+        registry.create(job_id)
+
+    def _run() -> None:
+        # 이 job에서 띄우는 FFmpeg/say는 cancel(job_id) 시 전부 kill
+        with supervisor.cancel_scope(job_id):
+            # 대기 중에 취소됐으면 시작하지 않음
+            if not registry.update_if(job_id, QUEUED, status=RUNNING, stage="start"):
+                return
+            try:
+                result = fn(*args, reporter=Reporter(job_id), **kwargs)
+            except supervisor.ProcessCancelled:
+                logger.info("job 취소됨(job=%s)", job_id)
+                registry.update(job_id, status=CANCELLED, stage="cancelled", error="취소됨")
+                return
+            except Exception as e:
+                logger.exception("job 실패(job=%s)", job_id)
+                registry.update_if(job_id, RUNNING, status=FAILED, stage="failed", error=str(e))
+                return
+        # 마지막 FFmpeg가 끝난 뒤 cancel()이 먼저 CANCELLED로 바꿨으면 결과를 공개하지 않음
+        if not registry.update_if(job_id, RUNNING, status=DONE, stage="done", progress=1.0, result=result or {}):
+            logger.info("job 완료 전에 취소됨 → 결과 버림(job=%s)", job_id)
+
+    return _worker_pool().submit(_run)
+
+
+def cancel(job_id: str) -> Optional[Job]:
+    """
+    job 취소 (대기 중이면 시작 안 함, 실행 중이면 FFmpeg/say를 kill)
+
+    - SQLite 큐 job이면 큐에 취소 표시 -> 워커가 heartbeat에서 보고 kill
+    - 이미 끝난 job은 그대로 (리턴값으로 상태 확인)
+    """
+    job = registry.get(job_id)
+    if job is not None:
+        if job.status in (QUEUED, RUNNING):
+            registry.update(job_id, status=CANCELLED, stage="cancelled", error="취소됨")
+            supervisor.cancel(job_id)
+        return registry.get(job_id)
+
+    from backend.app.services import job_queue  # 지연 import (lookup과 같은 이유)
+
+    if not job_queue.enabled():
+        return None
+    job_queue.get_queue().cancel(job_id)
+    return job_queue.get_queue().get(job_id)
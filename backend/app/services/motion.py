@@ -0,0 +1,169 @@
+"""
+컷 모션(Ken Burns) - OpenCV 백엔드
+
+왜 따로 만들었나?
+- FFmpeg zoompan은 느리고(프레임마다 expr 평가 + 전체 프레임 리샘플),
+  좌표를 정수 픽셀로 반올림해서 느린 줌에서 화면이 미세하게 떨림(jitter)
+- 그래서 컷마다 crop 사각형을 미리 다 계산해 두고,
+  미리 디코딩/정규화한 이미지 1장에서 warpAffine(서브픽셀)로 프레임을 만든 뒤
+  rawvideo로 FFmpeg stdin에 흘려보내 인코딩만 맡긴다
+
+프리셋은 video._effect_zoompan 과 같은 4종 (i % 4)
+- 0) 중앙 줌인 / 1) 오른쪽 포커스 / 2) 위쪽 포커스 / 3) 아래쪽 포커스
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from backend.app.core.logger import get_logger
+from backend.app.services.progress import with_progress
+from backend.app.services.scheduler import apply_thread_budget
+from backend.app.services.supervisor import Supervised, timeout_for
+
+logger = get_logger(__name__)
+
+MOTION_BACKENDS = ("zoompan", "opencv")
+
+
+@dataclass(frozen=True)
+class MotionPreset:
+    step: float   # 프레임당 줌 증가량 (zoompan의 zoom+step)
+    max_zoom: float
+    fx: float     # 줌 중심 x (0~1, 이미지 폭 기준)
+    fy: float     # 줌 중심 y (0~1, 이미지 높이 기준)
+
+
+# _effect_zoompan 과 같은 숫자 (z_fast / z_slow + 고정 오프셋)
+PRESETS = (
+    MotionPreset(step=0.0040, max_zoom=1.20, fx=0.50, fy=0.50),
+    MotionPreset(step=0.0030, max_zoom=1.16, fx=0.55, fy=0.50),
+    MotionPreset(step=0.0030, max_zoom=1.16, fx=0.50, fy=0.42),
+    MotionPreset(step=0.0030, max_zoom=1.16, fx=0.50, fy=0.62),
+)
+
+
+def normalize_backend(name: str) -> str:
+    # 알 수 없는 값이면 기본(zoompan)
+    name = (name or "").strip().lower()
+    return name if name in MOTION_BACKENDS else "zoompan"
+
+
+def crop_rects(i: int, w: int, h: int, frames: int) -> List[Tuple[float, float, float]]:
+    """
+    컷 i의 프레임별 crop 사각형 (x, y, zoom) 을 미리 계산
+
+    - zoompan과 같은 규칙: zoom = min(1 + step*(k+1), max_zoom)
+    - crop 크기 = (w/zoom, h/zoom), 중심 = (fx*w, fy*h), 이미지 밖으로는 안 나가게 clamp
+    - 정수로 반올림하지 않음 (warpAffine이 서브픽셀로 처리 -> 떨림 없음)
+    """
+    p = PRESETS[i % len(PRESETS)]
+    rects: List[Tuple[float, float, float]] = []
+    for k in range(frames):
+        z = min(1.0 + p.step * (k + 1), p.max_zoom)
+        cw, ch = w / z, h / z
+        x = min(max(p.fx * w - cw / 2, 0.0), w - cw)
+        y = min(max(p.fy * h - ch / 2, 0.0), h - ch)
+        rects.append((x, y, z))
+    return rects
+
+
+def load_canvas(image_path: Path, w: int, h: int, fit: str = "pad") -> np.ndarray:
+    """
+    이미지 1장을 w x h 캔버스로 정규화 (video._normalize_chain과 동일)
+    - fit="pad" : scale=decrease + 중앙 pad
+    - fit="crop": scale=increase + 중앙 crop
+    """
+    img = cv2.imread(str(image_path), cv2.IMREAD_COLOR)
+    if img is None:
+        raise RuntimeError(f"이미지를 읽을 수 없습니다: {image_path}")
+
+    ih, iw = img.shape[:2]
+    scale = max(w / iw, h / ih) if fit == "crop" else min(w / iw, h / ih)
+    nw, nh = max(1, int(round(iw * scale))), max(1, int(round(ih * scale)))
+    interp = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+    img = cv2.resize(img, (nw, nh), interpolation=interp)
+
+    if fit == "crop":
+        ox, oy = (nw - w) // 2, (nh - h) // 2
+        return np.ascontiguousarray(img[oy:oy + h, ox:ox + w])
+
+    canvas = np.zeros((h, w, 3), dtype=np.uint8)
+    ox, oy = (w - nw) // 2, (h - nh) // 2
+    canvas[oy:oy + nh, ox:ox + nw] = img
+    return canvas
+
+
+def render_segment_cv(
+    canvas: np.ndarray,
+    i: int,
+    out_clip: Path,
+    *,
+    fps: int,
+    frames: int,
+    ffmpeg_bin: str,
+    codec_args: List[str],
+    post_filter: str,
+) -> Path:
+    """
+    정규화된 캔버스 -> 컷 i 클립 (rawvideo를 FFmpeg stdin으로 스트리밍)
+
+    - 프레임 버퍼 1개를 계속 재사용 (프레임마다 새 배열 할당 X)
+    - post_filter: 색감 보정/픽셀포맷 등 FFmpeg 쪽에서 할 후처리 (-vf)
+    """
+    h, w = canvas.shape[:2]
+    out_clip.parent.mkdir(parents=True, exist_ok=True)
+
+    cmd = [
+        ffmpeg_bin, "-y",
+        "-loglevel", "error",
+        "-f", "rawvideo",
+        "-pix_fmt", "bgr24",
+        "-s", f"{w}x{h}",
+        "-r", str(fps),
+        "-i", "pipe:0",
+        "-vf", post_filter,
+        "-frames:v", str(frames),
+        *codec_args,
+        "-an",
+        str(out_clip),
+    ]
+    # 필터 스레드도 스케줄러가 이 작업에 준 몫만 (video._run과 같게)
+    cmd, on_progress = with_progress(apply_thread_budget(cmd))
+    logger.info("FFmpeg 실행(rawvideo stdin): %s", " ".join(cmd))
+
+    frame = np.empty((h, w, 3), dtype=np.uint8)
+    m = np.zeros((2, 3), dtype=np.float64)
+
+    # supervisor: 제한 시간/작업 취소 시 kill -> stdin 쓰기가 BrokenPipe로 끝나고 wait()가 원인을 올림
+    with Supervised(
+        cmd, label="ffmpeg", timeout=timeout_for("segment"), stdin=True, on_progress=on_progress
+    ) as sp:
+        try:
+            for x, y, z in crop_rects(i, w, h, frames):
+                # 출력 (u,v) <- 입력 (x + u/z, y + v/z)  ==  dst = src * z - (x,y) * z
+                m[0, 0] = z
+                m[1, 1] = z
+                m[0, 2] = -x * z
+                m[1, 2] = -y * z
+                cv2.warpAffine(
+                    canvas, m, (w, h),
+                    dst=frame,
+                    flags=cv2.INTER_LINEAR,
+                    borderMode=cv2.BORDER_REPLICATE,
+                )
+                sp.stdin.write(frame.data)
+            sp.stdin.close()
+        except BrokenPipeError:
+            # ffmpeg가 먼저 죽은 경우: 아래 returncode/stderr로 원인 보고
+            pass
+        result = sp.wait()
+
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed:\n{result.stderr_tail}")
+    return out_clip
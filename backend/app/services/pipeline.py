@@ -0,0 +1,813 @@
+"""
+광고 영상 생성 파이프라인 (동기)
+
+- routes.py에 있던 "카피 생성 -> 렌더 계획 -> 렌더" 흐름을 서비스로 분리
+- 렌더 전 준비 단계는 stages.py의 DAG 실행기로 (카피 생성과 사진 분석/컷 렌더를 동시에)
+- 동기 함수라서 이벤트 루프가 아니라 워커 풀(jobs.py)이나 threadpool에서 호출해야 함
+- reporter로 단계/진행률/중간 결과(미리보기 URL)를 알린다
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import re
+import shutil
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from backend.app.core.config import ASPECT_RATIOS, aspect_profile, get_encoding_profile, settings
+from backend.app.core.logger import get_logger
+from backend.app.services.image_analysis import analyze_images, select_shots
+from backend.app.services.ingest import ingest_images
+from backend.app.services.llm import LLMOutput, generate_copy
+from backend.app.services.plan import RenderPlan, plan_path, render_plan
+from backend.app.services.progress import progress_span
+from backend.app.services.scheduler import admit
+from backend.app.services.stages import Stage, run_stages
+from backend.app.services.supervisor import ProcessTimeout
+from backend.app.services.storage import (
+    aspect_video_path,
+    hls_dir,
+    preview_video_path,
+    public_video_path,
+    render_error_path,
+    variant_video_path,
+)
+from backend.app.services.tts import synthesize_voice_lines
+from backend.app.services.video import (
+    CaptionVariant,
+    prebuild_slideshow,
+    recaption_video,
+    render_aspects,
+    render_variants,
+    warm_caption_placement,
+)
+
+logger = get_logger(__name__)
+
+# 한 요청에서 만들 수 있는 톤 변형 최대 개수
+MAX_VARIANTS = 4
+
+
+@dataclass
+class GenerateRequest:
+    menu_name: str
+    store_name: Optional[str] = None
+    tone: str = "감성"
+    price: Optional[str] = None
+    location: Optional[str] = None
+    benefit: Optional[str] = None
+    cta: Optional[str] = None
+    motion: Optional[str] = None
+    profile: str = "standard"
+    preview: bool = False
+    variants: Optional[List[str]] = None    # 톤 A/B 테스트: 톤 목록 (첫 번째가 대표)
+    aspects: Optional[List[str]] = None     # 추가 화면비 ("1:1", "4:5", "16:9")
+
+
+class _NullReporter:
+    # reporter 없이 호출될 때(동기 /api/generate 등) 쓰는 빈 구현
+    def stage(self, name: str, progress: float) -> None:
+        pass
+
+    def publish(self, **result: Any) -> None:
+        pass
+
+    def detail(self, **info: Any) -> None:
+        pass
+
+
+def _project_root() -> Path:
+    """
+    pipeline.py 위치: backend/app/services/pipeline.py
+    parents[0]=services, [1]=app, [2]=backend, [3]=PROJECT_ROOT
+    """
+    return Path(__file__).resolve().parents[3]
+
+
+def _normalize_for_tts(s: str) -> str:
+    """
+    TTS가 또박또박 읽게끔 최소 보정
+    - 너무 공격적으로 정리하면 감성(…/이모지)이 죽으니 최소만
+    """
+    s = (s or "").strip()
+    s = re.sub(r"\s+", " ", s)
+    s = s.replace("…", ".")
+    s = s.replace("·", " ")
+    return s.strip()
+
+
+def _safe_segments() -> int:
+    """
+    settings.VIDEO_SEGMENTS가 없거나 이상한 값이면 6으로 안전하게 보정
+    """
+    try:
+        v = int(getattr(settings, "VIDEO_SEGMENTS", 6))
+    except Exception:
+        v = 6
+    return max(1, min(12, v))  # 너무 많으면 오히려 산만해져서 상한 12
+
+
+def _pick_bgm() -> Optional[Path]:
+    # BGM 선택: 실행 위치 상관없이 프로젝트 루트 기준
+    bgm_dir = _project_root() / "assets" / "bgm"
+    bgm_candidates = list(bgm_dir.glob("*.mp3")) + list(bgm_dir.glob("*.wav"))
+    return bgm_candidates[0] if bgm_candidates else None
+
+
+def video_url(path: Path) -> str:
+    # outputs/<job_id>/artifacts/xxx.mp4 -> /outputs/<job_id>/artifacts/xxx.mp4
+    rel = path.resolve().relative_to(Path(settings.OUTPUT_DIR).resolve())
+    return f"/outputs/{rel.as_posix()}"
+
+
+def clean_caption_lines(llm_out: LLMOutput, target_cuts: int) -> List[str]:
+    caption_lines = (llm_out.caption_lines or [])[:target_cuts]
+    if len(caption_lines) < target_cuts:
+        caption_lines += [""] * (target_cuts - len(caption_lines))
+
+    # 빈 줄 제거 (자막/내레이션 둘 다 깔끔)
+    caption_lines_clean = [_normalize_for_tts(s) for s in caption_lines if s and s.strip()]
+
+    # 완전 빈 경우 대비
+    if not caption_lines_clean:
+        fallback = _normalize_for_tts(llm_out.promo_text) if getattr(llm_out, "promo_text", "") else ""
+        caption_lines_clean = [fallback] if fallback else ["지금 바로 방문해보세요!"]
+    return caption_lines_clean
+
+
+def _select_cuts(img_paths: List[Path]) -> Tuple[List[Path], List[Dict[str, Any]]]:
+    """
+    사진 분석 1회 (흐림/노출/중복 검사 + 자막 위치용 밴드 점수) -> 컷 순서
+
+    - 쇼츠 템포용 컷 수에 맞춰, 이미지가 적으면 반복 (템포 유지)
+    - 리턴: (컷별 사진 경로, 사진별 분석 결과)
+    """
+    image_report: List[Dict[str, Any]] = []
+    if getattr(settings, "IMAGE_ANALYSIS", True):
+        reports = analyze_images(img_paths)
+        img_paths = select_shots(reports, min_keep=min(3, len(img_paths)))
+        image_report = [r.to_dict() for r in reports]
+
+    target_cuts = _safe_segments()
+    return [img_paths[i % len(img_paths)] for i in range(target_cuts)], image_report
+
+
+def _synthesize_narration(
+    job_dir: Path,
+    lines: List[str],
+    name: str = "tts",
+) -> Tuple[Optional[Path], Optional[List[Tuple[float, float]]]]:
+    # TTS (줄별 생성 → 싱크 정확). TTS_ENABLED=false(기본)면 무음 내레이션
+    if not getattr(settings, "TTS_ENABLED", False):
+        return None, None
+    voice_path, timings = synthesize_voice_lines(lines, job_dir / "artifacts" / name)
+    return voice_path, (timings or None)
+
+
+_RECAPTION_TTS_PREFIX = "tts_recaption_"
+
+
+def _recaption_tts_dir(job_dir: Path) -> Path:
+    # 재자막 내레이션용 새 폴더 (artifacts/tts_recaption_<n>, 기존 것과 겹치지 않게)
+    artifacts = job_dir / "artifacts"
+    used = [
+        int(p.name[len(_RECAPTION_TTS_PREFIX):])
+        for p in artifacts.glob(f"{_RECAPTION_TTS_PREFIX}*")
+        if p.name[len(_RECAPTION_TTS_PREFIX):].isdigit()
+    ]
+    return artifacts / f"{_RECAPTION_TTS_PREFIX}{max(used, default=0) + 1}"
+
+
+def _generate_copy(req: GenerateRequest, tone: str, n_lines: int) -> LLMOutput:
+    # LLM 카피 생성 (컷 수 = 캡션 줄 수)
+    return generate_copy(
+        menu_name=req.menu_name,
+        store_name=req.store_name,
+        tone=tone,
+        n_lines=n_lines,
+        price=req.price,
+        location=req.location,
+        benefit=req.benefit,
+        cta=req.cta,
+    )
+
+
+def _variant_tones(req: GenerateRequest) -> List[str]:
+    # 만들 톤 목록 (중복 제거, 최대 MAX_VARIANTS개). variants가 없으면 req.tone 1개
+    tones = [t.strip() for t in (req.variants or []) if t and t.strip()]
+    tones = list(dict.fromkeys(tones))[:MAX_VARIANTS]
+    return tones or [req.tone]
+
+
+def _stage_name(base: str, k: int) -> str:
+    # 대표(0번) 톤은 기존 단계 이름 그대로, 나머지는 copy_1, tts_2 ...
+    return base if k == 0 else f"{base}_{k}"
+
+
+def prepare_plan(job_dir: Path, img_paths: List[Path], req: GenerateRequest, reporter=None) -> RenderPlan:
+    """
+    컷 구성 + 카피 생성 + 렌더 계획 저장 (렌더 직전까지)
+
+    단계 그래프 (stages.run_stages로 독립 단계는 동시에 실행)
+        ingest -> cuts -> placement
+                       -> slideshow (segmented 모드일 때 컷 미리 렌더, 미리보기 모드면 생략, 실패해도 계속)
+        copy  -> lines -> tts          (톤 변형이 있으면 톤마다 copy_k/lines_k/tts_k)
+        (cuts, copy*, lines*, tts*) -> plan
+    - 카피(LLM) 대기 시간 동안 사진 분석/자막 위치 분석/컷 렌더가 같이 돈다
+    - 계획의 lines/timings/voice는 대표 톤, 톤 변형 전체는 extra["variants"]
+    """
+    reporter = reporter or _NullReporter()
+    artifacts = job_dir / "artifacts"
+    profile = get_encoding_profile(req.profile)
+    target_cuts = _safe_segments()
+    tones = _variant_tones(req)
+
+    def _plan(cuts, **per_tone) -> RenderPlan:
+        image_paths_for_video, image_report = cuts
+        bgm_path = _pick_bgm()
+
+        variants: List[Dict[str, Any]] = []
+        for k, tone in enumerate(tones):
+            copy = per_tone[_stage_name("copy", k)]
+            lines = per_tone[_stage_name("lines", k)]
+            voice_path, timings = per_tone[_stage_name("tts", k)]
+            variants.append({
+                "tone": tone,
+                "lines": lines,
+                "timings": timings,
+                "voice_path": str(voice_path) if voice_path else None,
+                "caption_text": "\n".join(lines),
+                "hashtags": list(copy.hashtags or []),
+            })
+        main = variants[0]
+
+        logger.info(
+            "AUDIO DEBUG | voice_path=%s exists=%s | bgm_path=%s exists=%s",
+            main["voice_path"],
+            bool(main["voice_path"] and Path(main["voice_path"]).exists()),
+            str(bgm_path) if bgm_path else None,
+            bool(bgm_path and Path(bgm_path).exists()),
+        )
+
+        extra: Dict[str, Any] = {
+            # 프론트에 보여줄 전체 카피 텍스트(복사/공유용)
+            "caption_text": main["caption_text"],
+            "hashtags": main["hashtags"],
+            # 사진별 분석 결과 (흐림/노출/중복 판정 근거)
+            "image_report": image_report,
+            # 재자막(recaption) 때 카피를 다시 만들 입력
+            "request": asdict(req),
+        }
+        if len(variants) > 1:
+            extra["variants"] = variants
+        aspects = [a for a in dict.fromkeys(req.aspects or []) if a in ASPECT_RATIOS]
+        if aspects:
+            extra["aspects"] = aspects
+
+        return RenderPlan(
+            images=[str(p) for p in image_paths_for_video],
+            lines=main["lines"],
+            timings=main["timings"],
+            voice_path=main["voice_path"],
+            bgm_path=str(bgm_path) if bgm_path else None,
+            motion_backend=req.motion,
+            profile=req.profile,
+            extra=extra,
+        )
+
+    def _slideshow(cuts):
+        """
+        최종 해상도 슬라이드쇼 선렌더 (최적화일 뿐 -> 실패해도 job은 계속)
+
+        - 미리보기 모드면 건너뜀: 미리보기(저해상도)가 이 렌더를 기다리면 빠른 미리보기가 의미 없음
+        - 실패하면 render_video가 원래대로 segmented -> legacy fallback
+        """
+        if req.preview:
+            return None
+        try:
+            # 슬라이드쇼 선렌더도 CPU를 쓰므로 스케줄러 자리를 잡고
+            # 진행률은 준비 단계(run_stages) 몫이라 상세/배속만
+            with admit(f"{job_dir.name}:slideshow"), progress_span("slideshow", reporter=reporter):
+                return prebuild_slideshow(cuts[0], artifacts, motion_backend=req.motion, profile=profile)
+        except ProcessTimeout:
+            # 선렌더가 제한 시간을 넘겼으면 최종 렌더에서 같은 일을 또 기다리지 않고 job 실패
+            raise
+        except RuntimeError as e:
+            # ProcessCancelled는 RuntimeError가 아니라 그대로 올라감 (취소는 job 전체 중단)
+            logger.warning("슬라이드쇼 선렌더 실패 → 최종 렌더에서 다시 시도: %s", e)
+            return None
+
+    stages = [
+        # 큰 사진은 렌더에 필요한 해상도(출력 x 최대줌)로 한 번만 줄여 둠
+        Stage("ingest", lambda: ingest_images(img_paths, profile=profile, aspects=req.aspects)),
+        Stage("cuts", lambda ingest: _select_cuts(ingest), needs=("ingest",)),
+        Stage("placement", lambda cuts: warm_caption_placement(cuts[0], profile), needs=("cuts",)),
+        Stage("slideshow", _slideshow, needs=("cuts",)),
+    ]
+    per_tone_needs: List[str] = []
+    for k, tone in enumerate(tones):
+        copy_n, lines_n, tts_n = (_stage_name(b, k) for b in ("copy", "lines", "tts"))
+        stages += [
+            Stage(copy_n, lambda tone=tone: _generate_copy(req, tone, target_cuts)),
+            Stage(
+                lines_n,
+                lambda copy_n=copy_n, **deps: clean_caption_lines(deps[copy_n], target_cuts),
+                needs=(copy_n,),
+            ),
+            Stage(
+                tts_n,
+                lambda lines_n=lines_n, tts_n=tts_n, **deps: _synthesize_narration(job_dir, deps[lines_n], tts_n),
+                needs=(lines_n,),
+            ),
+        ]
+        per_tone_needs += [copy_n, lines_n, tts_n]
+    stages.append(Stage("plan", _plan, needs=("cuts", *per_tone_needs)))
+
+    out = run_stages(stages, reporter=reporter, progress=(0.02, 0.12))
+
+    # 계획은 job 폴더에 저장 -> 미리보기/최종 렌더가 같은 입력을 씀
+    plan: RenderPlan = out.values["plan"]
+    plan.extra["stage_timings"] = {k: round(v, 3) for k, v in out.timings.items()}
+    plan.save(plan_path(job_dir))
+    return plan
+
+
+def _hls_work_dir(job_dir: Path) -> Optional[Path]:
+    # HLS를 쓸 임시 폴더 (HLS_ENABLED가 아니면 None)
+    if not getattr(settings, "HLS_ENABLED", False):
+        return None
+    tmp = hls_dir(job_dir).with_name("hls.partial")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True, exist_ok=True)
+    return tmp
+
+
+def _publish_hls(job_dir: Path, tmp: Optional[Path]) -> Optional[str]:
+    """
+    임시 폴더의 HLS를 artifacts/hls로 교체하고 master.m3u8 URL을 리턴
+
+    - master.m3u8이 없으면(3단계 fallback 렌더 등) 임시 폴더만 지우고 None
+    """
+    if tmp is None:
+        return None
+    if not (tmp / "master.m3u8").exists():
+        shutil.rmtree(tmp, ignore_errors=True)
+        return None
+    final = hls_dir(job_dir)
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    return video_url(final / "master.m3u8")
+
+
+def hls_url(job_dir: Path) -> Optional[str]:
+    # 이미 만들어진 HLS가 있으면 master.m3u8 URL
+    master = hls_dir(job_dir) / "master.m3u8"
+    return video_url(master) if master.exists() else None
+
+
+def saved_result(job_dir: Path) -> Dict[str, Any]:
+    """
+    디스크에 남은 결과(plan.json + final.mp4)로 GenerateResponse dict 재구성
+
+    - 메모리 레지스트리에서 정리된 job 조회용 (jobs.lookup)
+    - 추가 화면비/톤 변형은 파일이 있는 것만
+    """
+    try:
+        extra = RenderPlan.load(plan_path(job_dir)).extra
+    except (OSError, ValueError):
+        extra = {}
+    preview_path = preview_video_path(job_dir)
+    aspects = []
+    for a in extra.get("aspects", []):
+        p = aspect_video_path(job_dir, a)
+        if p.exists():
+            aspects.append({"aspect": a, "video_url": video_url(p)})
+    result: Dict[str, Any] = {
+        "job_id": job_dir.name,
+        "video_url": video_url(public_video_path(job_dir)),
+        "caption_text": extra.get("caption_text", ""),
+        "hashtags": extra.get("hashtags", []),
+        "preview_url": video_url(preview_path) if preview_path.exists() else None,
+        "final_ready": True,
+        "aspects": aspects,
+        "hls_url": hls_url(job_dir),
+    }
+    variants = _variant_results(job_dir, extra.get("variants") or [])
+    if variants:
+        result["variants"] = variants
+    return result
+
+
+def render_final(job_dir: Path, *, reporter=None) -> Dict[str, Any]:
+    """
+    저장된 계획으로 원본 해상도 최종본 렌더
+
+    - 실패하면 에러를 파일로도 남김 (미리보기 후 백그라운드로 돌 때 상태 조회용)
+    - HLS_ENABLED면 같은 FFmpeg 실행에서 HLS 사다리도 (멀티 화면비 렌더는 기본 화면비로)
+    """
+    reporter = reporter or _NullReporter()
+    aspects: List[Dict[str, Any]] = []
+    try:
+        with admit(f"{job_dir.name}:final", reporter=reporter, progress=0.35), \
+                progress_span("render", reporter=reporter, lo=0.35, hi=0.97):
+            reporter.stage("render", 0.35)
+            plan = RenderPlan.load(plan_path(job_dir))
+            hls_tmp = _hls_work_dir(job_dir)
+            if plan.extra.get("aspects"):
+                aspects = render_aspect_set(job_dir, plan, hls_tmp=hls_tmp)
+                final_path = public_video_path(job_dir)
+            else:
+                final_path = render_plan(
+                    plan, job_dir / "artifacts", public_video_path(job_dir), hls_dir=hls_tmp
+                )
+            hls = _publish_hls(job_dir, hls_tmp)
+    except Exception as e:
+        render_error_path(job_dir).write_text(str(e), encoding="utf-8")
+        raise
+    logger.info("최종 렌더 완료(job=%s)", job_dir.name)
+    return {
+        "video_url": video_url(final_path),
+        "final_ready": True,
+        "aspects": aspects,
+        "hls_url": hls,
+    }
+
+
+def render_aspect_set(
+    job_dir: Path,
+    plan: RenderPlan,
+    *,
+    hls_tmp: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """
+    기본 화면비(final.mp4) + 추가 화면비들을 한 번에 렌더
+
+    - 화면비마다 scale/crop + 모션 + 자막(위치 재계산) 갈래 (모션 백엔드/렌더 방식은 render_plan과 같음)
+    - hls_tmp가 있으면 기본 화면비로 HLS 사다리도 그 폴더에 씀 (교체는 호출자 몫)
+    - 한 그래프 렌더가 실패하면 화면비별 render_plan으로 fallback
+    - 리턴: [{"aspect": "1:1", "video_url": ...}, ...] (추가 화면비만)
+    """
+    base = get_encoding_profile(plan.profile)
+    extra_aspects = [a for a in plan.extra.get("aspects", []) if aspect_profile(base, a) is not base]
+    outputs = [(base, public_video_path(job_dir))] + [
+        (aspect_profile(base, a), aspect_video_path(job_dir, a)) for a in extra_aspects
+    ]
+    tmp_outputs = [(p, out.with_name(f"{out.stem}.partial{out.suffix}")) for p, out in outputs]
+    work_dir = job_dir / "artifacts"
+
+    try:
+        render_aspects(
+            [Path(p) for p in plan.images],
+            plan.lines,
+            tmp_outputs,
+            work_dir,
+            timings=plan.timings,
+            voice_path=Path(plan.voice_path) if plan.voice_path else None,
+            bgm_path=Path(plan.bgm_path) if plan.bgm_path else None,
+            motion_backend=plan.motion_backend,
+            hls_dir=hls_tmp,
+        )
+    except ProcessTimeout:
+        raise
+    except RuntimeError as e:
+        logger.warning("화면비 일괄 렌더 실패 → 화면비별 렌더로 fallback: %s", e)
+        if hls_tmp is not None:
+            shutil.rmtree(hls_tmp, ignore_errors=True)
+            hls_tmp.mkdir(parents=True, exist_ok=True)
+        (base_profile, base_tmp), *rest = tmp_outputs
+        render_plan(plan, work_dir, base_tmp, profile=base_profile, hls_dir=hls_tmp)
+        for profile, tmp in rest:
+            render_plan(plan, work_dir / f"aspect_{profile.size}", tmp, profile=profile)
+
+    for (_p, tmp), (_p2, out) in zip(tmp_outputs, outputs):
+        os.replace(tmp, out)
+    logger.info("화면비 %d개 렌더 완료(job=%s)", len(outputs), job_dir.name)
+    return [
+        {"aspect": a, "video_url": video_url(out)}
+        for a, (_p, out) in zip(extra_aspects, outputs[1:])
+    ]
+
+
+def render_variant_set(job_dir: Path, plan: RenderPlan, *, reporter=None) -> List[Dict[str, Any]]:
+    """
+    톤 변형 N개를 한 번에 렌더 (사진 디코딩/모션은 1회, 자막 갈래만 N개)
+
+    - 0번(대표) 톤은 final.mp4, 나머지는 variants/final_<k>.mp4
+    - 모션 백엔드/렌더 방식은 변형 없는 job과 같음 (HLS_ENABLED면 0번으로 HLS도)
+    - 한 그래프 렌더가 실패하면 변형마다 render_plan으로 fallback
+    """
+    reporter = reporter or _NullReporter()
+    variants = plan.extra.get("variants") or []
+    paths = [public_video_path(job_dir)] + [variant_video_path(job_dir, k) for k in range(1, len(variants))]
+
+    work_dir = job_dir / "artifacts"
+    profile = get_encoding_profile(plan.profile)
+    images = [Path(p) for p in plan.images]
+    tmp_paths = [p.with_name(f"{p.stem}.partial{p.suffix}") for p in paths]
+    hls_tmp = _hls_work_dir(job_dir)
+    try:
+        with admit(f"{job_dir.name}:variants", reporter=reporter, progress=0.35), \
+                progress_span("render", reporter=reporter, lo=0.35, hi=0.97):
+            reporter.stage("render", 0.35)
+            try:
+                render_variants(
+                    images,
+                    [
+                        CaptionVariant(
+                            lines=v["lines"],
+                            out_video=tmp,
+                            timings=[tuple(t) for t in v["timings"]] if v.get("timings") else None,
+                            voice_path=Path(v["voice_path"]) if v.get("voice_path") else None,
+                        )
+                        for v, tmp in zip(variants, tmp_paths)
+                    ],
+                    work_dir,
+                    bgm_path=Path(plan.bgm_path) if plan.bgm_path else None,
+                    profile=profile,
+                    motion_backend=plan.motion_backend,
+                    hls_dir=hls_tmp,
+                )
+            except ProcessTimeout:
+                # 제한 시간 초과는 변형별로 N번 다시 돌리지 않음
+                raise
+            except RuntimeError as e:
+                logger.warning("변형 일괄 렌더 실패 → 변형별 렌더로 fallback: %s", e)
+                hls_tmp = _hls_work_dir(job_dir)
+                for k, (v, tmp) in enumerate(zip(variants, tmp_paths)):
+                    one = RenderPlan(**{
+                        **asdict(plan),
+                        "lines": v["lines"],
+                        "timings": v.get("timings"),
+                        "voice_path": v.get("voice_path"),
+                    })
+                    render_plan(one, work_dir / f"variant_{k}", tmp, hls_dir=hls_tmp if k == 0 else None)
+        for tmp, final in zip(tmp_paths, paths):
+            os.replace(tmp, final)
+        _publish_hls(job_dir, hls_tmp)
+    except Exception as e:
+        render_error_path(job_dir).write_text(str(e), encoding="utf-8")
+        raise
+
+    logger.info("톤 변형 %d개 렌더 완료(job=%s)", len(variants), job_dir.name)
+    return [
+        {
+            "tone": v["tone"],
+            "video_url": video_url(p),
+            "caption_text": v["caption_text"],
+            "hashtags": v["hashtags"],
+        }
+        for v, p in zip(variants, paths)
+    ]
+
+
+def run_generate(
+    job_dir: Path,
+    img_paths: List[Path],
+    req: GenerateRequest,
+    *,
+    reporter=None,
+    include_final: bool = True,
+) -> Dict[str, Any]:
+    """
+    전체 생성: 카피 -> (미리보기) -> 최종 렌더
+
+    - include_final=False면 미리보기까지만 하고 리턴 (최종본은 호출자가 따로 예약)
+    - 리턴값은 GenerateResponse 필드와 같은 dict
+    """
+    reporter = reporter or _NullReporter()
+
+    plan = prepare_plan(job_dir, img_paths, req, reporter)
+
+    result: Dict[str, Any] = {
+        "job_id": job_dir.name,
+        "video_url": video_url(public_video_path(job_dir)),
+        "caption_text": plan.extra.get("caption_text", ""),
+        "hashtags": plan.extra.get("hashtags", []),
+        "preview_url": None,
+        "final_ready": False,
+    }
+    reporter.publish(**result)
+
+    if plan.extra.get("variants"):
+        # 톤 변형 모드: 미리보기 없이 N개를 한 번에
+        result["variants"] = render_variant_set(job_dir, plan, reporter=reporter)
+        result["final_ready"] = True
+        result["hls_url"] = hls_url(job_dir)
+        return result
+
+    if req.preview:
+        # 미리보기(저해상도/저비트레이트)를 먼저 만들어 공개
+        with admit(f"{job_dir.name}:preview", reporter=reporter, progress=0.15), \
+                progress_span("preview", reporter=reporter, lo=0.15, hi=0.35):
+            reporter.stage("preview", 0.15)
+            preview_path = render_plan(
+                plan,
+                job_dir / "artifacts" / "preview",
+                preview_video_path(job_dir),
+                profile_name=getattr(settings, "PREVIEW_PROFILE", "preview"),
+            )
+        result["preview_url"] = video_url(preview_path)
+        reporter.publish(preview_url=result["preview_url"])
+
+    if include_final:
+        result.update(render_final(job_dir, reporter=reporter))
+    return result
+
+
+class RecaptionBusy(Exception):
+    """같은 job의 재자막이 이미 진행 중"""
+
+
+@contextmanager
+def _recaption_lock(job_dir: Path) -> Iterator[None]:
+    """
+    job 1개당 재자막 1개만 (caption_XX.png / *.partial.mp4 / plan.json을 같이 씀)
+
+    - flock이라 API 프로세스가 여러 개여도 막히고, 프로세스가 죽으면 자동으로 풀림
+    - 이미 잡혀 있으면 기다리지 않고 RecaptionBusy
+    """
+    f = open(job_dir / ".recaption.lock", "w")
+    try:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RecaptionBusy(f"이미 재자막 중입니다: {job_dir.name}")
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    finally:
+        f.close()
+
+
+def recaption(
+    job_dir: Path,
+    *,
+    lines: Optional[List[str]] = None,
+    tone: Optional[str] = None,
+    reporter=None,
+) -> Dict[str, Any]:
+    """
+    카피/톤만 바꿔서 최종본 다시 만들기 (슬라이드쇼는 재사용)
+
+    - lines가 있으면 그 문구 그대로, 없으면 tone으로 카피를 다시 생성
+    - artifacts/silent.mp4 재사용 -> 자막 + 오디오만 1회 인코딩
+    - 추가 화면비가 있던 job이면 화면비 출력도 새 문구로 같이 다시 렌더
+    - 톤 변형 job이면 0번(대표) 변형 정보만 갱신 (나머지 변형은 각자 톤의 문구 그대로)
+    - 계획(plan.json)도 새 카피로 갱신
+    - 같은 job을 동시에 재자막하면 RecaptionBusy
+    """
+    with _recaption_lock(job_dir):
+        return _recaption(job_dir, lines=lines, tone=tone, reporter=reporter or _NullReporter())
+
+
+def _recaption(
+    job_dir: Path,
+    *,
+    lines: Optional[List[str]],
+    tone: Optional[str],
+    reporter,
+) -> Dict[str, Any]:
+    plan = RenderPlan.load(plan_path(job_dir))
+    target_cuts = len(plan.images)
+
+    if lines:
+        new_lines = [_normalize_for_tts(s) for s in lines if s and s.strip()]
+        if not new_lines:
+            raise ValueError("자막 문구가 비어 있습니다.")
+        hashtags = plan.extra.get("hashtags", [])
+    else:
+        stored = plan.extra.get("request")
+        if not stored:
+            raise ValueError("이 작업은 원래 입력이 저장돼 있지 않아 카피를 다시 만들 수 없습니다.")
+        req = GenerateRequest(**{**stored, "tone": (tone or stored.get("tone") or "감성")})
+        reporter.stage("copy", 0.1)
+        llm_out = _generate_copy(req, req.tone, target_cuts)
+        new_lines = clean_caption_lines(llm_out, target_cuts)
+        hashtags = list(llm_out.hashtags or [])
+        plan.extra["request"] = asdict(req)
+
+    plan.lines = new_lines
+    plan.extra["caption_text"] = "\n".join(new_lines)
+    plan.extra["hashtags"] = hashtags
+
+    # 문구가 바뀌면 내레이션도 다시 (TTS 캐시 hit이면 금방)
+    # - 새 폴더에 합성: 기존 artifacts/tts/voice.wav를 덮어쓰면 실패 시 원래 내레이션이 사라짐
+    # - plan(.json)에는 렌더가 성공한 뒤에만 반영
+    render_with = plan
+    tts_dir: Optional[Path] = None
+    if getattr(settings, "TTS_ENABLED", False):
+        reporter.stage("tts", 0.3)
+        tts_dir = _recaption_tts_dir(job_dir)
+        voice_path, timings = _synthesize_narration(job_dir, new_lines, name=tts_dir.name)
+        if voice_path is not None and timings:
+            render_with = replace(plan, voice_path=str(voice_path), timings=timings)
+        else:
+            # 줄이 하나도 합성되지 않으면 voice.wav는 0.2초 무음 -> 실패로 보고 기존 것 유지
+            shutil.rmtree(tts_dir, ignore_errors=True)
+            tts_dir = None
+            if plan.voice_path:
+                logger.warning("재자막: 내레이션 생성 결과 없음 → 기존 내레이션 유지(job=%s)", job_dir.name)
+    elif plan.voice_path:
+        # TTS가 꺼져 있으면 새로 만들 수 없음 -> 기존 내레이션/타이밍을 그대로 (버리면 무음이 됨)
+        logger.warning("재자막: TTS_ENABLED=false → 기존 내레이션 유지(job=%s)", job_dir.name)
+
+    final_path = public_video_path(job_dir)
+    aspects: List[Dict[str, Any]] = []
+    hls: Optional[str] = None
+    try:
+        with admit(f"{job_dir.name}:recaption", reporter=reporter, progress=0.5), \
+                progress_span("recaption", reporter=reporter, lo=0.5, hi=0.97):
+            reporter.stage("recaption", 0.5)
+            hls_tmp = _hls_work_dir(job_dir)
+            if plan.extra.get("aspects"):
+                # 화면비 출력도 새 문구로 (render_final과 같은 경로)
+                aspects = render_aspect_set(job_dir, render_with, hls_tmp=hls_tmp)
+            else:
+                tmp_out = final_path.with_name(f"{final_path.stem}.partial{final_path.suffix}")
+                recaption_video(
+                    [Path(p) for p in plan.images],
+                    plan.lines,
+                    job_dir / "artifacts",
+                    tmp_out,
+                    timings=render_with.timings,
+                    voice_path=Path(render_with.voice_path) if render_with.voice_path else None,
+                    bgm_path=Path(plan.bgm_path) if plan.bgm_path else None,
+                    motion_backend=plan.motion_backend,
+                    profile=get_encoding_profile(plan.profile),
+                    hls_dir=hls_tmp,
+                )
+                os.replace(tmp_out, final_path)
+            hls = _publish_hls(job_dir, hls_tmp)
+            if hls is None:
+                # 예전 문구로 만든 HLS가 남아 있으면 mp4와 달라짐
+                shutil.rmtree(hls_dir(job_dir), ignore_errors=True)
+    except BaseException:
+        if tts_dir is not None:
+            shutil.rmtree(tts_dir, ignore_errors=True)
+        raise
+
+    if render_with is not plan:
+        # 이전 재자막 내레이션 폴더는 정리 (처음 생성한 artifacts/tts는 그대로)
+        prev = Path(plan.voice_path).parent if plan.voice_path else None
+        plan.voice_path = render_with.voice_path
+        plan.timings = render_with.timings
+        if prev is not None and prev.name.startswith(_RECAPTION_TTS_PREFIX) and prev != tts_dir:
+            shutil.rmtree(prev, ignore_errors=True)
+
+    variants = _recaption_variants(job_dir, plan, tone)
+    render_error_path(job_dir).unlink(missing_ok=True)
+    plan.save(plan_path(job_dir))
+    logger.info("재자막 완료(job=%s)", job_dir.name)
+
+    result: Dict[str, Any] = {
+        "job_id": job_dir.name,
+        "video_url": video_url(final_path),
+        "caption_text": plan.extra["caption_text"],
+        "hashtags": hashtags,
+        "preview_url": None,
+        "final_ready": True,
+        "aspects": aspects,
+        "hls_url": hls,
+    }
+    if variants:
+        result["variants"] = variants
+    return result
+
+
+def _recaption_variants(job_dir: Path, plan: RenderPlan, tone: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    톤 변형 job: 0번 변형(= final.mp4)을 새 카피로 갱신하고 변형 결과 목록 리턴
+
+    - 1번 이후 변형은 자기 톤의 문구/영상 그대로라 다시 렌더하지 않음
+    """
+    variants = plan.extra.get("variants") or []
+    if not variants:
+        return []
+    variants[0].update({
+        "tone": tone or variants[0]["tone"],
+        "lines": plan.lines,
+        "timings": plan.timings,
+        "voice_path": plan.voice_path,
+        "caption_text": plan.extra["caption_text"],
+        "hashtags": plan.extra["hashtags"],
+    })
+    return _variant_results(job_dir, variants)
+
+
+def _variant_results(job_dir: Path, variants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # plan.extra["variants"] -> 응답용 변형 목록 (0번 = final.mp4)
+    paths = [public_video_path(job_dir)] + [variant_video_path(job_dir, k) for k in range(1, len(variants))]
+    return [
+        {
+            "tone": v["tone"],
+            "video_url": video_url(p),
+            "caption_text": v["caption_text"],
+            "hashtags": v["hashtags"],
+        }
+        for v, p in zip(variants, paths)
+    ]
@@ -0,0 +1,87 @@
+"""
+렌더 계획(plan) 저장/실행
+
+왜 필요?
+- 미리보기(저해상도)와 최종본(원본 해상도)은 "같은 계획"을 프로필만 바꿔 두 번 렌더하는 것
+- 계획을 job 폴더(artifacts/plan.json)에 남겨두면
+  백그라운드 렌더/재렌더가 요청 스택 없이도 같은 입력으로 다시 돌 수 있음
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from backend.app.core.config import EncodingProfile, get_encoding_profile
+from backend.app.core.logger import get_logger
+from backend.app.services.video import render_video
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RenderPlan:
+    images: List[str]                       # 컷 순서대로 (반복 포함)
+    lines: List[str]                        # 자막 줄
+    timings: Optional[List[Tuple[float, float]]] = None
+    voice_path: Optional[str] = None
+    bgm_path: Optional[str] = None
+    motion_backend: Optional[str] = None
+    profile: str = "standard"
+    extra: dict = field(default_factory=dict)   # 응답 재구성용(카피/해시태그 등)
+
+    def save(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(asdict(self), ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "RenderPlan":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("timings"):
+            data["timings"] = [tuple(t) for t in data["timings"]]
+        return cls(**data)
+
+
+def plan_path(job_dir: Path) -> Path:
+    return job_dir / "artifacts" / "plan.json"
+
+
+def render_plan(
+    plan: RenderPlan,
+    work_dir: Path,
+    out_video: Path,
+    *,
+    profile_name: Optional[str] = None,
+    profile: Optional[EncodingProfile] = None,
+    hls_dir: Optional[Path] = None,
+) -> Path:
+    """
+    계획대로 렌더 (profile/profile_name이 있으면 계획의 프로필 대신 사용)
+
+    - 결과는 임시 파일로 만든 뒤 os.replace -> out_video가 "보이면 완성본"이 보장됨
+      (백그라운드 렌더 중에 상태 조회가 반쯤 쓰인 파일을 완료로 착각하지 않게)
+    - hls_dir가 있으면 같은 실행에서 HLS 사다리도 그 폴더에 씀 (교체는 호출자 몫)
+    """
+    work_dir.mkdir(parents=True, exist_ok=True)
+    tmp_out = out_video.with_name(f"{out_video.stem}.partial{out_video.suffix}")
+
+    render_video(
+        [Path(p) for p in plan.images],
+        plan.lines,
+        work_dir,
+        tmp_out,
+        timings=plan.timings,
+        voice_path=Path(plan.voice_path) if plan.voice_path else None,
+        bgm_path=Path(plan.bgm_path) if plan.bgm_path else None,
+        motion_backend=plan.motion_backend,
+        profile=profile or get_encoding_profile(profile_name or plan.profile),
+        hls_dir=hls_dir,
+    )
+    os.replace(tmp_out, out_video)
+    return out_video
@@ -0,0 +1,193 @@
+"""
+FFmpeg 진행률 (-progress pipe:1) -> job 진행률/상세 + 실시간 배속(realtime factor) 로그
+
+왜 필요?
+- 렌더 중에는 job 진행률이 단계 시작 시점 값(예: 0.35)에 멈춰 있어서
+  사용자는 스피너만 보고, 우리도 어느 단계가 느린지 모름
+- FFmpeg에 -progress pipe:1 을 주면 key=value 줄(frame/fps/out_time_us/speed ...)을 주기적으로 써 줌
+  이걸 읽어서 "렌더된 영상 길이 / 전체 길이"로 단계 구간(lo~hi) 안의 진행률을 계산
+
+구조
+- progress_span(stage, reporter, lo, hi): 이 블록 안에서 띄우는 FFmpeg의 진행을 모아서 보고
+  (contextvars라서 supervisor.bind로 넘긴 풀 스레드의 FFmpeg도 같은 구간에 합산)
+- 병렬 세그먼트처럼 FFmpeg가 여러 개면 각자의 out_time을 더해서 영상 길이(VIDEO_SECONDS)와 비교
+  (fallback 재렌더처럼 같은 구간을 두 번 돌면 1.0에서 멈춤 - 대략적인 값)
+- 블록이 끝나면 "영상 N초를 M초에 렌더 (x배속)" 로그
+- FFMPEG_PROGRESS=false면 -progress를 안 붙임 (배속 로그도 없음)
+"""
+
+from __future__ import annotations
+
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.app.core.config import settings
+from backend.app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# job 진행률 갱신 최소 간격(초) - 너무 자주 쓰면 SQLite 큐/레지스트리 락만 바빠짐
+_REPORT_INTERVAL_SEC = 0.5
+
+
+@dataclass
+class FFmpegProgress:
+    frame: int = 0
+    fps: float = 0.0
+    out_time_sec: float = 0.0
+    speed: float = 0.0          # FFmpeg가 계산한 배속 (N/A면 0)
+    done: bool = False          # progress=end
+
+
+def _parse_float(raw: str) -> float:
+    try:
+        return float(raw.strip().rstrip("x"))
+    except ValueError:
+        return 0.0
+
+
+class ProgressParser:
+    """
+    -progress 출력 줄을 하나씩 넣으면 블록("progress=..." 줄)이 끝날 때마다 FFmpegProgress 리턴
+    """
+
+    def __init__(self):
+        self._cur: Dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[FFmpegProgress]:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return None
+        self._cur[key] = value
+        if key != "progress":
+            return None
+
+        cur, self._cur = self._cur, {}
+        # out_time_ms도 실제 단위는 마이크로초 (FFmpeg 쪽 이름이 잘못돼 있음)
+        us = cur.get("out_time_us") or cur.get("out_time_ms") or "0"
+        try:
+            out_time = max(0.0, int(us) / 1_000_000)
+        except ValueError:
+            out_time = 0.0
+        try:
+            frame = int(cur.get("frame", "0"))
+        except ValueError:
+            frame = 0
+        return FFmpegProgress(
+            frame=frame,
+            fps=_parse_float(cur.get("fps", "0")),
+            out_time_sec=out_time,
+            speed=_parse_float(cur.get("speed", "0")),
+            done=(value == "end"),
+        )
+
+
+class ProgressSpan:
+    """
+    단계 1개(슬라이드쇼/미리보기/최종 렌더 ...)의 FFmpeg 진행 합산
+
+    - lo/hi가 있으면 reporter.stage(stage, lo + (hi - lo) * 비율)로 job 진행률 갱신
+    - reporter.detail(...)로 frame/fps/speed/out_time 상세 공개
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        *,
+        reporter=None,
+        lo: Optional[float] = None,
+        hi: Optional[float] = None,
+        media_sec: Optional[float] = None,
+    ):
+        self.stage = stage
+        self.reporter = reporter
+        self.lo = lo
+        self.hi = hi
+        self.media_sec = max(0.001, float(media_sec or settings.VIDEO_SECONDS))
+        self._lock = threading.Lock()
+        self._times: Dict[int, float] = {}
+        self._ids = itertools.count()
+        self._last_report = 0.0
+        self.started = time.perf_counter()
+
+    def listener(self) -> Callable[[FFmpegProgress], None]:
+        # FFmpeg 프로세스 1개용 콜백 (프로세스마다 따로 out_time을 기억)
+        pid = next(self._ids)
+        return lambda p: self._update(pid, p)
+
+    @property
+    def rendered_sec(self) -> float:
+        with self._lock:
+            return sum(self._times.values())
+
+    def _update(self, pid: int, p: FFmpegProgress) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            # 마지막 블록은 out_time이 N/A(0)일 수 있으므로 줄어들지 않게
+            self._times[pid] = max(self._times.get(pid, 0.0), p.out_time_sec)
+            if not p.done and now - self._last_report < _REPORT_INTERVAL_SEC:
+                return
+            self._last_report = now
+            frac = min(1.0, sum(self._times.values()) / self.media_sec)
+
+        if self.reporter is None:
+            return
+        if self.lo is not None and self.hi is not None:
+            self.reporter.stage(self.stage, self.lo + (self.hi - self.lo) * frac)
+        self.reporter.detail(
+            stage=self.stage,
+            fraction=round(frac, 3),
+            frame=p.frame,
+            fps=round(p.fps, 1),
+            speed=round(p.speed, 2),
+            out_time_sec=round(p.out_time_sec, 2),
+        )
+
+    def close(self) -> Tuple[float, float]:
+        # (렌더된 영상 길이, 걸린 시간) 리턴 + 배속 로그
+        wall = time.perf_counter() - self.started
+        media = self.rendered_sec
+        if media > 0:
+            logger.info(
+                "render %s: 영상 %.1fs / 소요 %.1fs (x%.2f 실시간)",
+                self.stage, media, wall, media / wall if wall > 0 else 0.0,
+            )
+        return media, wall
+
+
+_current: "contextvars.ContextVar[Optional[ProgressSpan]]" = contextvars.ContextVar("progress_span", default=None)
+
+
+@contextmanager
+def progress_span(
+    stage: str,
+    *,
+    reporter=None,
+    lo: Optional[float] = None,
+    hi: Optional[float] = None,
+    media_sec: Optional[float] = None,
+) -> Iterator[ProgressSpan]:
+    span = ProgressSpan(stage, reporter=reporter, lo=lo, hi=hi, media_sec=media_sec)
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+        span.close()
+
+
+def with_progress(cmd: List[str]) -> Tuple[List[str], Optional[Callable[[FFmpegProgress], None]]]:
+    """
+    지금 progress_span 안이면 FFmpeg 명령에 -progress pipe:1을 넣고 콜백을 같이 리턴
+
+    - stdout을 진행률 채널로 쓰므로, stdout으로 결과를 받는 명령(pipe:1 출력)에는 쓰면 안 됨
+    """
+    span = _current.get()
+    if span is None or not getattr(settings, "FFMPEG_PROGRESS", True):
+        return cmd, None
+    return [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]], span.listener()
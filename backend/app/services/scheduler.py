@@ -0,0 +1,199 @@
+"""
+렌더 스케줄러 - 코어 수 기준 동시 렌더 제한(admission control) + FFmpeg 스레드 배분
+
+왜 필요?
+- FFmpeg는 -threads를 안 주면 프로세스마다 코어를 전부 쓰려고 함
+  요청 4개가 동시에 오면 (FFmpeg 4개 x 코어 수) 스레드가 서로 밀어내서 다 같이 느려짐 (p95 폭증)
+- 그래서
+  1) 동시에 렌더하는 작업 수를 RENDER_CONCURRENCY로 제한, 넘치는 작업은 도착 순서대로 대기
+  2) 작업 1개의 스레드 몫 = 코어 수 / 동시 렌더 수 -> FFmpeg마다 -threads / -filter_complex_threads로 고정
+  3) 작업 안에서 FFmpeg를 여러 개 병렬로 띄우면(컷별 세그먼트 렌더) thread_share()로 그 몫을 다시 나눔
+
+- 제한은 프로세스 단위. 워커 프로세스를 여러 개 띄우면 RENDER_CONCURRENCY를 프로세스 수로 나눠 설정
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from backend.app.core.config import settings
+from backend.app.core.logger import get_logger
+from backend.app.services import supervisor
+
+logger = get_logger(__name__)
+
+# 대기 중 작업 취소 확인 간격(초)
+_CANCEL_POLL_SEC = 0.5
+
+
+def host_cores() -> int:
+    # 이 프로세스가 쓸 수 있는 코어 수 (taskset/cgroup affinity 반영)
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except (AttributeError, OSError):
+        return max(1, os.cpu_count() or 1)
+
+
+def render_concurrency() -> int:
+    # 동시 렌더 작업 수 (0 이하면 코어 4개당 1개)
+    v = int(getattr(settings, "RENDER_CONCURRENCY", 0) or 0)
+    return v if v > 0 else max(1, host_cores() // 4)
+
+
+def job_threads() -> int:
+    # 렌더 작업 1개가 쓸 스레드 수 (FFMPEG_THREADS가 있으면 그 값)
+    v = int(getattr(settings, "FFMPEG_THREADS", 0) or 0)
+    return v if v > 0 else max(1, host_cores() // render_concurrency())
+
+
+_share = threading.local()
+
+
+@contextmanager
+def thread_share(parts: int) -> Iterator[int]:
+    """
+    현재 스레드에서 띄우는 FFmpeg의 스레드 몫을 작업 몫 / parts 로 줄임
+
+    - 세그먼트 렌더처럼 FFmpeg parts개를 동시에 띄우는 풀의 작업 함수 안에서 사용
+    """
+    prev = getattr(_share, "threads", None)
+    _share.threads = max(1, job_threads() // max(1, parts))
+    try:
+        yield _share.threads
+    finally:
+        _share.threads = prev
+
+
+def ffmpeg_threads() -> int:
+    # 지금 띄울 FFmpeg 1개의 스레드 수
+    return getattr(_share, "threads", None) or job_threads()
+
+
+def apply_thread_budget(cmd: List[str], threads: Optional[int] = None) -> List[str]:
+    """
+    FFmpeg 명령에 필터 스레드 수(전역 옵션)를 넣어서 리턴
+
+    - 인코더 스레드(-threads)는 출력 옵션이라 각 출력의 코덱 인자에서 따로 넣음
+    - 이미 지정돼 있으면 그대로
+    """
+    if "-filter_complex_threads" in cmd:
+        return cmd
+    n = str(threads or ffmpeg_threads())
+    return [cmd[0], "-filter_threads", n, "-filter_complex_threads", n, *cmd[1:]]
+
+
+class RenderScheduler:
+    """
+    동시 렌더 수 제한 (도착 순서 보장)
+
+    - admit() 안에서만 렌더. 자리가 없으면 대기열에서 기다림
+    - 같은 스레드에서 다시 admit()하면(중첩 호출) 자리를 또 잡지 않음 -> 교착 방지
+    - 현재 취소 범위(supervisor.cancel_scope)가 취소되면 대기를 멈추고 ProcessCancelled
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiting: "deque[object]" = deque()
+        self._held = threading.local()
+
+    @contextmanager
+    def admit(self, label: str, on_wait: Optional[Callable[[int], None]] = None) -> Iterator[None]:
+        if getattr(self._held, "depth", 0) > 0:
+            self._held.depth += 1
+            try:
+                yield
+            finally:
+                self._held.depth -= 1
+            return
+
+        scope = supervisor.current_scope()
+        if scope is not None:
+            scope.check()
+        ticket = object()
+        t0 = time.perf_counter()
+        with self._cond:
+            self._waiting.append(ticket)
+            must_wait = self._waiting[0] is not ticket or self._running >= self.capacity
+            depth = len(self._waiting)
+        try:
+            if must_wait and on_wait is not None:
+                # 콜백(진행상황 저장 등)은 락 밖에서
+                on_wait(depth)
+            with self._cond:
+                while self._waiting[0] is not ticket or self._running >= self.capacity:
+                    # 대기 중에 취소되면 자리를 내놓고 ProcessCancelled
+                    if scope is not None:
+                        scope.check()
+                    self._cond.wait(timeout=_CANCEL_POLL_SEC)
+                self._waiting.popleft()
+                self._running += 1
+                self._cond.notify_all()
+        except BaseException:
+            # 콜백 실패(SQLite locked 등)/취소: 대기열에 표가 남으면 뒤의 admit이 영원히 기다림
+            with self._cond:
+                try:
+                    self._waiting.remove(ticket)
+                except ValueError:
+                    pass
+                self._cond.notify_all()
+            raise
+
+        waited = time.perf_counter() - t0
+        if waited > 0.1:
+            logger.info("렌더 대기 %.1fs 후 시작: %s", waited, label)
+        self._held.depth = 1
+        try:
+            yield
+        finally:
+            self._held.depth = 0
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "running": self._running,
+                "waiting": len(self._waiting),
+                "cores": host_cores(),
+                "threads_per_job": job_threads(),
+            }
+
+
+_scheduler: Optional[RenderScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RenderScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RenderScheduler(render_concurrency())
+            logger.info(
+                "렌더 스케줄러: 코어 %d, 동시 렌더 %d, 작업당 스레드 %d",
+                host_cores(), _scheduler.capacity, job_threads(),
+            )
+        return _scheduler
+
+
+@contextmanager
+def admit(label: str, *, reporter=None, progress: float = 0.0) -> Iterator[None]:
+    """
+    렌더 구간을 스케줄러 안에서 실행
+
+    - 자리가 없어서 기다리게 되면 reporter.stage("waiting", progress)로 알림
+    """
+    def _on_wait(depth: int) -> None:
+        if reporter is not None:
+            reporter.stage("waiting", progress)
+
+    with get_scheduler().admit(label, on_wait=_on_wait):
+        yield
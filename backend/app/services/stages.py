@@ -0,0 +1,139 @@
+"""
+작은 단계(stage) 실행기 - 의존성 그래프(DAG) 기반
+
+왜 필요?
+- 예전 흐름: LLM -> 슬라이드쇼 -> 자막 -> 믹스 를 전부 순서대로
+- 그런데 슬라이드쇼 렌더/자막 위치 분석은 LLM 결과(카피)가 전혀 필요 없음
+- 단계마다 "무엇이 필요한지(needs)"만 적어두면, 준비된 단계부터 동시에 실행
+  -> 전체 시간 = 모든 단계의 합이 아니라 가장 긴 의존 경로(critical path)
+
+사용법
+    stages = [
+        Stage("copy", lambda: generate_copy(...)),
+        Stage("cuts", lambda ingest: ..., needs=("ingest",)),
+    ]
+    out = run_stages(stages)
+    out.values["cuts"], out.timings["copy"]
+
+- 각 단계 함수는 needs에 적은 단계 이름을 키워드 인자로 받고, 리턴값이 그 단계의 결과
+- 하나라도 실패하면 아직 시작 안 한 단계는 취소하고 그 예외를 그대로 올림
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.app.core.logger import get_logger
+from backend.app.services.supervisor import bind
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[..., Any]
+    needs: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageResults:
+    values: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)     # 단계별 소요 시간(초)
+    wall_sec: float = 0.0                                       # 전체 경과 시간(초)
+
+
+def _validate(stages: List[Stage]) -> None:
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"stage 이름 중복: {names}")
+
+    known = set(names)
+    for s in stages:
+        missing = [d for d in s.needs if d not in known]
+        if missing:
+            raise ValueError(f"stage '{s.name}'의 의존 단계가 없음: {missing}")
+
+    # 순환 검사 (위상 정렬이 끝까지 안 되면 순환)
+    remaining = {s.name: set(s.needs) for s in stages}
+    while remaining:
+        ready = [n for n, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"stage 의존성에 순환이 있음: {sorted(remaining)}")
+        for n in ready:
+            del remaining[n]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def run_stages(
+    stages: List[Stage],
+    *,
+    reporter=None,
+    progress: Tuple[float, float] = (0.0, 1.0),
+    max_workers: Optional[int] = None,
+) -> StageResults:
+    """
+    의존성이 풀린 단계부터 스레드 풀에서 동시에 실행
+
+    - reporter가 있으면 단계 시작 때 reporter.stage(이름, 진행률)
+      진행률은 progress=(시작, 끝) 구간을 끝난 단계 수 비율로 나눈 값
+    - max_workers 기본값 = 단계 수 (단계 자체가 FFmpeg/네트워크 대기라 스레드면 충분)
+    """
+    _validate(stages)
+    by_name = {s.name: s for s in stages}
+    results = StageResults()
+    if not stages:
+        return results
+
+    lo, hi = progress
+    pending = dict(by_name)
+    running: Dict[Future, str] = {}
+    started_at: Dict[str, float] = {}
+    t0 = time.perf_counter()
+
+    def _timed(stage: Stage, kwargs: Dict[str, Any]) -> Any:
+        started_at[stage.name] = time.perf_counter()
+        try:
+            return stage.fn(**kwargs)
+        finally:
+            results.timings[stage.name] = time.perf_counter() - started_at[stage.name]
+
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(stages), thread_name_prefix="stage")
+    try:
+        while pending or running:
+            ready = [s for s in pending.values() if all(d in results.values for d in s.needs)]
+            for s in ready:
+                del pending[s.name]
+                if reporter is not None:
+                    done = len(results.values)
+                    reporter.stage(s.name, lo + (hi - lo) * done / len(stages))
+                kwargs = {d: results.values[d] for d in s.needs}
+                # bind: 작업 취소 범위(supervisor)를 단계 스레드로 넘김
+                running[pool.submit(bind(_timed), s, kwargs)] = s.name
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                try:
+                    results.values[name] = fut.result()
+                except Exception:
+                    logger.exception("stage 실패: %s", name)
+                    for other in running:
+                        other.cancel()
+                    raise
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    results.wall_sec = time.perf_counter() - t0
+    serial = sum(results.timings.values())
+    logger.info(
+        "stages: 총 %.2fs (순차였다면 %.2fs) | %s",
+        results.wall_sec,
+        serial,
+        ", ".join(f"{n}={results.timings[n]:.2f}s" for n in by_name if n in results.timings),
+    )
+    return results
@@ -1,7 +1,9 @@
 from __future__ import annotations
 import os
+import re
 import uuid
 from pathlib import Path
+from typing import Optional
 from backend.app.core.config import settings
 
 def make_job_dir() -> Path:
@@ -16,3 +18,30 @@ def make_job_dir() -> Path:
 def public_video_path(job_dir: Path) -> Path:
     # 결과 영상은 job_dir/artifacts/final.mp4 로 고정
     return job_dir / "artifacts" / "final.mp4"
+
+def preview_video_path(job_dir: Path) -> Path:
+    # 미리보기(저해상도) 영상
+    return job_dir / "artifacts" / "preview.mp4"
+
+def variant_video_path(job_dir: Path, k: int) -> Path:
+    # 톤 변형 k번째 결과 (0번 대표 톤은 final.mp4)
+    return job_dir / "artifacts" / "variants" / f"final_{k}.mp4"
+
+def aspect_video_path(job_dir: Path, aspect: str) -> Path:
+    # 화면비별 결과 ("1:1" -> final_1x1.mp4). 기본 화면비는 final.mp4
+    return job_dir / "artifacts" / "aspects" / f"final_{aspect.replace(':', 'x')}.mp4"
+
+def hls_dir(job_dir: Path) -> Path:
+    # HLS 사다리 (master.m3u8 + v0/, v1/ ...)
+    return job_dir / "artifacts" / "hls"
+
+def render_error_path(job_dir: Path) -> Path:
+    # 백그라운드 렌더 실패 메시지
+    return job_dir / "artifacts" / "render_error.txt"
+
+def find_job_dir(job_id: str) -> Optional[Path]:
+    # job_id는 make_job_dir가 만든 12자리 hex만 허용 (경로 조작 방지)
+    if not re.fullmatch(r"[0-9a-f]{12}", job_id or ""):
+        return None
+    job_dir = Path(settings.OUTPUT_DIR) / job_id
+    return job_dir if job_dir.is_dir() else None
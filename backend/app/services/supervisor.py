@@ -0,0 +1,379 @@
+"""
+외부 프로세스(FFmpeg/ffprobe/say) 감시 실행기
+
+왜 필요?
+- 예전 _run은 subprocess.run(capture_output=True) 그대로라서
+  1) 제한 시간이 없음 -> FFmpeg가 멈추면 워커 1개가 영원히 묶임
+  2) stderr 전체를 메모리에 쌓음 -> 폭주하는 FFmpeg 로그가 수백 MB가 될 수 있음
+  3) 클라이언트가 끊기거나 작업이 취소돼도 FFmpeg는 끝까지 CPU를 씀
+- 그래서 모든 외부 프로세스를 여기서 띄움
+  - 제한 시간(timeout) 넘으면 kill -> ProcessTimeout (RuntimeError라 기존 fallback이 그대로 동작)
+  - 취소 범위(cancel_scope) 안에서 띄운 프로세스는 cancel()하면 즉시 kill -> ProcessCancelled
+  - stderr는 마지막 PROCESS_STDERR_LINES 줄만 (링 버퍼)
+  - PROCESS_NICE / PROCESS_CPU_AFFINITY로 우선순위/코어 고정 (API 프로세스가 렌더에 밀리지 않게)
+
+취소 범위는 contextvars로 전달 -> 스레드 풀에 넘길 때는 bind(fn)로 감싸야 같은 범위가 따라감
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Set, TypeVar
+
+from backend.app.core.config import settings
+from backend.app.core.logger import get_logger
+from backend.app.services.progress import FFmpegProgress, ProgressParser
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# kill 전에 terminate 후 기다리는 시간(초)
+_TERM_GRACE_SEC = 2.0
+
+
+class ProcessTimeout(RuntimeError):
+    pass
+
+
+class ProcessCancelled(Exception):
+    # RuntimeError가 아님: 렌더 fallback(다른 방식으로 재시도)을 타지 않고 바로 올라가야 함
+    pass
+
+
+class CancelScope:
+    """
+    작업(job)/요청 1개에 묶인 취소 범위
+
+    - 이 범위 안에서 띄운 프로세스를 기억해 두고 cancel() 시 전부 kill
+    - cancel() 이후 새로 띄우려는 프로세스는 시작 전에 ProcessCancelled
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._cancelled = threading.Event()
+        self._procs: Set[subprocess.Popen] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _add(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs.add(proc)
+
+    def _discard(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs.discard(proc)
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise ProcessCancelled(f"작업이 취소됨: {self.name}")
+
+    def cancel(self) -> None:
+        if self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        with self._lock:
+            procs = list(self._procs)
+        for p in procs:
+            _kill(p)
+        logger.info("취소: %s (프로세스 %d개 종료)", self.name, len(procs))
+
+
+_current: "contextvars.ContextVar[Optional[CancelScope]]" = contextvars.ContextVar("cancel_scope", default=None)
+_scopes: Dict[str, CancelScope] = {}
+_scopes_lock = threading.Lock()
+
+
+@contextmanager
+def cancel_scope(name: str) -> Iterator[CancelScope]:
+    """
+    이 블록 안(과 bind로 넘긴 스레드)에서 띄우는 프로세스를 name으로 묶음
+
+    - cancel(name)으로 밖에서 취소 가능
+    - 같은 이름이 이미 열려 있으면 그 범위를 그대로 씀 (중첩 호출)
+    """
+    with _scopes_lock:
+        scope = _scopes.get(name)
+        owner = scope is None
+        if owner:
+            scope = CancelScope(name)
+            _scopes[name] = scope
+    token = _current.set(scope)
+    try:
+        yield scope
+    finally:
+        _current.reset(token)
+        if owner:
+            with _scopes_lock:
+                _scopes.pop(name, None)
+
+
+def cancel(name: str) -> bool:
+    # 열려 있는 취소 범위를 취소 (없으면 False)
+    with _scopes_lock:
+        scope = _scopes.get(name)
+    if scope is None:
+        return False
+    scope.cancel()
+    return True
+
+
+def run_in_scope(name: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    # 스레드 풀에서 fn을 취소 범위 name 안에서 실행 (run_in_threadpool에 넘기기 좋게)
+    with cancel_scope(name):
+        return fn(*args, **kwargs)
+
+
+def current_scope() -> Optional[CancelScope]:
+    return _current.get()
+
+
+def bind(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    현재 취소 범위를 스레드 풀 작업으로 넘기기
+
+        pool.submit(bind(work), arg)
+
+    - ThreadPoolExecutor는 contextvars를 복사하지 않으므로 호출 시점 컨텍스트를 캡처
+    """
+    ctx = contextvars.copy_context()
+
+    def _bound(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return _bound
+
+
+@dataclass
+class ProcResult:
+    returncode: int
+    stdout: Optional[bytes]     # capture_stdout=True일 때만
+    stderr_tail: str            # 마지막 N줄
+
+
+def _stderr_lines() -> int:
+    return max(10, int(getattr(settings, "PROCESS_STDERR_LINES", 200)))
+
+
+def _affinity() -> Optional[Set[int]]:
+    # "0-3,6" -> {0,1,2,3,6}. 비었거나 잘못된 값이면 None
+    raw = (getattr(settings, "PROCESS_CPU_AFFINITY", "") or "").strip()
+    if not raw:
+        return None
+    cpus: Set[int] = set()
+    try:
+        for part in raw.split(","):
+            part = part.strip()
+            if "-" in part:
+                a, b = part.split("-", 1)
+                cpus.update(range(int(a), int(b) + 1))
+            elif part:
+                cpus.add(int(part))
+    except ValueError:
+        logger.warning("PROCESS_CPU_AFFINITY 형식 오류(무시): %s", raw)
+        return None
+    return cpus or None
+
+
+def _apply_priority(pid: int) -> None:
+    # 부모에서 자식 pid에 적용 (preexec_fn은 스레드가 많은 프로세스에서 안전하지 않음)
+    nice = int(getattr(settings, "PROCESS_NICE", 0) or 0)
+    if nice > 0 and hasattr(os, "setpriority"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, pid, nice)
+        except OSError as e:
+            logger.debug("nice 적용 실패(pid=%d): %s", pid, e)
+    cpus = _affinity()
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(pid, cpus)
+        except OSError as e:
+            logger.debug("affinity 적용 실패(pid=%d): %s", pid, e)
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    if proc.poll() is not None:
+        return
+    try:
+        proc.terminate()
+        proc.wait(timeout=_TERM_GRACE_SEC)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+    except OSError:
+        pass
+
+
+class Supervised:
+    """
+    감시 중인 프로세스 1개
+
+    - stderr/stdout은 별도 스레드가 읽음 (파이프가 차서 FFmpeg가 멈추는 일 없게)
+    - 감시 스레드가 제한 시간/취소를 보고 kill
+    - on_progress가 있으면 stdout을 FFmpeg -progress 출력으로 보고 한 줄씩 파싱해서 콜백
+    - with 블록을 벗어날 때 아직 살아 있으면 kill
+    """
+
+    def __init__(
+        self,
+        cmd: List[str],
+        *,
+        label: str,
+        timeout: Optional[float] = None,
+        stdin: bool = False,
+        capture_stdout: bool = False,
+        on_progress: Optional[Callable[[FFmpegProgress], None]] = None,
+    ):
+        if capture_stdout and on_progress is not None:
+            raise ValueError("capture_stdout와 on_progress는 같이 쓸 수 없음 (둘 다 stdout 사용)")
+        self.cmd = cmd
+        self.label = label
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.scope = current_scope()
+        if self.scope is not None:
+            self.scope.check()
+
+        self._tail: "deque[str]" = deque(maxlen=_stderr_lines())
+        self._stdout = bytearray() if capture_stdout else None
+        self._reason: Optional[str] = None
+        self._on_progress = on_progress
+        self._started = time.monotonic()
+
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE if (capture_stdout or on_progress) else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        _apply_priority(self.proc.pid)
+        if self.scope is not None:
+            self.scope._add(self.proc)
+
+        self._readers = [threading.Thread(target=self._read_stderr, name=f"{label}-stderr", daemon=True)]
+        if capture_stdout:
+            self._readers.append(threading.Thread(target=self._read_stdout, name=f"{label}-stdout", daemon=True))
+        elif on_progress is not None:
+            self._readers.append(threading.Thread(target=self._read_progress, name=f"{label}-progress", daemon=True))
+        for t in self._readers:
+            t.start()
+        self._watch = threading.Thread(target=self._watchdog, name=f"{label}-watch", daemon=True)
+        self._watch.start()
+
+    @property
+    def stdin(self):
+        return self.proc.stdin
+
+    def _read_stderr(self) -> None:
+        for raw in iter(self.proc.stderr.readline, b""):
+            self._tail.append(raw.decode("utf-8", "replace").rstrip())
+        self.proc.stderr.close()
+
+    def _read_stdout(self) -> None:
+        for chunk in iter(lambda: self.proc.stdout.read(1 << 16), b""):
+            self._stdout.extend(chunk)
+        self.proc.stdout.close()
+
+    def _read_progress(self) -> None:
+        parser = ProgressParser()
+        for raw in iter(self.proc.stdout.readline, b""):
+            p = parser.feed(raw.decode("utf-8", "replace"))
+            if p is None:
+                continue
+            try:
+                self._on_progress(p)
+            except Exception:
+                # 진행률 보고 실패로 렌더를 망치지 않음 (파이프는 계속 비워야 함)
+                logger.debug("%s 진행률 콜백 실패", self.label, exc_info=True)
+        self.proc.stdout.close()
+
+    def _watchdog(self) -> None:
+        while True:
+            try:
+                self.proc.wait(timeout=0.2)
+                return
+            except subprocess.TimeoutExpired:
+                pass
+            if self.scope is not None and self.scope.cancelled:
+                self._reason = "cancelled"
+                _kill(self.proc)
+                return
+            if self.timeout is not None and time.monotonic() - self._started > self.timeout:
+                self._reason = "timeout"
+                logger.warning("%s 제한 시간 %.0fs 초과 - 종료", self.label, self.timeout)
+                _kill(self.proc)
+                return
+
+    def wait(self) -> ProcResult:
+        """
+        종료까지 기다리고 결과 리턴
+
+        - 제한 시간 초과 -> ProcessTimeout, 취소 -> ProcessCancelled
+        - 그 외 returncode 검사는 호출자 몫
+        """
+        self._watch.join()
+        for t in self._readers:
+            t.join()
+        if self.scope is not None:
+            self.scope._discard(self.proc)
+
+        tail = "\n".join(self._tail)
+        if self._reason == "cancelled" or (self.scope is not None and self.scope.cancelled):
+            raise ProcessCancelled(f"{self.label} 취소됨")
+        if self._reason == "timeout":
+            raise ProcessTimeout(f"{self.label} 제한 시간({self.timeout:.0f}s) 초과\n{tail}")
+        return ProcResult(
+            returncode=self.proc.returncode,
+            stdout=bytes(self._stdout) if self._stdout is not None else None,
+            stderr_tail=tail,
+        )
+
+    def __enter__(self) -> "Supervised":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.proc.poll() is None:
+            _kill(self.proc)
+        if self.scope is not None:
+            self.scope._discard(self.proc)
+
+
+def run(
+    cmd: List[str],
+    *,
+    label: str = "process",
+    timeout: Optional[float] = None,
+    capture_stdout: bool = False,
+    on_progress: Optional[Callable[[FFmpegProgress], None]] = None,
+) -> ProcResult:
+    # 띄우고 끝날 때까지 기다리기 (stdin 없음)
+    with Supervised(
+        cmd, label=label, timeout=timeout, capture_stdout=capture_stdout, on_progress=on_progress
+    ) as sp:
+        return sp.wait()
+
+
+def timeout_for(kind: str) -> float:
+    """
+    단계별 제한 시간(초)
+
+    - render : 전체 인코딩(슬라이드쇼/자막/믹스 1회)
+    - segment: 컷 1개 렌더
+    - probe  : ffprobe
+    - tts    : TTS 줄 1개 변환
+    """
+    key = {
+        "render": "FFMPEG_TIMEOUT_SEC",
+        "segment": "FFMPEG_SEGMENT_TIMEOUT_SEC",
+        "probe": "FFPROBE_TIMEOUT_SEC",
+        "tts": "TTS_LINE_TIMEOUT_SEC",
+    }.get(kind, "FFMPEG_TIMEOUT_SEC")
+    return float(getattr(settings, key, 0) or 0)
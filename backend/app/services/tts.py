@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+import io
 import os
 import platform
-import subprocess
+import re
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from backend.app.core.config import settings
 from backend.app.core.logger import get_logger
+from backend.app.services.cache import CacheStats, DiskCache, cache_root, make_key
+from backend.app.services import supervisor
+from backend.app.services.scheduler import apply_thread_budget
 
 logger = get_logger(__name__)
 
@@ -15,11 +26,15 @@ logger = get_logger(__name__)
 FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
 
 
-def _run(cmd: list[str]) -> subprocess.CompletedProcess:
+def _run(cmd: list[str]) -> supervisor.ProcResult:
+    # say/FFmpeg 실행 (supervisor: 줄 제한 시간 넘으면 kill, 작업 취소 시 kill)
+    if cmd[0] == FFMPEG_BIN:
+        # 오디오 변환은 가벼워서 1스레드면 충분 (동시에 여러 줄을 돌리므로 코어를 뺏지 않게)
+        cmd = apply_thread_budget(cmd, threads=1)
     logger.info("TTS 실행: %s", " ".join(cmd))
-    p = subprocess.run(cmd, capture_output=True, text=True)
+    p = supervisor.run(cmd, label=Path(cmd[0]).name, timeout=supervisor.timeout_for("tts"))
     if p.returncode != 0:
-        raise RuntimeError(p.stderr or "command failed")
+        raise RuntimeError(p.stderr_tail or "command failed")
     return p
 
 
@@ -54,6 +69,8 @@ def _macos_say(text: str, out_mp3: Path) -> Optional[Path]:
 
     try:
         _run(cmd_say)
+    except supervisor.ProcessCancelled:
+        raise
     except Exception as e:
         logger.warning("macOS say 실패(voice=%s). 기본 voice로 재시도: %s", voice, e)
         # voice가 없는 경우가 많아서 -v 없이 1회 더
@@ -111,7 +128,7 @@ def _openai_tts(text: str, out_mp3: Path) -> Optional[Path]:
         "instructions": "Speak fast and energetic like a short-form ad. Minimal pauses. Clear diction.",
     }
 
-    r = requests.post(url, headers=headers, json=payload, timeout=120)
+    r = requests.post(url, headers=headers, json=payload, timeout=_line_timeout_sec())
     if r.status_code >= 400:
         raise RuntimeError(f"OpenAI TTS failed: {r.status_code} {r.text}")
 
@@ -119,6 +136,27 @@ def _openai_tts(text: str, out_mp3: Path) -> Optional[Path]:
     return out_mp3
 
 
+def _line_timeout_sec() -> float:
+    return max(1.0, float(getattr(settings, "TTS_LINE_TIMEOUT_SEC", 60)))
+
+
+def _max_concurrency() -> int:
+    return max(1, int(getattr(settings, "TTS_MAX_CONCURRENCY", 4)))
+
+
+# TTS 제공자(OpenAI/say) 동시 호출 상한 - 프로세스 전체(여러 job) 공용
+_provider_slots: Optional[threading.BoundedSemaphore] = None
+_provider_slots_lock = threading.Lock()
+
+
+def _provider_semaphore() -> threading.BoundedSemaphore:
+    global _provider_slots
+    with _provider_slots_lock:
+        if _provider_slots is None:
+            _provider_slots = threading.BoundedSemaphore(_max_concurrency())
+        return _provider_slots
+
+
 def synthesize_voice(text: str, out_mp3: Path) -> Optional[Path]:
     """
     텍스트 -> 음성(mp3)
@@ -126,69 +164,261 @@ def synthesize_voice(text: str, out_mp3: Path) -> Optional[Path]:
     동작 규칙
     1) OPENAI_API_KEY가 있으면 OpenAI TTS 사용
     2) 없으면 macOS say로 fallback (맥이 아니면 None)
+
+    - 제공자 호출은 TTS_MAX_CONCURRENCY개까지만 동시에 (rate limit/로컬 CPU 보호)
     """
-    if settings.OPENAI_API_KEY:
-        try:
-            return _openai_tts(text, out_mp3)
-        except Exception as e:
-            logger.warning("OpenAI TTS 실패. local TTS로 fallback: %s", e)
+    return _synthesize_voice(text, out_mp3)[0]
+
 
+def _tts_backends() -> List[str]:
+    # 지금 설정에서 시도할 TTS 제공자 (_synthesize_voice의 fallback 순서와 같음, 캐시 키에 들어감)
+    backends: List[str] = []
+    if settings.OPENAI_API_KEY:
+        backends.append("openai")
     if platform.system() == "Darwin":
-        return _macos_say(text, out_mp3)
+        backends.append("say")
+    return backends
+
+
+def _backend_voice(backend: str) -> str:
+    return settings.OPENAI_TTS_VOICE if backend == "openai" else (settings.TTS_VOICE or "Yuna")
+
+
+def _synthesize_voice(text: str, out_mp3: Path) -> Tuple[Optional[Path], Optional[str]]:
+    # (결과 파일, 실제로 쓰인 제공자) - fallback이 일어나면 제공자가 바뀜
+    with _provider_semaphore():
+        if settings.OPENAI_API_KEY:
+            try:
+                return _openai_tts(text, out_mp3), "openai"
+            except Exception as e:
+                logger.warning("OpenAI TTS 실패. local TTS로 fallback: %s", e)
+
+        if platform.system() == "Darwin":
+            return _macos_say(text, out_mp3), "say"
 
     # 다른 OS는 MVP 범위 밖: 음성 없이 진행
     logger.info("OPENAI_API_KEY가 없고 macOS도 아니어서 TTS를 스킵합니다(무음으로 진행).")
-    return None
-
+    return None, None
 
-from typing import List, Tuple
 
-def _ffprobe_duration_sec(path: Path) -> float:
-    # mp3 실제 길이(초) 측정 - 자막 싱크의 기준이 됨
-    ffprobe = os.getenv("FFPROBE_BIN", "ffprobe")
-    cmd = [
-        ffprobe, "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(path),
-    ]
-    p = subprocess.run(cmd, capture_output=True, text=True)
-    if p.returncode != 0:
-        raise RuntimeError(f"ffprobe failed:\n{p.stderr}")
-    return float((p.stdout or "").strip() or "0")
+# 내레이션 PCM 포맷 (줄 음성은 전부 이 포맷의 float32 배열로 다룸)
+SAMPLE_RATE = 44100
+# 앞/뒤 무음 판정 (-40dBFS, 10ms 창) + 발음이 잘리지 않게 남겨둘 여유(50ms)
+SILENCE_THRESHOLD = 10 ** (-40 / 20)
+SILENCE_WINDOW_SEC = 0.01
+SILENCE_KEEP_SEC = 0.05
 
-def _postprocess_voice(in_mp3: Path, out_mp3: Path, speed: float = 1.10) -> Path:
-    """
-    '느리고 액션감 없는' 원인 1순위 = 말 사이 공백 + 전체 템포
-    → silenceremove로 앞/뒤/중간 작은 무음 줄이고, atempo로 살짝 빠르게,
-      loudnorm로 음량 정리(영상에서 또렷해짐)
-    """
-    out_mp3.parent.mkdir(parents=True, exist_ok=True)
 
+def _postprocess_filter(speed: float) -> str:
+    # 후처리 필터 문자열 (캐시 키에도 그대로 들어감 -> 파라미터 바뀌면 자동으로 새로 생성)
     # atempo는 0.5~2.0 범위만 안전
     speed = max(0.8, min(1.4, float(speed)))
 
-    af = ",".join([
-        # 앞/뒤 무음 제거(너무 세게 자르면 발음 끊김 → threshold는 -40dB 근처 추천)
-        "silenceremove=start_periods=1:start_duration=0.05:start_threshold=-40dB:"
-        "stop_periods=1:stop_duration=0.05:stop_threshold=-40dB",
+    return ",".join([
         # 템포 살짝 업(체감 액션감)
         f"atempo={speed}",
         # 음량/다이내믹 정리 (목소리 또렷)
         "loudnorm=I=-16:LRA=11:TP=-1.5",
     ])
 
+
+def _decode_voice_pcm(in_mp3: Path, speed: float = 1.10) -> np.ndarray:
+    """
+    TTS 원본 -> (atempo + loudnorm) -> mono float32 PCM (FFmpeg 디코딩 1회, 파이프로 받음)
+
+    예전: mp3 -> 후처리 mp3(재인코딩) -> ffprobe -> concat mp3(재인코딩) -> 믹스(재인코딩)
+    지금: 디코딩 1회 후 무음 제거/길이 계산/이어붙이기는 전부 numpy
+    """
     cmd = [
-        FFMPEG_BIN, "-y",
+        FFMPEG_BIN, "-v", "error",
         "-i", str(in_mp3),
         "-vn",
-        "-af", af,
-        "-codec:a", "libmp3lame",
-        "-b:a", "192k",
-        str(out_mp3),
+        "-af", _postprocess_filter(speed),
+        "-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "pipe:1",
     ]
-    _run(cmd)
-    return out_mp3
+    cmd = apply_thread_budget(cmd, threads=1)
+    logger.info("TTS 실행: %s", " ".join(cmd))
+    p = supervisor.run(
+        cmd, label="ffmpeg", timeout=supervisor.timeout_for("tts"), capture_stdout=True
+    )
+    if p.returncode != 0:
+        raise RuntimeError(p.stderr_tail or "command failed")
+    return np.frombuffer(p.stdout or b"", dtype=np.float32)
+
+
+def _trim_silence(pcm: np.ndarray) -> np.ndarray:
+    """
+    앞/뒤 무음 제거 ('느리고 액션감 없는' 원인 1순위 = 말 사이 공백)
+    - 10ms 창의 최대 진폭이 -40dBFS 넘는 첫/마지막 창 기준, 앞뒤 50ms는 남김
+    """
+    win = max(1, int(SAMPLE_RATE * SILENCE_WINDOW_SEC))
+    n = len(pcm) // win
+    if n == 0:
+        return pcm
+    peaks = np.abs(pcm[: n * win]).reshape(n, win).max(axis=1)
+    loud = np.flatnonzero(peaks > SILENCE_THRESHOLD)
+    if loud.size == 0:
+        return pcm[:0]
+    keep = int(SAMPLE_RATE * SILENCE_KEEP_SEC)
+    start = max(0, loud[0] * win - keep)
+    end = min(len(pcm), (loud[-1] + 1) * win + keep)
+    return pcm[start:end]
+
+
+def _write_wav(path: Path, pcm: np.ndarray) -> Path:
+    # float32 [-1, 1] -> 16bit PCM WAV (무손실 컨테이너, 믹스 단계에서 1번만 인코딩됨)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = (np.clip(pcm, -1.0, 1.0) * 32767.0).astype("<i2")
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(data.tobytes())
+    return path
+
+
+# --- 후처리된 줄 음성 캐시 ---
+# "오늘 ㄱㄱ", "저장하고 가요" 같은 짧은 훅/CTA 줄은 job마다 반복됨
+# -> (정규화 텍스트, 제공자, voice, 속도, 후처리 파라미터)가 같으면 TTS/디코딩 전부 생략
+# 값은 무음 제거까지 끝난 float32 PCM (.npy) -> 길이는 샘플 수에서 바로 나옴
+_clip_cache: Optional[DiskCache] = None
+_stats_lock = threading.Lock()
+
+
+def tts_cache() -> DiskCache:
+    global _clip_cache
+    if _clip_cache is None:
+        max_mb = int(getattr(settings, "TTS_CACHE_MAX_MB", 256))
+        _clip_cache = DiskCache(cache_root() / "tts", max_mb * 1024 * 1024, suffix=".npy")
+    return _clip_cache
+
+
+def _clip_key(line: str, backend: str, speed_up: float) -> str:
+    text = re.sub(r"\s+", " ", line).strip()
+    return make_key(
+        "tts-v2", text, backend, _backend_voice(backend),
+        float(settings.TTS_SPEED), float(speed_up), _postprocess_filter(speed_up),
+        SAMPLE_RATE, SILENCE_THRESHOLD, SILENCE_KEEP_SEC,
+    )
+
+
+def _cached_line(key: str) -> Optional[np.ndarray]:
+    p = tts_cache().get(key)
+    if p is None:
+        return None
+    try:
+        return np.load(p, allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_line(key: str, pcm: np.ndarray) -> None:
+    buf = io.BytesIO()
+    np.save(buf, pcm.astype(np.float32), allow_pickle=False)
+    tts_cache().put_bytes(key, buf.getvalue())
+
+
+def _synthesize_line(
+    i: int,
+    line: str,
+    out_dir: Path,
+    speed_up: float,
+    stats: Optional[CacheStats] = None,
+) -> Optional[np.ndarray]:
+    """
+    줄 1개: (캐시) -> TTS -> PCM 디코딩(후처리 포함) -> 무음 제거 -> (캐시 저장)
+    실패/무음이면 None (해당 줄은 스킵)
+    """
+    raw = out_dir / f"line_{i:02d}_raw.mp3"
+
+    # 저장은 실제로 쓰인 제공자 키로 하므로, 조회도 fallback 순서대로 (먼저 찾은 것 사용)
+    backends = _tts_backends()
+    if backends:
+        hit = None
+        for backend in backends:
+            hit = _cached_line(_clip_key(line, backend, speed_up))
+            if hit is not None:
+                break
+        if stats is not None:
+            with _stats_lock:
+                if hit is not None:
+                    stats.hits += 1
+                    stats.bytes_saved += hit.nbytes
+                else:
+                    stats.misses += 1
+        if hit is not None:
+            return hit
+
+    try:
+        # 1) TTS 생성
+        tts_out, used_backend = _synthesize_voice(line, raw)
+
+        # 핵심: TTS가 None이거나 파일이 안 생기면 이 줄은 스킵
+        if (tts_out is None) or (not raw.exists()) or (raw.stat().st_size < 1000):
+            logger.warning("TTS line_%02d 생성 실패/무음 (OS=%s, key=%s) → 스킵",
+                           i, platform.system(), bool(settings.OPENAI_API_KEY))
+            return None
+
+        # 2) 디코딩 + 후처리(속도/정규화) + 무음 제거
+        pcm = _trim_silence(_decode_voice_pcm(raw, speed=speed_up))
+
+        # 결과 체크 (0.05초도 안 되면 비정상)
+        if len(pcm) < int(SAMPLE_RATE * 0.05):
+            logger.warning("TTS line_%02d 후처리 결과가 비정상 → 스킵", i)
+            return None
+
+        # 실제로 쓰인(fallback 포함) 제공자 기준 키로 저장
+        if used_backend is not None:
+            _store_line(_clip_key(line, used_backend, speed_up), pcm)
+        return pcm
+
+    except supervisor.ProcessCancelled:
+        # 작업 취소는 "이 줄만 스킵"이 아니라 전체 중단
+        raise
+    except Exception as e:
+        logger.warning("TTS line_%02d 처리 중 예외 → 스킵: %s", i, e)
+        return None
+
+
+def _synthesize_lines_parallel(
+    items: List[Tuple[int, str]],
+    out_dir: Path,
+    speed_up: float,
+    stats: Optional[CacheStats] = None,
+) -> List[Optional[np.ndarray]]:
+    """
+    줄별 처리를 워커 풀에서 동시에 (결과는 입력 순서 그대로)
+
+    - 전체 소요시간 ≈ 합계가 아니라 가장 느린 줄 1개 수준
+    - 줄마다 TTS_LINE_TIMEOUT_SEC 안에 안 끝나면 그 줄은 스킵
+      (스레드는 못 죽이므로 기다리지 않고 버림. 그 줄의 say/FFmpeg는 supervisor가 같은 제한 시간에 kill)
+    """
+    timeout = _line_timeout_sec()
+    workers = min(_max_concurrency(), len(items))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-line")
+    try:
+        started = time.monotonic()
+        futures = [
+            pool.submit(supervisor.bind(_synthesize_line), i, line, out_dir, speed_up, stats)
+            for i, line in items
+        ]
+
+        results: List[Optional[np.ndarray]] = []
+        for (i, _line), fut in zip(items, futures):
+            # 대기열에 있던 줄은 늦게 시작하므로, 줄 순번만큼 기준 시각을 뒤로 미룸
+            wave = len(results) // workers
+            remaining = started + timeout * (wave + 1) - time.monotonic()
+            try:
+                results.append(fut.result(timeout=max(0.0, remaining)))
+            except FutureTimeout:
+                logger.warning("TTS line_%02d 시간 초과(%.0fs) → 스킵", i, timeout)
+                fut.cancel()
+                results.append(None)
+        return results
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
 
 def synthesize_voice_lines(
     lines: List[str],
@@ -197,50 +427,33 @@ def synthesize_voice_lines(
     speed_up: float = 1.10,
     tiny_pause_sec: float = 0.03,
 ) -> Tuple[Path, List[Tuple[float, float]]]:
+    """
+    줄별 TTS -> 하나의 voice.wav + 줄별 (start, end)
 
+    - TTS_MAX_CONCURRENCY > 1 이면 줄들을 동시에 합성 (순서/타이밍 규칙은 순차와 동일)
+    - 줄 사이에 tiny_pause_sec 무음을 실제로 넣어서 이어붙임
+      -> 타이밍은 샘플 수로 계산하므로 오디오와 정확히 일치 (ffprobe 없음)
+    - 결과는 무손실 WAV: 최종 믹스에서 딱 1번만 인코딩됨
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    parts: List[Path] = []
-    durs: List[float] = []
-
-    for i, line in enumerate(lines):
-        line = (line or "").strip()
-        if not line:
-            continue
+    items = [(i, (line or "").strip()) for i, line in enumerate(lines)]
+    items = [(i, line) for i, line in items if line]
 
-        raw = out_dir / f"line_{i:02d}_raw.mp3"
-        part = out_dir / f"line_{i:02d}.mp3"
+    stats = CacheStats()
+    if items and _max_concurrency() > 1:
+        results = _synthesize_lines_parallel(items, out_dir, speed_up, stats)
+    else:
+        results = [_synthesize_line(i, line, out_dir, speed_up, stats) for i, line in items]
 
-        try:
-            # 1) TTS 생성
-            tts_out = synthesize_voice(line, raw)
-
-            # 핵심: TTS가 None이거나 파일이 안 생기면 이 줄은 스킵
-            if (tts_out is None) or (not raw.exists()) or (raw.stat().st_size < 1000):
-                logger.warning("TTS line_%02d 생성 실패/무음 (OS=%s, key=%s) → 스킵",
-                               i, platform.system(), bool(settings.OPENAI_API_KEY))
-                continue
-
-            # 2) 후처리(무음 제거/속도/정규화)
-            _postprocess_voice(raw, part, speed=speed_up)
-
-            # 후처리 결과 파일 체크
-            if (not part.exists()) or (part.stat().st_size < 1000):
-                logger.warning("TTS line_%02d 후처리 결과가 비정상 → 스킵", i)
-                continue
-
-            # 3) 길이 측정 (ffprobe 실패해도 대충 추정해서 진행)
-            try:
-                dur = _ffprobe_duration_sec(part)
-            except Exception:
-                dur = max(0.7, min(2.2, len(line) / 7.0))  # 글자수 기반 추정
-
-            parts.append(part)
-            durs.append(dur)
+    if tts_cache().enabled and (stats.hits or stats.misses):
+        logger.info(
+            "TTS 캐시: hit %d/%d (%.0f%%)",
+            stats.hits, stats.hits + stats.misses, stats.hit_rate * 100,
+        )
 
-        except Exception as e:
-            logger.warning("TTS line_%02d 처리 중 예외 → 스킵: %s", i, e)
-            continue
+    parts = [pcm for pcm in results if pcm is not None]
+    voice_wav = out_dir / "voice.wav"
 
     # 아무 파트도 없으면: '명확한 원인 로그'를 남기고 무음으로 반환(파이프라인은 유지)
     if not parts:
@@ -249,41 +462,21 @@ def synthesize_voice_lines(
             "→ Linux/Docker면 OPENAI_API_KEY가 백엔드에 주입돼야 합니다.",
             platform.system(), bool(settings.OPENAI_API_KEY)
         )
-        empty = out_dir / "voice.mp3"
-        # 빈 bytes mp3는 깨질 수 있어서 ffmpeg로 0.2초 무음 mp3 생성(안전)
-        cmd_silence = [
-            FFMPEG_BIN, "-y",
-            "-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo",
-            "-t", "0.2",
-            "-codec:a", "libmp3lame", "-b:a", "192k",
-            str(empty),
-        ]
-        _run(cmd_silence)
-        return empty, []
-
-    # concat은 기존 그대로
-    concat_txt = out_dir / "concat.txt"
-    concat_txt.write_text(
-        "\n".join([f"file '{p.as_posix()}'" for p in parts]),
-        encoding="utf-8"
-    )
+        # 빈 파일은 깨질 수 있어서 0.2초 무음 WAV
+        return _write_wav(voice_wav, np.zeros(int(SAMPLE_RATE * 0.2), dtype=np.float32)), []
 
-    voice_mp3 = out_dir / "voice.mp3"
-    cmd_concat = [
-        FFMPEG_BIN, "-y",
-        "-f", "concat", "-safe", "0",
-        "-i", str(concat_txt),
-        "-codec:a", "libmp3lame", "-b:a", "192k",
-        str(voice_mp3),
-    ]
-    _run(cmd_concat)
+    pause = np.zeros(int(round(float(tiny_pause_sec) * SAMPLE_RATE)), dtype=np.float32)
 
+    chunks: List[np.ndarray] = []
     timings: List[Tuple[float, float]] = []
-    t = 0.0
-    for dur in durs:
-        start = t
-        end = t + dur
-        timings.append((start, end))
-        t = end + float(tiny_pause_sec)
-
-    return voice_mp3, timings
+    pos = 0
+    for k, pcm in enumerate(parts):
+        if k > 0 and len(pause):
+            chunks.append(pause)
+            pos += len(pause)
+        timings.append((pos / SAMPLE_RATE, (pos + len(pcm)) / SAMPLE_RATE))
+        chunks.append(pcm)
+        pos += len(pcm)
+
+    _write_wav(voice_wav, np.concatenate(chunks))
+    return voice_wav, timings
@@ -13,16 +13,27 @@
 from __future__ import annotations
 
 import os
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, List, Tuple
 
-from backend.app.core.config import settings
-from backend.app.core.logger import get_logger
-from backend.app.services.caption_placement import pick_anchors_for_images
+import numpy as np
 
-from typing import Optional
-from pathlib import Path
+from backend.app.core.config import EncodingProfile, get_encoding_profile, settings
+from backend.app.core.logger import get_logger
+from backend.app.services import supervisor
+from backend.app.services.cache import CacheStats, content_hash, make_key, segment_cache
+from backend.app.services.caption_placement import (
+    pick_anchors_for_images,
+    pick_caption_y,
+    placement_index,
+)
+from backend.app.services.captions import CaptionStyle, measure_caption, render_caption
+from backend.app.services.motion import load_canvas, normalize_backend, render_segment_cv
+from backend.app.services.progress import with_progress
+from backend.app.services.scheduler import apply_thread_budget, ffmpeg_threads, job_threads, thread_share
+from backend.app.services.supervisor import ProcResult, bind
 
 logger = get_logger(__name__)
 
@@ -40,12 +51,19 @@ def _project_root() -> Path:
     return Path(__file__).resolve().parents[3]
 
 
-def _run(cmd: list[str]):
-    # FFmpeg 실행 유틸
+def _run(cmd: list[str], *, kind: str = "render") -> ProcResult:
+    """
+    FFmpeg 실행 유틸
+
+    - 필터 스레드 수는 스케줄러 몫으로 고정
+    - supervisor로 실행: kind별 제한 시간(render/segment), 작업 취소 시 kill, stderr는 마지막 N줄만
+    - progress_span 안이면 -progress pipe:1로 진행률을 job에 보고
+    """
+    cmd, on_progress = with_progress(apply_thread_budget(cmd))
     logger.info("FFmpeg 실행: %s", " ".join(cmd))
-    p = subprocess.run(cmd, capture_output=True, text=True)
+    p = supervisor.run(cmd, label="ffmpeg", timeout=supervisor.timeout_for(kind), on_progress=on_progress)
     if p.returncode != 0:
-        raise RuntimeError(f"FFmpeg failed:\n{p.stderr}")
+        raise RuntimeError(f"FFmpeg failed:\n{p.stderr_tail}")
     return p
 
 
@@ -58,10 +76,10 @@ def get_audio_duration_sec(audio_path: Path) -> float:
         "-of", "default=noprint_wrappers=1:nokey=1",
         str(audio_path),
     ]
-    p = subprocess.run(cmd, capture_output=True, text=True)
+    p = supervisor.run(cmd, label="ffprobe", timeout=supervisor.timeout_for("probe"), capture_stdout=True)
     if p.returncode != 0:
-        raise RuntimeError(f"ffprobe failed:\n{p.stderr}")
-    return float((p.stdout or "").strip() or "0")
+        raise RuntimeError(f"ffprobe failed:\n{p.stderr_tail}")
+    return float((p.stdout or b"").decode("utf-8", "replace").strip() or "0")
 
 
 def _escape_drawtext(s: str) -> str:
@@ -73,13 +91,13 @@ def _escape_drawtext(s: str) -> str:
     return s
 
 
-def _pick_y_by_anchor_name(anchor_name: str) -> str:
-    # top/mid/bottom에 따라 y 위치를 정함
+def _anchor_y_frac(anchor_name: str) -> float:
+    # top/mid/bottom에 따라 y 위치(화면 높이 대비 비율)를 정함
     if anchor_name == "top":
-        return "h*0.12"
+        return 0.12
     if anchor_name == "mid":
-        return "h*0.48"
-    return "h*0.82"
+        return 0.48
+    return 0.82
 
 
 def _effect_zoompan(i: int) -> str:
@@ -117,63 +135,209 @@ def _effect_zoompan(i: int) -> str:
 
 
 
-def build_slideshow(images: list[Path], out_video: Path) -> Path:
+def _video_size(profile: Optional[EncodingProfile] = None) -> Tuple[int, int]:
+    # 프로필 size(draft 등) 우선, 없으면 settings.VIDEO_SIZE("1080x1920") -> (1080, 1920)
+    size = (profile.size if profile and profile.size else None) or settings.VIDEO_SIZE
+    w, h = size.split("x")
+    return int(w), int(h)
+
+
+def _encoder_threads(profile: Optional[EncodingProfile] = None) -> int:
+    # 프로필에 threads가 있으면 그 값, 없으면 스케줄러가 나눠준 몫
+    p = profile or get_encoding_profile()
+    return p.threads if p.threads > 0 else ffmpeg_threads()
+
+
+def _codec_args(profile: Optional[EncodingProfile] = None, *, threads: bool = True) -> list[str]:
     """
-    이미지 -> 무음 슬라이드쇼 mp4 생성
+    영상 인코더 인자 (중간 산출물 포함 모든 인코딩 단계 공통)
 
-    포인트
-    - images 개수로 18초를 균등 분할
-    - 각 컷마다 zoompan 모션을 다르게 줘서 지루함 줄임
-    - scale/pad/setsar로 입력 포맷이 달라도 concat 안정화
+    - 프로필이 없으면 settings.ENCODING_PROFILE
+    - preset/crf/tune/GOP/threads 를 한 곳에서 결정해서 단계마다 품질이 달라지지 않게
+    - threads=False: 캐시 키용 (스레드 수는 부하에 따라 바뀌므로 키에서 뺌)
     """
-    out_video.parent.mkdir(parents=True, exist_ok=True)
+    p = profile or get_encoding_profile()
+    args = ["-c:v", "libx264", "-preset", p.preset, "-crf", str(p.crf)]
+    if p.tune:
+        args += ["-tune", p.tune]
+    args += ["-g", str(p.gop)]
+    if threads:
+        args += ["-threads", str(_encoder_threads(p))]
+    args += ["-pix_fmt", "yuv420p"]
+    return args
+
+
+def _fit(profile: Optional[EncodingProfile] = None) -> str:
+    # 사진을 캔버스에 맞추는 방식 (pad | crop), 화면비별 출력만 crop
+    return profile.fit if profile is not None else "pad"
+
+
+def _caption_scale(profile: Optional[EncodingProfile] = None) -> float:
+    """
+    자막 스타일 값(폰트 크기 등)은 settings.VIDEO_SIZE 기준이라 출력 크기에 맞춰 비례 조정
 
+    - 같은 화면비(preview/draft 등)면 높이 비율과 같음
+    - 다른 화면비(1:1, 16:9)는 면적 비율의 제곱근 (단, 가로 폭을 넘지 않게 가로 비율이 상한)
+    """
+    w, h = _video_size(profile)
+    bw, bh = _video_size(None)
+    return min(((w * h) / (bw * bh)) ** 0.5, w / bw)
+
+
+def _normalize_chain(w: int, h: int, fit: str = "pad") -> str:
+    # 입력 포맷(가로/세로/해상도)이 달라도 w x h 캔버스로 통일
+    if fit == "crop":
+        # 화면비별 출력: 여백 없이 꽉 채우고 가운데 기준으로 잘라냄
+        return (
+            f"scale={w}:{h}:force_original_aspect_ratio=increase,"
+            f"crop={w}:{h},"
+            f"setsar=1"
+        )
+    return (
+        f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+        f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,"
+        f"setsar=1"
+    )
+
+
+def _cut_chain(i: int, w: int, h: int, fps: int, frames_per: int, per: float) -> str:
+    # 컷 1개의 모션/색감/길이 체인 (그래프 렌더와 세그먼트 렌더가 같은 체인을 씀)
+    motion = _effect_zoompan(i)
+    return (
+        f"{motion}:d={frames_per}:s={w}x{h}:fps={fps},"
+        f"eq=contrast=1.06:saturation=1.05,"
+        f"trim=duration={per},setpts=PTS-STARTPTS,"
+        f"format=yuv420p"
+    )
+
+
+def _slideshow_graph(
+    images: list[Path],
+    first_input: int = 0,
+    profile: Optional[EncodingProfile] = None,
+) -> Tuple[list[str], list[str], str]:
+    """
+    슬라이드쇼 필터 그래프 조립 (build_slideshow / render_fused 공용)
+
+    리턴값: (입력 인자, 필터 리스트, 출력 라벨)
+    - first_input: 이 그래프의 첫 이미지가 몇 번째 -i 인지 (앞에 다른 입력이 있을 때)
+    - 입력(-i) 개수는 컷 수가 아니라 "고유 이미지 수"
+    """
+    input_args, filters, labels = _multi_slideshow_graph(images, [profile], first_input)
+    return input_args, filters, labels[0]
+
+
+def _multi_slideshow_graph(
+    images: list[Path],
+    profiles: List[Optional[EncodingProfile]],
+    first_input: int = 0,
+) -> Tuple[list[str], list[str], list[str]]:
+    """
+    슬라이드쇼 그래프 - 출력 프로필(해상도/화면비)이 여러 개인 버전
+
+    - 사진 디코딩은 1번, 디코딩 직후 split으로 프로필 수만큼 갈래를 나눠
+      갈래마다 자기 캔버스로 정규화(pad/crop) -> 컷 모션 -> concat
+    - 리턴값: (입력 인자, 필터 리스트, 프로필별 출력 라벨)
+    - 프로필이 1개면 라벨은 예전과 같음 (n{u}_{j}, v{i}, vout)
+    """
     total = float(settings.VIDEO_SECONDS)  # 기본 18초
     fps = 30
     n = max(1, len(images))
     per = total / n
-
-    w, h = settings.VIDEO_SIZE.split("x")
-    w, h = int(w), int(h)
     frames_per = max(1, int(per * fps))
-
-    cmd = [FFMPEG_BIN, "-y"]
-
-    # 1) 이미지 입력 추가 (-loop 1로 각 이미지를 영상처럼)
+    n_branches = max(1, len(profiles))
+    tags = [""] if n_branches == 1 else [f"r{b}_" for b in range(n_branches)]
+
+    # 1) 이미지 입력 추가: 같은 파일은 한 번만 연다
+    # - routes에서 컷 수를 맞추려고 이미지를 반복하기 때문에(img_paths[i % len])
+    #   컷마다 -i를 열면 같은 JPEG을 몇 번씩 디코딩/스케일하게 됨
+    # - 단일 프레임 입력 + zoompan d=frames_per 로 컷 길이를 만든다 (-loop 불필요)
+    unique: list[Path] = []
+    uses: list[int] = []
+    slot_of: dict[str, int] = {}
     for img in images:
-        cmd += ["-loop", "1", "-t", str(per), "-i", str(img)]
+        key = str(Path(img).resolve())
+        if key not in slot_of:
+            slot_of[key] = len(unique)
+            unique.append(img)
+            uses.append(0)
+        uses[slot_of[key]] += 1
+
+    input_args: list[str] = []
+    for img in unique:
+        input_args += ["-i", str(img)]
 
-    # 2) 각 이미지별 필터 체인 생성 (핵심: motion은 i로부터 만든다)
     filters: list[str] = []
-    for i, _img in enumerate(images):
-        motion = _effect_zoompan(i)  
+    # 출력 프로필이 여러 개면 디코딩된 원본을 먼저 갈래 수만큼 split
+    if n_branches > 1:
+        for u in range(len(unique)):
+            filters.append(
+                f"[{first_input + u}:v]split={n_branches}"
+                + "".join(f"[{tag}src{u}]" for tag in tags)
+            )
+
+    out_labels: list[str] = []
+    for profile, tag in zip(profiles or [None], tags):
+        w, h = _video_size(profile)
+
+        # 2) 파일별 정규화(scale/pad|crop/setsar)는 1회만 하고 split으로 컷 수만큼 분기
+        for u in range(len(unique)):
+            k = uses[u]
+            src = f"[{first_input + u}:v]" if n_branches == 1 else f"[{tag}src{u}]"
+            outs = "".join(f"[{tag}n{u}_{j}]" for j in range(k))
+            filters.append(
+                src
+                + _normalize_chain(w, h, _fit(profile))
+                + (f",split={k}" if k > 1 else "")
+                + outs
+            )
+
+        # 컷별 체인 (핵심: motion은 i로부터 만든다 -> 같은 사진이어도 컷마다 모션이 다름)
+        taken = [0] * len(unique)
+        for i, img in enumerate(images):
+            u = slot_of[str(Path(img).resolve())]
+            j = taken[u]
+            taken[u] += 1
+
+            filters.append(f"[{tag}n{u}_{j}]" + _cut_chain(i, w, h, fps, frames_per, per) + f"[{tag}v{i}]")
+
+        # 3) concat으로 이어붙이기 (모든 v{i}를 하나로)
+        concat_inputs = "".join([f"[{tag}v{i}]" for i in range(n)])
         filters.append(
-            f"[{i}:v]"
-            f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
-            f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,"
+            f"{concat_inputs}"
+            f"concat=n={n}:v=1:a=0,"
             f"setsar=1,"
-            f"{motion}:d={frames_per}:s={w}x{h}:fps={fps},"
-            f"eq=contrast=1.06:saturation=1.05,"
-            f"trim=duration={per},setpts=PTS-STARTPTS,"
             f"format=yuv420p"
-            f"[v{i}]"
+            f"[{tag}vout]"
         )
+        out_labels.append(f"{tag}vout")
+    return input_args, filters, out_labels
 
-    # 3) concat으로 이어붙이기 (모든 v{i}를 하나로)
-    concat_inputs = "".join([f"[v{i}]" for i in range(n)])
-    filters.append(
-        f"{concat_inputs}"
-        f"concat=n={n}:v=1:a=0,"
-        f"setsar=1,"
-        f"format=yuv420p"
-        f"[vout]"
-    )
 
-    filter_complex = ";".join(filters)
+def build_slideshow(
+    images: list[Path],
+    out_video: Path,
+    *,
+    profile: Optional[EncodingProfile] = None,
+) -> Path:
+    """
+    이미지 -> 무음 슬라이드쇼 mp4 생성
 
+    포인트
+    - images 개수로 18초를 균등 분할
+    - 각 컷마다 zoompan 모션을 다르게 줘서 지루함 줄임
+    - scale/pad/setsar로 입력 포맷이 달라도 concat 안정화
+    """
+    out_video.parent.mkdir(parents=True, exist_ok=True)
+
+    total = float(settings.VIDEO_SECONDS)
+    input_args, filters, vout = _slideshow_graph(images, profile=profile)
+
+    cmd = [FFMPEG_BIN, "-y", *input_args]
     cmd += [
-        "-filter_complex", filter_complex,
-        "-map", "[vout]",
+        "-filter_complex", ";".join(filters),
+        "-map", f"[{vout}]",
+        *_codec_args(profile),
         "-t", str(total),
         str(out_video),
     ]
@@ -182,21 +346,227 @@ def build_slideshow(images: list[Path], out_video: Path) -> Path:
 
 
 
-def burn_text_overlays(
-    in_video: Path,
-    image_paths: list[Path],
-    lines: list[str],
+def _render_workers() -> int:
+    # 세그먼트 동시 렌더 수 (0 이하면 스케줄러가 이 작업에 준 스레드 몫). 다른 작업과 호스트를 나눠 쓸 때 줄이면 됨
+    try:
+        v = int(getattr(settings, "RENDER_WORKERS", 0))
+    except Exception:
+        v = 0
+    if v <= 0:
+        v = job_threads()
+    return max(1, v)
+
+
+def _segment_codec_args(
+    fps: int, profile: Optional[EncodingProfile] = None, *, threads: bool = True
+) -> list[str]:
+    # 세그먼트끼리 -c copy로 이어붙이려면 인코더 파라미터가 완전히 같아야 함
+    return [
+        *_codec_args(profile, threads=threads),
+        "-r", str(fps),
+        "-video_track_timescale", str(fps * 512),
+    ]
+
+
+def _segment_cache_key(
+    img_hash: str,
+    i: int,
+    *,
+    total: float,
+    fps: int,
+    n: int,
+    motion_backend: str = "zoompan",
+    profile: Optional[EncodingProfile] = None,
+) -> str:
+    """
+    세그먼트 캐시 키
+
+    - 이미지 "내용" 해시 (파일명/job이 달라도 같은 사진이면 hit)
+    - 모션 백엔드 + 프리셋 번호(i % 4), 컷 길이, 출력 해상도, fps, 인코더 파라미터(프로필)
+    """
+    per = total / n
+    return make_key(
+        "segment-v1",
+        img_hash,
+        motion_backend,
+        i % 4,
+        f"{per:.6f}",
+        max(1, int(per * fps)),
+        "x".join(str(v) for v in _video_size(profile)),
+        _fit(profile),
+        fps,
+        " ".join(_segment_codec_args(fps, profile, threads=False)),
+    )
+
+
+def _render_segment(
+    img: Path,
+    i: int,
+    out_clip: Path,
+    *,
+    total: float,
+    fps: int,
+    n: int,
+    canvas: Optional[np.ndarray] = None,
+    profile: Optional[EncodingProfile] = None,
+) -> Path:
+    """
+    컷 1개 -> 짧은 무음 클립
+
+    - 그래프 렌더(_slideshow_graph)와 같은 정규화/모션 체인을 씀
+    - -frames:v로 프레임 수를 고정해서 컷 길이가 세그먼트마다 흔들리지 않게
+    - canvas(미리 정규화된 이미지)가 있으면 OpenCV 모션 백엔드로 렌더
+    """
+    per = total / n
+    w, h = _video_size(profile)
+    frames_per = max(1, int(per * fps))
+
+    if canvas is not None:
+        return render_segment_cv(
+            canvas, i, out_clip,
+            fps=fps,
+            frames=frames_per,
+            ffmpeg_bin=FFMPEG_BIN,
+            codec_args=_segment_codec_args(fps, profile),
+            post_filter="eq=contrast=1.06:saturation=1.05,format=yuv420p",
+        )
+
+    vf = _normalize_chain(w, h, _fit(profile)) + "," + _cut_chain(i, w, h, fps, frames_per, per)
+    cmd = [
+        FFMPEG_BIN, "-y",
+        "-i", str(img),
+        "-vf", vf,
+        "-frames:v", str(frames_per),
+        *_segment_codec_args(fps, profile),
+        "-an",
+        str(out_clip),
+    ]
+    _run(cmd, kind="segment")
+    return out_clip
+
+
+def build_slideshow_segmented(
+    images: list[Path],
     out_video: Path,
-    timings: Optional[List[Tuple[float, float]]] = None, 
+    *,
+    workers: Optional[int] = None,
+    motion_backend: Optional[str] = None,
+    profile: Optional[EncodingProfile] = None,
 ) -> Path:
     """
-    libass 없이도 항상 동작하는 drawtext 자막
+    이미지 -> 무음 슬라이드쇼 mp4 (컷별 병렬 렌더 + stream-copy concat)
+
+    - 컷마다 FFmpeg 프로세스를 따로 띄워 zoompan을 병렬로 처리
+      (FFmpeg 프로세스가 실제 일을 하므로 파이썬 쪽은 스레드 풀로 충분)
+    - 동시 실행 수는 workers(없으면 settings.RENDER_WORKERS)로 제한
+    - 결과 클립은 concat demuxer + -c copy로 재인코딩 없이 이어붙임
+    - 이미 렌더한 적 있는 컷(같은 사진+모션+길이+인코딩)은 세그먼트 캐시에서 재사용
+    - motion_backend="opencv"면 zoompan 대신 motion.render_segment_cv로 렌더
+    """
+    out_video.parent.mkdir(parents=True, exist_ok=True)
+    seg_dir = out_video.parent / "segments"
+    seg_dir.mkdir(parents=True, exist_ok=True)
+
+    total = float(settings.VIDEO_SECONDS)
+    fps = 30
+    n = max(1, len(images))
+    pool_size = max(1, min(workers or _render_workers(), n))
+    backend = normalize_backend(motion_backend or getattr(settings, "MOTION_BACKEND", "zoompan"))
+
+    clips = [seg_dir / f"seg_{i:02d}.mp4" for i in range(n)]
+
+    # 캐시 hit인 컷은 꺼내 쓰고, miss인 컷만 렌더
+    cache = segment_cache()
+    stats = CacheStats()
+    hashes: dict[str, str] = {}
+    for img in images:
+        if str(img) not in hashes:
+            hashes[str(img)] = content_hash(img)
+    keys = [
+        _segment_cache_key(
+            hashes[str(img)], i, total=total, fps=fps, n=n, motion_backend=backend, profile=profile
+        )
+        for i, img in enumerate(images)
+    ]
+    todo: list[int] = []
+    for i in range(n):
+        hit = cache.materialize(keys[i], clips[i])
+        if hit is not None:
+            stats.hits += 1
+            stats.bytes_saved += hit.stat().st_size
+        else:
+            stats.misses += 1
+            todo.append(i)
+            # 예전 hit의 하드링크가 남아 있으면 FFmpeg -y가 캐시 파일(같은 inode)을 덮어씀
+            clips[i].unlink(missing_ok=True)
+
+    # OpenCV 백엔드: 렌더할 컷의 이미지를 파일당 1번만 디코딩/정규화
+    canvases: dict[str, np.ndarray] = {}
+
+    def _render_and_store(i: int) -> Path:
+        canvas = canvases.get(str(images[i])) if backend == "opencv" else None
+        # 동시에 도는 세그먼트 FFmpeg끼리 작업의 스레드 몫을 나눠 씀
+        with thread_share(min(pool_size, len(todo))):
+            clip = _render_segment(
+                images[i], i, clips[i], total=total, fps=fps, n=n, canvas=canvas, profile=profile
+            )
+        cache.put(keys[i], clip)
+        return clip
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=min(pool_size, len(todo))) as pool:
+            if backend == "opencv":
+                w, h = _video_size(profile)
+                need = list(dict.fromkeys(str(images[i]) for i in todo))
+                for key, canvas in zip(need, pool.map(lambda k: load_canvas(Path(k), w, h, _fit(profile)), need)):
+                    canvases[key] = canvas
+            # bind: 작업 취소 범위를 풀 스레드로 넘김 (취소 시 세그먼트 FFmpeg도 kill)
+            futures = [pool.submit(bind(_render_and_store), i) for i in todo]
+            # 하나라도 실패하면 여기서 RuntimeError가 그대로 올라감
+            for f in futures:
+                f.result()
+
+    if cache.enabled:
+        logger.info(
+            "세그먼트 캐시: hit %d/%d (%.0f%%), 절약 %.1f MB",
+            stats.hits, n, stats.hit_rate * 100, stats.bytes_saved / (1024 * 1024),
+        )
+
+    concat_txt = seg_dir / "concat.txt"
+    concat_txt.write_text(
+        "\n".join([f"file '{p.resolve().as_posix()}'" for p in clips]),
+        encoding="utf-8",
+    )
+
+    cmd = [
+        FFMPEG_BIN, "-y",
+        "-f", "concat", "-safe", "0",
+        "-i", str(concat_txt),
+        "-c", "copy",
+        "-movflags", "+faststart",
+        str(out_video),
+    ]
+    _run(cmd)
+    return out_video
+
+
+
+def _caption_slots(
+    image_paths: list[Path],
+    lines: list[str],
+    timings: Optional[List[Tuple[float, float]]] = None,
+    profile: Optional[EncodingProfile] = None,
+) -> list[Tuple[str, float, float, float]]:
+    """
+    자막 줄별 (텍스트, y비율, start, end) - drawtext/overlay 공용
 
     - timings가 있으면: 각 줄의 (start,end) 구간을 그대로 사용(싱크 개선)
     - timings가 없으면: total/n 균등 분배
+    - 빈 텍스트 줄은 생략 (깨짐 방지)
+    - y비율 = 글자 위쪽 / 출력 높이
+      CAPTION_PLACEMENT=sat(기본): 실제 자막 박스 크기로 y 전 구간 후보를 적분 영상으로 평가
+      CAPTION_PLACEMENT=bands   : 위/중/아래 3개 밴드 중 하나 (sat 실패 시 fallback)
     """
-    out_video.parent.mkdir(parents=True, exist_ok=True)
-
     total = float(settings.VIDEO_SECONDS)
     lines = lines or [" "]
     n = max(1, len(lines))
@@ -206,29 +576,62 @@ def burn_text_overlays(
         timings = [(i * per, (i + 1) * per) for i in range(n)]
         timings[-1] = (timings[-1][0], total)
 
-    anchors = pick_anchors_for_images(image_paths)[:n]
+    out_w, out_h = _video_size(profile)
+    style = CaptionStyle.from_settings(_caption_scale(profile))
+    use_sat = (getattr(settings, "CAPTION_PLACEMENT", "sat") or "sat").strip().lower() == "sat"
+
+    anchors: list = []
+
+    def _band_y_frac(i: int) -> float:
+        # 밴드 분석은 필요할 때 한 번만 (고유 사진 병렬 분석)
+        if not anchors:
+            anchors.extend(pick_anchors_for_images(image_paths)[:n] or [None])
+        a = anchors[i] if i < len(anchors) else None
+        return _anchor_y_frac(a.name) if a is not None else 0.12
+
+    slots: list[Tuple[str, float, float, float]] = []
+    for i, raw in enumerate(lines):
+        text = (raw or "").strip()
+        if not text:
+            continue
+        start, end = timings[i]
+
+        y_frac: Optional[float] = None
+        if use_sat and i < len(image_paths):
+            try:
+                box_w, box_h = measure_caption(text, style)
+                y_top = pick_caption_y(image_paths[i], box_w, box_h, out_w, out_h, _fit(profile))
+            except OSError as e:
+                logger.warning("자막 위치(sat) 계산 실패 → 밴드 방식: %s", e)
+                y_top = None
+            if y_top is not None:
+                y_frac = (y_top + style.boxborder) / out_h
 
+        if y_frac is None:
+            y_frac = _band_y_frac(i)
+        slots.append((text, y_frac, start, end))
+    return slots
+
+
+def _drawtext_filters(slots: list[Tuple[str, float, float, float]], scale: float = 1.0) -> list[str]:
+    """
+    자막 줄별 drawtext 필터 리스트 (CAPTION_RENDERER=drawtext)
+    """
     # 실행 위치 상관없이 안정적으로 폰트 찾기
     fontfile_path = (_project_root() / "assets" / "fonts" / "BMHANNAPro.ttf").resolve()
     fontfile = str(fontfile_path)  # ffmpeg에는 str로 넘거야 함
 
-    # 자막 스타일: settings에서 읽기
-    fontsize = int(getattr(settings, "CAPTION_FONT_SIZE", 104))
-    borderw = int(getattr(settings, "CAPTION_BORDER_W", 12))
-    box_alpha = float(getattr(settings, "CAPTION_BOX_ALPHA", 0.35))
-    boxborder = int(getattr(settings, "CAPTION_BOX_BORDER", 18))
+    # 자막 스타일: settings에서 읽기 (출력 해상도가 다르면 scale로 비례 조정)
+    style = CaptionStyle.from_settings(scale)
+    fontsize = style.fontsize
+    borderw = style.borderw
+    box_alpha = style.box_alpha
+    boxborder = style.boxborder
 
 
     draw_filters: list[str] = []
-    for i, raw in enumerate(lines):
-        start, end = timings[i]
-        txt = _escape_drawtext((raw or "").strip())
-
-        # 빈 텍스트면 필터 자체를 생략 (깨짐 방지)
-        if not txt:
-            continue
-
-        y_expr = _pick_y_by_anchor_name(anchors[i].name) if i < len(anchors) else "h*0.12"
+    for text, y_frac, start, end in slots:
+        txt = _escape_drawtext(text)
 
         draw_filters.append(
             "drawtext="
@@ -253,23 +656,106 @@ def burn_text_overlays(
 
             # 위치: 가운데 정렬
             "x=(w-text_w)/2:"
-            f"y={y_expr}:"
+            f"y=h*{y_frac:.4f}:"
 
             # 타이밍
             f"enable='between(t,{start:.2f},{end:.2f})'"
         )
+    return draw_filters
 
-    if not draw_filters:
+
+def _caption_graph(
+    image_paths: list[Path],
+    lines: list[str],
+    timings: Optional[List[Tuple[float, float]]],
+    in_label: str,
+    first_input: int,
+    work_dir: Path,
+    profile: Optional[EncodingProfile] = None,
+    tag: str = "",
+) -> Tuple[list[str], list[str], str]:
+    """
+    자막 필터 그래프 조립 (burn_text_overlays / render_fused / finish_video / render_variants 공용)
+
+    리턴값: (입력 인자, 필터 리스트, 출력 라벨) / 자막이 없으면 ([], [], in_label)
+    - tag: 한 그래프에 자막 가지가 여러 개일 때 라벨 충돌 방지용 접두어
+
+    - CAPTION_RENDERER=overlay(기본): 줄마다 Pillow로 PNG 1장 -> 시간 구간 overlay
+      (텍스트 셰이핑은 렌더 전에 1번만, 인코딩 중엔 알파 합성만)
+    - CAPTION_RENDERER=drawtext: 기존 drawtext 체인
+    - PNG 생성이 실패하면 drawtext로 fallback
+    """
+    slots = _caption_slots(image_paths, lines, timings, profile)
+    if not slots:
+        return [], [], in_label
+
+    renderer = (getattr(settings, "CAPTION_RENDERER", "overlay") or "overlay").strip().lower()
+
+    if renderer == "overlay":
+        try:
+            style = CaptionStyle.from_settings(_caption_scale(profile))
+            pngs = [
+                render_caption(text, work_dir / "captions" / f"caption_{k:02d}.png", style)
+                for k, (text, _y, _s, _e) in enumerate(slots)
+            ]
+        except OSError as e:
+            logger.warning("자막 PNG 생성 실패 → drawtext로 fallback: %s", e)
+        else:
+            input_args: list[str] = []
+            filters: list[str] = []
+            prev = in_label
+            for k, (cap, (_text, y_frac, start, end)) in enumerate(zip(pngs, slots)):
+                input_args += ["-i", str(cap.path)]
+                nxt = f"{tag}cap{k}"
+                # y: drawtext와 같은 "글자 위쪽 = H*y비율"이 되도록 박스 여백만큼 올림
+                filters.append(
+                    f"[{prev}][{first_input + k}:v]"
+                    f"overlay=x=(W-w)/2:y=H*{y_frac:.4f}-{cap.pad}:"
+                    f"enable='between(t,{start:.2f},{end:.2f})'"
+                    f"[{nxt}]"
+                )
+                prev = nxt
+            filters.append(f"[{prev}]format=yuv420p[{tag}vsub]")
+            return input_args, filters, f"{tag}vsub"
+
+    draw_filters = _drawtext_filters(slots, _caption_scale(profile))
+    return [], [f"[{in_label}]" + ",".join(draw_filters) + f"[{tag}vsub]"], f"{tag}vsub"
+
+
+def burn_text_overlays(
+    in_video: Path,
+    image_paths: list[Path],
+    lines: list[str],
+    out_video: Path,
+    timings: Optional[List[Tuple[float, float]]] = None, 
+    *,
+    profile: Optional[EncodingProfile] = None,
+) -> Path:
+    """
+    libass 없이도 항상 동작하는 자막 burn-in (Pillow PNG overlay 또는 drawtext)
+
+    - timings가 있으면: 각 줄의 (start,end) 구간을 그대로 사용(싱크 개선)
+    - timings가 없으면: total/n 균등 분배
+    """
+    out_video.parent.mkdir(parents=True, exist_ok=True)
+
+    cap_inputs, filters, vout = _caption_graph(
+        image_paths, lines, timings, "0:v", first_input=1, work_dir=out_video.parent, profile=profile
+    )
+
+    if not filters:
         cmd = [FFMPEG_BIN, "-y", "-i", str(in_video), "-c", "copy", str(out_video)]
         _run(cmd)
         return out_video
 
-    vf = ",".join(draw_filters)
-
     cmd = [
         FFMPEG_BIN, "-y",
         "-i", str(in_video),
-        "-vf", vf,
+        *cap_inputs,
+        "-filter_complex", ";".join(filters),
+        "-map", f"[{vout}]",
+        "-map", "0:a?",
+        *_codec_args(profile),
         "-c:a", "copy",
         str(out_video),
     ]
@@ -278,44 +764,35 @@ def burn_text_overlays(
 
 
 
-def mix_audio(
-    in_video: Path,
+def _audio_graph(
     voice_path: Optional[Path],
     bgm_path: Optional[Path],
-    out_video: Path,
-) -> Path:
+    first_input: int,
+    tag: str = "",
+) -> Tuple[list[str], list[str], Optional[str]]:
     """
-    최종 길이를 항상 settings.VIDEO_SECONDS로 고정 + BGM 덕킹(목소리 나오면 BGM 자동으로 내려감)
+    voice/BGM 믹스(덕킹) 필터 그래프 조립 (mix_audio / render_fused / render_variants 공용)
 
-    - voice가 짧아도: apad + atrim으로 total 길이 맞춤
-    - bgm은 loop 후 total로 자름
-    - 둘 다 있으면:
-        1) voice 정리(볼륨, apad, trim)
-        2) bgm 정리(볼륨, trim)
-        3) sidechaincompress로 bgm ducking
-        4) amix로 합치고 total로 trim
+    리턴값: (입력 인자, 필터 리스트, 출력 라벨) / 오디오가 아예 없으면 라벨은 None
+    - first_input: 첫 오디오 입력이 몇 번째 -i 인지 (앞에 video 입력들이 있음)
+    - tag: 한 그래프에 오디오 가지가 여러 개일 때 라벨 충돌 방지용 접두어
     """
-    out_video.parent.mkdir(parents=True, exist_ok=True)
-
     total = float(settings.VIDEO_SECONDS)
-    cmd = [FFMPEG_BIN, "-y", "-i", str(in_video)]
 
     has_voice = bool(voice_path and Path(voice_path).exists())
     has_bgm = bool(bgm_path and Path(bgm_path).exists())
 
-    # 오디오가 아예 없으면 그대로 복사
     if not has_voice and not has_bgm:
-        cmd += ["-c", "copy", str(out_video)]
-        _run(cmd)
-        return out_video
+        return [], [], None
 
+    input_args: list[str] = []
     filter_parts: list[str] = []
-    idx = 1  # 0은 video 입력
+    idx = first_input
 
     
     # Voice chain
     if has_voice:
-        cmd += ["-i", str(voice_path)]
+        input_args += ["-i", str(voice_path)]
     
         filter_parts.append(
             f"[{idx}:a]"
@@ -323,21 +800,22 @@ def mix_audio(
             f"apad,"
             f"atrim=0:{total},"
             f"asetpts=N/SR/TB"
-            f"[a_voice]"
+            # 덕킹 키(sidechain)와 믹스에 voice가 두 번 쓰이므로 BGM이 있으면 분기
+            + (f",asplit=2[{tag}a_voice][{tag}a_key]" if has_bgm else f"[{tag}a_voice]")
         )
         idx += 1
 
     
     # BGM chain
     if has_bgm:
-        cmd += ["-stream_loop", "-1", "-i", str(bgm_path)]
+        input_args += ["-stream_loop", "-1", "-i", str(bgm_path)]
         # bgm 볼륨은 덕킹 전 기준값. 너무 크면 덕킹해도 거슬림.
         filter_parts.append(
             f"[{idx}:a]"
             f"volume=0.22,"
             f"atrim=0:{total},"
             f"asetpts=N/SR/TB"
-            f"[a_bgm]"
+            f"[{tag}a_bgm]"
         )
         idx += 1
 
@@ -351,39 +829,748 @@ def mix_audio(
         # - attack: 내려가는 속도(빠를수록 '딱' 내려감)
         # - release: 다시 올라오는 속도(너무 짧으면 펌핑, 너무 길면 답답)
         filter_parts.append(
-            "[a_bgm][a_voice]"
+            f"[{tag}a_bgm][{tag}a_key]"
             "sidechaincompress="
             "threshold=0.035:"
             "ratio=16:"
             "attack=10:"
             "release=250:"
             "makeup=1"
-            "[a_bgm_duck]"
+            f"[{tag}a_bgm_duck]"
         )
 
         # 덕킹된 bgm + voice 합치기
         filter_parts.append(
-            "[a_voice][a_bgm_duck]"
+            f"[{tag}a_voice][{tag}a_bgm_duck]"
             "amix=inputs=2:duration=longest:dropout_transition=2,"
             f"atrim=0:{total},asetpts=N/SR/TB"
-            "[a_out]"
+            f"[{tag}a_out]"
         )
 
     elif has_voice and not has_bgm:
-        filter_parts.append("[a_voice]anull[a_out]")
+        filter_parts.append(f"[{tag}a_voice]anull[{tag}a_out]")
 
     elif has_bgm and not has_voice:
-        filter_parts.append("[a_bgm]anull[a_out]")
+        filter_parts.append(f"[{tag}a_bgm]anull[{tag}a_out]")
+
+    return input_args, filter_parts, f"{tag}a_out"
+
+
+def mix_audio(
+    in_video: Path,
+    voice_path: Optional[Path],
+    bgm_path: Optional[Path],
+    out_video: Path,
+    *,
+    profile: Optional[EncodingProfile] = None,
+) -> Path:
+    """
+    최종 길이를 항상 settings.VIDEO_SECONDS로 고정 + BGM 덕킹(목소리 나오면 BGM 자동으로 내려감)
 
+    - voice가 짧아도: apad + atrim으로 total 길이 맞춤
+    - bgm은 loop 후 total로 자름
+    - 둘 다 있으면:
+        1) voice 정리(볼륨, apad, trim)
+        2) bgm 정리(볼륨, trim)
+        3) sidechaincompress로 bgm ducking
+        4) amix로 합치고 total로 trim
+    """
+    out_video.parent.mkdir(parents=True, exist_ok=True)
+
+    total = float(settings.VIDEO_SECONDS)
+    cmd = [FFMPEG_BIN, "-y", "-i", str(in_video)]
+
+    audio_inputs, filter_parts, aout = _audio_graph(voice_path, bgm_path, first_input=1)  # 0은 video 입력
+
+    # 오디오가 아예 없으면 그대로 복사
+    if aout is None:
+        cmd += ["-c", "copy", str(out_video)]
+        _run(cmd)
+        return out_video
+
+    cmd += audio_inputs
     cmd += [
         "-filter_complex", ";".join(filter_parts),
         "-map", "0:v:0",
-        "-map", "[a_out]",
-        "-c:v", "libx264",
-        "-pix_fmt", "yuv420p",
+        "-map", f"[{aout}]",
+        *_codec_args(profile),
+        "-movflags", "+faststart",
+        "-t", str(total),
+        str(out_video),
+    ]
+    _run(cmd)
+    return out_video
+
+
+
+def _hls_rungs(profile: Optional[EncodingProfile] = None) -> list[Tuple[int, int, int]]:
+    """
+    HLS 화질 단계 (가로, 세로, 최대 비트레이트 kbps)
+
+    - HLS_LADDER는 "짧은 변" 기준 (1080,720,480 -> 세로 영상이면 1080x1920, 720x1280, 480x854)
+    - 출력 해상도보다 큰 단계는 만들지 않음 (업스케일 방지)
+    """
+    w, h = _video_size(profile)
+    short = min(w, h)
+    rungs: list[Tuple[int, int, int]] = []
+    for raw in str(getattr(settings, "HLS_LADDER", "1080,720,480")).split(","):
+        try:
+            r = int(raw.strip())
+        except ValueError:
+            continue
+        if r <= 0 or r > short:
+            continue
+        f = r / short
+        rw, rh = (max(2, int(round(w * f / 2)) * 2), max(2, int(round(h * f / 2)) * 2))
+        rungs.append((rw, rh, max(600, int(round(4500 * f * f)))))
+    return rungs or [(w, h, 4500)]
+
+
+def _hls_graph(
+    vout: str,
+    aout: Optional[str],
+    hls_dir: Path,
+    profile: Optional[EncodingProfile] = None,
+) -> Tuple[list[str], str, Optional[str], list[str]]:
+    """
+    최종 그래프 끝에 HLS/CMAF 사다리 출력을 붙이기 (같은 FFmpeg 실행에서)
+
+    리턴값: (필터 리스트, mp4용 영상 라벨, mp4용 오디오 라벨, HLS 출력 인자)
+    - 최종 프레임을 split -> 단계별 scale, 오디오는 asplit
+    - fMP4(CMAF) 세그먼트 + var_stream_map으로 master.m3u8 1개
+    - 세그먼트 경계 = 키프레임이 되도록 GOP를 세그먼트 길이에 고정
+    """
+    rungs = _hls_rungs(profile)
+    n = len(rungs)
+    fps = 30
+    seg = max(1, int(getattr(settings, "HLS_SEGMENT_SEC", 2)))
+    gop = fps * seg
+    p = profile or get_encoding_profile()
+
+    filters = [f"[{vout}]split={n + 1}[hls_main]" + "".join(f"[hls_s{k}]" for k in range(n))]
+    for k, (w, h, _kbps) in enumerate(rungs):
+        filters.append(f"[hls_s{k}]scale={w}:{h},setsar=1[hls_v{k}]")
+    a_main: Optional[str] = None
+    if aout is not None:
+        filters.append(f"[{aout}]asplit={n + 1}[hls_amain]" + "".join(f"[hls_a{k}]" for k in range(n)))
+        a_main = "hls_amain"
+
+    args: list[str] = []
+    streams: list[str] = []
+    for k in range(n):
+        args += ["-map", f"[hls_v{k}]"]
+        if aout is not None:
+            args += ["-map", f"[hls_a{k}]"]
+            streams.append(f"v:{k},a:{k}")
+        else:
+            streams.append(f"v:{k}")
+
+    args += ["-c:v", "libx264", "-preset", p.preset, "-crf", str(p.crf), "-pix_fmt", "yuv420p"]
+    for k, (_w, _h, kbps) in enumerate(rungs):
+        args += [f"-maxrate:v:{k}", f"{kbps}k", f"-bufsize:v:{k}", f"{kbps * 2}k"]
+    args += ["-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0"]
+    args += ["-threads", str(_encoder_threads(p))]
+    if aout is not None:
+        args += ["-c:a", "aac", "-b:a", "128k"]
+
+    hls_dir.mkdir(parents=True, exist_ok=True)
+    args += [
+        "-t", str(float(settings.VIDEO_SECONDS)),
+        "-f", "hls",
+        "-hls_time", str(seg),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4",
+        "-hls_flags", "independent_segments",
+        "-master_pl_name", "master.m3u8",
+        "-var_stream_map", " ".join(streams),
+        "-hls_segment_filename", str(hls_dir / "v%v" / "seg_%03d.m4s"),
+        str(hls_dir / "v%v" / "index.m3u8"),
+    ]
+    return filters, "hls_main", a_main, args
+
+
+def render_fused(
+    images: list[Path],
+    lines: list[str],
+    out_video: Path,
+    *,
+    timings: Optional[List[Tuple[float, float]]] = None,
+    voice_path: Optional[Path] = None,
+    bgm_path: Optional[Path] = None,
+    profile: Optional[EncodingProfile] = None,
+    hls_dir: Optional[Path] = None,
+    work_dir: Optional[Path] = None,
+) -> Path:
+    """
+    슬라이드쇼 + 자막 + 오디오 믹스를 FFmpeg 1회 인코딩으로 끝내기
+
+    - 기존 3단계(build_slideshow -> burn_text_overlays -> mix_audio)는
+      중간 mp4를 두 번 더 디코딩/인코딩해서 느리고 화질 손실이 누적됨
+    - 여기서는 filter_complex 하나에
+      [이미지별 체인 -> concat] -> drawtext -> [voice/bgm 덕킹] 을 다 넣고 한 번만 인코딩
+    - hls_dir가 있으면 같은 실행에서 HLS 사다리(hls_dir/master.m3u8)도 같이 씀
+    - work_dir가 있으면 자막 전 슬라이드쇼도 work_dir/silent.mp4로 같이 씀 (재자막이 재사용)
+    """
+    out_video.parent.mkdir(parents=True, exist_ok=True)
+
+    total = float(settings.VIDEO_SECONDS)
+
+    video_inputs, filters, vout = _slideshow_graph(images, profile=profile)
+    silent_key: Optional[str] = None
+    silent_args: list[str] = []
+    if work_dir is not None:
+        silent_filters, vout, silent_args, silent_key = _silent_branch(images, vout, work_dir, profile)
+        filters += silent_filters
+
+    # 자막: concat 결과 뒤에 자막 그래프(overlay/drawtext)를 그대로 이어붙임
+    n_inputs = video_inputs.count("-i")
+    cap_inputs, cap_filters, vout = _caption_graph(
+        images, lines, timings, vout, first_input=n_inputs, work_dir=out_video.parent, profile=profile
+    )
+    filters += cap_filters
+    n_inputs += cap_inputs.count("-i")
+
+    # 오디오 입력은 이미지/자막 입력들 뒤에 붙는다
+    audio_inputs, audio_filters, aout = _audio_graph(voice_path, bgm_path, first_input=n_inputs)
+    filters += audio_filters
+
+    hls_args: list[str] = []
+    if hls_dir is not None:
+        hls_filters, vout, aout, hls_args = _hls_graph(vout, aout, hls_dir, profile)
+        filters += hls_filters
+
+    cmd = [FFMPEG_BIN, "-y", *video_inputs, *cap_inputs, *audio_inputs]
+    cmd += [
+        "-filter_complex", ";".join(filters),
+        "-map", f"[{vout}]",
+    ]
+    if aout is not None:
+        cmd += ["-map", f"[{aout}]"]
+    cmd += [
+        *_codec_args(profile),
+        "-movflags", "+faststart",
+        "-t", str(total),
+        str(out_video),
+        *hls_args,
+        *silent_args,
+    ]
+    _run(cmd)
+    if silent_key is not None:
+        (work_dir / "silent.key").write_text(silent_key, encoding="utf-8")
+    return out_video
+
+
+@dataclass
+class CaptionVariant:
+    # render_variants 출력 1개 = 자막 세트 1개 (+ 그 자막용 내레이션)
+    lines: List[str]
+    out_video: Path
+    timings: Optional[List[Tuple[float, float]]] = None
+    voice_path: Optional[Path] = None
+
+
+def render_variants(
+    images: list[Path],
+    variants: List[CaptionVariant],
+    work_dir: Path,
+    *,
+    bgm_path: Optional[Path] = None,
+    profile: Optional[EncodingProfile] = None,
+    motion_backend: Optional[str] = None,
+    hls_dir: Optional[Path] = None,
+) -> List[Path]:
+    """
+    같은 사진으로 자막(톤)만 다른 영상 N개를 FFmpeg 1회 실행으로
+
+    - 슬라이드쇼는 1번만 만들고 split으로 N갈래 (render_video와 같은 모션/렌더 방식)
+      - fused: 사진 디코딩 + 모션(zoompan) + concat을 같은 그래프에서 (work_dir/silent.mp4도 같이 씀)
+      - segmented(opencv 모션 포함): work_dir/silent.mp4를 재사용하거나 만들어서 입력으로
+    - 갈래마다 자막 그래프 -> 출력 N개를 같은 프로세스에서 인코딩
+      -> 비용이 N배가 아니라 "모션 1회 + 자막 합성/인코딩 N회"
+    - 내레이션이 모두 없으면 BGM 가지도 1번만 만들고 asplit
+    - 0번 변형이 대표 영상이므로 hls_dir가 있으면 0번 갈래로 HLS 사다리도 같이 씀
+    """
+    if not variants:
+        return []
+
+    total = float(settings.VIDEO_SECONDS)
+    n = len(variants)
+
+    mode, backend = _render_mode(motion_backend)
+    silent_key: Optional[str] = None
+    silent_args: list[str] = []
+    if mode == "segmented":
+        silent_video = silent_slideshow(images, work_dir, motion_backend=backend, profile=profile)
+        video_inputs, filters, vout = ["-i", str(silent_video)], [], "0:v"
+    else:
+        video_inputs, filters, vout = _slideshow_graph(images, profile=profile)
+        silent_filters, vout, silent_args, silent_key = _silent_branch(images, vout, work_dir, profile)
+        filters += silent_filters
+    n_inputs = video_inputs.count("-i")
+
+    if n > 1:
+        filters.append(f"[{vout}]split={n}" + "".join(f"[vs{k}]" for k in range(n)))
+        branch_in = [f"vs{k}" for k in range(n)]
+    else:
+        branch_in = [vout]
+
+    extra_inputs: list[str] = []
+    vouts: list[str] = []
+    for k, var in enumerate(variants):
+        cap_inputs, cap_filters, v_label = _caption_graph(
+            images, var.lines, var.timings, branch_in[k],
+            first_input=n_inputs, work_dir=work_dir / f"variant_{k}", profile=profile, tag=f"v{k}_",
+        )
+        extra_inputs += cap_inputs
+        filters += cap_filters
+        n_inputs += cap_inputs.count("-i")
+        if not cap_filters:
+            # 자막이 없는 갈래: split 출력 라벨을 그대로 map 할 수 없으니 통과 필터
+            filters.append(f"[{v_label}]null[v{k}_vsub]")
+            v_label = f"v{k}_vsub"
+        vouts.append(v_label)
+
+    aouts: list[Optional[str]] = []
+    if all(var.voice_path is None for var in variants):
+        audio_inputs, audio_filters, aout = _audio_graph(None, bgm_path, first_input=n_inputs)
+        extra_inputs += audio_inputs
+        filters += audio_filters
+        if aout is not None and n > 1:
+            filters.append(f"[{aout}]asplit={n}" + "".join(f"[as{k}]" for k in range(n)))
+            aouts = [f"as{k}" for k in range(n)]
+        else:
+            aouts = [aout] * n
+    else:
+        for k, var in enumerate(variants):
+            audio_inputs, audio_filters, aout = _audio_graph(
+                var.voice_path, bgm_path, first_input=n_inputs, tag=f"v{k}_"
+            )
+            extra_inputs += audio_inputs
+            filters += audio_filters
+            n_inputs += audio_inputs.count("-i")
+            aouts.append(aout)
+
+    hls_args: list[str] = []
+    if hls_dir is not None:
+        hls_filters, vouts[0], aouts[0], hls_args = _hls_graph(vouts[0], aouts[0], hls_dir, profile)
+        filters += hls_filters
+
+    cmd = [FFMPEG_BIN, "-y", *video_inputs, *extra_inputs, "-filter_complex", ";".join(filters)]
+    for var, v_label, a_label in zip(variants, vouts, aouts):
+        var.out_video.parent.mkdir(parents=True, exist_ok=True)
+        cmd += ["-map", f"[{v_label}]"]
+        if a_label is not None:
+            cmd += ["-map", f"[{a_label}]"]
+        cmd += [
+            *_codec_args(profile),
+            "-movflags", "+faststart",
+            "-t", str(total),
+            str(var.out_video),
+        ]
+    cmd += hls_args
+    cmd += silent_args
+    _run(cmd)
+    if silent_key is not None:
+        (work_dir / "silent.key").write_text(silent_key, encoding="utf-8")
+    return [var.out_video for var in variants]
+
+
+def render_aspects(
+    images: list[Path],
+    lines: list[str],
+    outputs: List[Tuple[EncodingProfile, Path]],
+    work_dir: Path,
+    *,
+    timings: Optional[List[Tuple[float, float]]] = None,
+    voice_path: Optional[Path] = None,
+    bgm_path: Optional[Path] = None,
+    motion_backend: Optional[str] = None,
+    hls_dir: Optional[Path] = None,
+) -> List[Path]:
+    """
+    화면비가 다른 출력 여러 개(9:16, 1:1, 4:5, 16:9)를 FFmpeg 1회 실행으로
+
+    - outputs: (화면비용 프로필, 출력 경로) 목록 (config.aspect_profile로 만든 프로필, 0번이 기본 화면비)
+    - 모션/렌더 방식은 render_video와 같음
+      - fused: 사진 디코딩 1회 -> 화면비마다 자기 캔버스(scale/crop) + 모션(zoompan) 갈래
+      - segmented(opencv 모션 포함): 화면비마다 무음 슬라이드쇼를 재사용하거나 만들어서 입력으로
+        (기본 화면비는 work_dir/silent.mp4 -> 재자막이 그대로 재사용)
+    - 자막 위치는 갈래마다 그 프레임 기준으로 다시 계산 (caption_placement)
+    - 오디오 그래프는 1번 만들고 asplit
+    - hls_dir가 있으면 0번(기본 화면비) 갈래로 HLS 사다리도 같이 씀
+    """
+    if not outputs:
+        return []
+
+    total = float(settings.VIDEO_SECONDS)
+    n = len(outputs)
+    profiles = [p for p, _out in outputs]
+
+    mode, backend = _render_mode(motion_backend)
+    if mode == "segmented":
+        video_inputs, filters, branch_in = [], [], []
+        for k, profile in enumerate(profiles):
+            w, h = _video_size(profile)
+            silent_video = silent_slideshow(
+                images,
+                work_dir if k == 0 else work_dir / f"aspect_{w}x{h}",
+                motion_backend=backend,
+                profile=profile,
+            )
+            video_inputs += ["-i", str(silent_video)]
+            branch_in.append(f"{k}:v")
+    else:
+        video_inputs, filters, branch_in = _multi_slideshow_graph(images, profiles)
+    n_inputs = video_inputs.count("-i")
+
+    extra_inputs: list[str] = []
+    vouts: list[str] = []
+    for k, (profile, out_video) in enumerate(outputs):
+        w, h = _video_size(profile)
+        cap_inputs, cap_filters, v_label = _caption_graph(
+            images, lines, timings, branch_in[k],
+            first_input=n_inputs, work_dir=work_dir / f"aspect_{w}x{h}", profile=profile, tag=f"c{k}_",
+        )
+        extra_inputs += cap_inputs
+        filters += cap_filters
+        n_inputs += cap_inputs.count("-i")
+        if not cap_filters:
+            # 자막이 없는 갈래: 입력 스트림 라벨은 map [..] 할 수 없으니 통과 필터
+            filters.append(f"[{v_label}]null[c{k}_vsub]")
+            v_label = f"c{k}_vsub"
+        vouts.append(v_label)
+
+    audio_inputs, audio_filters, aout = _audio_graph(voice_path, bgm_path, first_input=n_inputs)
+    extra_inputs += audio_inputs
+    filters += audio_filters
+    if aout is not None and n > 1:
+        filters.append(f"[{aout}]asplit={n}" + "".join(f"[as{k}]" for k in range(n)))
+        aouts: list[Optional[str]] = [f"as{k}" for k in range(n)]
+    else:
+        aouts = [aout] * n
+
+    hls_args: list[str] = []
+    if hls_dir is not None:
+        hls_filters, vouts[0], aouts[0], hls_args = _hls_graph(vouts[0], aouts[0], hls_dir, profiles[0])
+        filters += hls_filters
+
+    cmd = [FFMPEG_BIN, "-y", *video_inputs, *extra_inputs, "-filter_complex", ";".join(filters)]
+    for (profile, out_video), v_label, a_label in zip(outputs, vouts, aouts):
+        out_video.parent.mkdir(parents=True, exist_ok=True)
+        cmd += ["-map", f"[{v_label}]"]
+        if a_label is not None:
+            cmd += ["-map", f"[{a_label}]"]
+        cmd += [
+            *_codec_args(profile),
+            "-movflags", "+faststart",
+            "-t", str(total),
+            str(out_video),
+        ]
+    cmd += hls_args
+    _run(cmd)
+    return [out for _p, out in outputs]
+
+
+def finish_video(
+    in_video: Path,
+    image_paths: list[Path],
+    lines: list[str],
+    out_video: Path,
+    *,
+    timings: Optional[List[Tuple[float, float]]] = None,
+    voice_path: Optional[Path] = None,
+    bgm_path: Optional[Path] = None,
+    profile: Optional[EncodingProfile] = None,
+    hls_dir: Optional[Path] = None,
+) -> Path:
+    """
+    이미 만들어진 무음 슬라이드쇼에 자막 + 오디오를 1회 인코딩으로 입히기
+
+    - burn_text_overlays + mix_audio 를 합친 것 (중간 subtitled.mp4 없음)
+    - 세그먼트 렌더 결과(silent.mp4)를 마무리할 때 사용
+    - hls_dir가 있으면 같은 실행에서 HLS 사다리도 같이 씀
+    """
+    out_video.parent.mkdir(parents=True, exist_ok=True)
+
+    total = float(settings.VIDEO_SECONDS)
+
+    cap_inputs, filters, vout = _caption_graph(
+        image_paths, lines, timings, "0:v", first_input=1, work_dir=out_video.parent, profile=profile
+    )
+    vmap = f"[{vout}]" if filters else "0:v:0"
+
+    audio_inputs, audio_filters, aout = _audio_graph(
+        voice_path, bgm_path, first_input=1 + cap_inputs.count("-i")
+    )
+    filters += audio_filters
+
+    hls_args: list[str] = []
+    if hls_dir is not None:
+        hls_filters, hls_vout, aout, hls_args = _hls_graph(vout, aout, hls_dir, profile)
+        filters += hls_filters
+        vmap = f"[{hls_vout}]"
+
+    cmd = [FFMPEG_BIN, "-y", "-i", str(in_video), *cap_inputs, *audio_inputs]
+    if filters:
+        cmd += ["-filter_complex", ";".join(filters)]
+    cmd += ["-map", vmap]
+    if aout is not None:
+        cmd += ["-map", f"[{aout}]"]
+    cmd += [
+        *_codec_args(profile),
         "-movflags", "+faststart",
         "-t", str(total),
         str(out_video),
+        *hls_args,
     ]
     _run(cmd)
     return out_video
+
+
+def _render_mode(motion_backend: Optional[str] = None) -> Tuple[str, str]:
+    # (렌더 방식, 모션 백엔드) - opencv 모션은 프레임을 파이썬에서 만들어야 해서 항상 segmented
+    mode = (getattr(settings, "RENDER_MODE", "fused") or "fused").strip().lower()
+    backend = normalize_backend(motion_backend or getattr(settings, "MOTION_BACKEND", "zoompan"))
+    if backend == "opencv":
+        mode = "segmented"
+    return mode, backend
+
+
+def warm_caption_placement(image_paths: list[Path], profile: Optional[EncodingProfile] = None) -> int:
+    """
+    자막 위치 분석을 미리 (카피 생성과 동시에 돌리려고 분리)
+
+    - 자막 문구가 없어도 되는 부분(사진별 적분 영상/밴드 점수)만 계산해서 캐시에 올려둠
+    - 렌더 때 _caption_slots는 캐시 hit만 하게 됨
+    - 리턴: 분석한 고유 사진 수
+    """
+    unique = list(dict.fromkeys(Path(p) for p in image_paths))
+    if not unique:
+        return 0
+    use_sat = (getattr(settings, "CAPTION_PLACEMENT", "sat") or "sat").strip().lower() == "sat"
+    if not use_sat:
+        pick_anchors_for_images(unique)
+        return len(unique)
+
+    out_w, out_h = _video_size(profile)
+    with ThreadPoolExecutor(max_workers=min(8, len(unique))) as pool:
+        list(pool.map(lambda p: placement_index(p, out_w, out_h, _fit(profile)), unique))
+    return len(unique)
+
+
+def _silent_key(images: list[Path], backend: str, profile: Optional[EncodingProfile]) -> str:
+    # 무음 슬라이드쇼 식별 키: 사진 내용 + 모션 + 길이/해상도/인코딩 프로필
+    return make_key(
+        "silent-v1",
+        *[content_hash(p) for p in images],
+        backend,
+        settings.VIDEO_SECONDS,
+        "x".join(str(v) for v in _video_size(profile)),
+        _fit(profile),
+        " ".join(_codec_args(profile, threads=False)),
+    )
+
+
+def silent_slideshow(
+    images: list[Path],
+    work_dir: Path,
+    *,
+    motion_backend: Optional[str] = None,
+    profile: Optional[EncodingProfile] = None,
+    builder: str = "segmented",
+) -> Path:
+    """
+    work_dir/silent.mp4 를 재사용하거나 새로 렌더
+
+    - silent.key(입력 키)가 같으면 그대로 재사용 -> 자막/톤만 바꾸는 재렌더는 슬라이드쇼 렌더 0회
+    - builder: "segmented"(컷별 병렬 + 캐시) | "legacy"(build_slideshow 1회)
+    - 키에는 실제로 쓴 모션 백엔드를 넣음: legacy는 opencv를 요청해도 zoompan으로 그림
+      (요청값을 넣으면 나중 opencv 요청이 zoompan 결과를 재사용함)
+    """
+    _mode, backend = _render_mode(motion_backend)
+    if builder != "segmented":
+        backend = "zoompan"
+    out = work_dir / "silent.mp4"
+    stamp = work_dir / "silent.key"
+    key = _silent_key(images, backend, profile)
+
+    try:
+        if out.exists() and stamp.read_text(encoding="utf-8").strip() == key:
+            logger.info("무음 슬라이드쇼 재사용: %s", out)
+            return out
+    except OSError:
+        pass
+
+    # 빌드 도중 실패해도 예전 키가 남아서 반쯤 쓴 파일을 재사용하지 않게 먼저 지움
+    stamp.unlink(missing_ok=True)
+    if builder == "segmented":
+        build_slideshow_segmented(images, out, motion_backend=backend, profile=profile)
+    else:
+        build_slideshow(images, out, profile=profile)
+    stamp.write_text(key, encoding="utf-8")
+    return out
+
+
+def _silent_branch(
+    images: list[Path],
+    vout: str,
+    work_dir: Path,
+    profile: Optional[EncodingProfile],
+) -> Tuple[list[str], str, list[str], Optional[str]]:
+    """
+    fused 그래프의 슬라이드쇼(자막 전) 갈래를 split해서 work_dir/silent.mp4도 같은 실행에서 쓰기
+
+    리턴값: (필터 리스트, 이어서 쓸 영상 라벨, silent.mp4 출력 인자, 렌더 후 silent.key에 적을 키)
+    - fused 그래프는 zoompan 모션 = legacy build_slideshow와 같은 그래프 -> 키도 silent_slideshow와 같음
+    - 같은 키의 silent.mp4가 이미 있으면 아무것도 안 붙임 (키 None)
+    """
+    out = work_dir / "silent.mp4"
+    stamp = work_dir / "silent.key"
+    key = _silent_key(images, "zoompan", profile)
+    try:
+        if out.exists() and stamp.read_text(encoding="utf-8").strip() == key:
+            return [], vout, [], None
+    except OSError:
+        pass
+
+    # 렌더 도중 실패해도 예전 키로 반쯤 쓴 파일을 재사용하지 않게 먼저 지움
+    stamp.unlink(missing_ok=True)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    filters = [f"[{vout}]split=2[silent_main][silent_out]"]
+    args = [
+        "-map", "[silent_out]",
+        *_codec_args(profile),
+        "-t", str(float(settings.VIDEO_SECONDS)),
+        str(out),
+    ]
+    return filters, "silent_main", args, key
+
+
+def prebuild_slideshow(
+    images: list[Path],
+    work_dir: Path,
+    *,
+    motion_backend: Optional[str] = None,
+    profile: Optional[EncodingProfile] = None,
+) -> Optional[Path]:
+    """
+    카피(LLM) 없이 만들 수 있는 무음 슬라이드쇼를 미리 렌더 (segmented 경로 + 세그먼트 캐시일 때만)
+
+    - 컷들이 세그먼트 캐시에 들어가므로 뒤의 render_video는 캐시 hit + concat 복사만 함
+    - fused 모드는 슬라이드쇼/자막/오디오가 한 그래프라 미리 만들 게 없음 -> None
+    """
+    mode, backend = _render_mode(motion_backend)
+    if mode != "segmented" or not segment_cache().enabled:
+        return None
+    return silent_slideshow(images, work_dir, motion_backend=backend, profile=profile)
+
+
+def recaption_video(
+    images: list[Path],
+    lines: list[str],
+    work_dir: Path,
+    out_video: Path,
+    *,
+    timings: Optional[List[Tuple[float, float]]] = None,
+    voice_path: Optional[Path] = None,
+    bgm_path: Optional[Path] = None,
+    motion_backend: Optional[str] = None,
+    profile: Optional[EncodingProfile] = None,
+    hls_dir: Optional[Path] = None,
+) -> Path:
+    """
+    자막(카피)만 바꿔서 다시 만들기
+
+    - 무음 슬라이드쇼(work_dir/silent.mp4)는 재사용 (없거나 입력이 바뀌었으면 1번만 새로 렌더)
+    - 자막 + 오디오만 finish_video로 1회 인코딩
+    """
+    mode, backend = _render_mode(motion_backend)
+    builder = "segmented" if mode == "segmented" else "legacy"
+    try:
+        silent_video = silent_slideshow(
+            images, work_dir, motion_backend=backend, profile=profile, builder=builder
+        )
+    except supervisor.ProcessTimeout:
+        # 제한 시간 초과는 fallback으로 다시 돌리지 않음 (단계마다 제한 시간이 새로 시작돼서 몇 배로 늘어남)
+        raise
+    except RuntimeError as e:
+        if builder == "legacy":
+            raise
+        logger.warning("segmented 슬라이드쇼 실패 → build_slideshow로 fallback: %s", e)
+        silent_video = silent_slideshow(
+            images, work_dir, motion_backend=backend, profile=profile, builder="legacy"
+        )
+
+    return finish_video(
+        silent_video, images, lines, out_video,
+        timings=timings, voice_path=voice_path, bgm_path=bgm_path, profile=profile, hls_dir=hls_dir,
+    )
+
+
+def render_video(
+    images: list[Path],
+    lines: list[str],
+    work_dir: Path,
+    out_video: Path,
+    *,
+    timings: Optional[List[Tuple[float, float]]] = None,
+    voice_path: Optional[Path] = None,
+    bgm_path: Optional[Path] = None,
+    motion_backend: Optional[str] = None,
+    profile: Optional[EncodingProfile] = None,
+    hls_dir: Optional[Path] = None,
+) -> Path:
+    """
+    최종 mp4 렌더링 진입점 (settings.RENDER_MODE로 방식 선택)
+
+    - "fused": render_fused 1회 인코딩 (기본)
+    - "segmented": 컷별 병렬 렌더(silent.mp4) -> finish_video로 자막+오디오 1회 인코딩
+    - "legacy": 기존 3단계 (silent.mp4 -> subtitled.mp4 -> final.mp4)
+    - fused/segmented가 실패하면(필터 그래프/ffmpeg 버전 이슈 등) 3단계로 fallback
+      (제한 시간 초과(ProcessTimeout)는 fallback 없이 그대로 올라감)
+    - profile(없으면 settings.ENCODING_PROFILE)은 모든 인코딩 단계에 똑같이 적용
+    - motion_backend(없으면 settings.MOTION_BACKEND)가 "opencv"면
+      프레임을 파이썬에서 만들어야 하므로 항상 segmented 경로를 탄다
+    - hls_dir가 있으면 마지막 인코딩 실행에서 HLS 사다리도 같이 씀
+      (3단계 fallback은 mp4만 - HLS는 건너뜀)
+    """
+    mode, backend = _render_mode(motion_backend)
+
+    if mode == "fused":
+        try:
+            return render_fused(
+                images, lines, out_video,
+                timings=timings, voice_path=voice_path, bgm_path=bgm_path, profile=profile,
+                hls_dir=hls_dir, work_dir=work_dir,
+            )
+        except supervisor.ProcessTimeout:
+            # 느려서 잘린 렌더를 다른 방식으로 처음부터 다시 돌리면 제한 시간만 몇 배로 늘어남
+            raise
+        except RuntimeError as e:
+            logger.warning("fused 렌더 실패 → 3단계 렌더로 fallback: %s", e)
+
+    if mode == "segmented":
+        try:
+            silent_video = silent_slideshow(images, work_dir, motion_backend=backend, profile=profile)
+            return finish_video(
+                silent_video, images, lines, out_video,
+                timings=timings, voice_path=voice_path, bgm_path=bgm_path, profile=profile,
+                hls_dir=hls_dir,
+            )
+        except supervisor.ProcessTimeout:
+            raise
+        except RuntimeError as e:
+            logger.warning("segmented 렌더 실패 → 3단계 렌더로 fallback: %s", e)
+
+    silent_video = silent_slideshow(
+        images, work_dir, motion_backend=backend, profile=profile, builder="legacy"
+    )
+    sub_video = burn_text_overlays(
+        in_video=silent_video,
+        image_paths=images,
+        lines=lines,
+        out_video=work_dir / "subtitled.mp4",
+        timings=timings,
+        profile=profile,
+    )
+    return mix_audio(sub_video, voice_path, bgm_path, out_video, profile=profile)
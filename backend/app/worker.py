@@ -0,0 +1,154 @@
+"""
+렌더 워커 엔트리포인트 (SQLite 작업 큐 소비자)
+
+사용법 (프로젝트 루트에서, .env에 JOB_QUEUE=sqlite)
+    python -m backend.app.worker                # 큐가 빌 때까지 기다리며 계속 처리
+    python -m backend.app.worker --once         # 1건만 처리하고 종료
+    python -m backend.app.worker --threads 2    # 한 프로세스에서 작업 2건 동시 처리
+
+- API 서버(uvicorn)와 별개 프로세스. 같은 호스트/공유 볼륨이면 몇 개든 띄워도 됨
+- 작업 중에는 heartbeat로 lease를 연장 -> 워커가 죽으면 lease 만료 후 다른 워커가 재시도
+- heartbeat가 실패하면(lease 상실/취소) 그 작업의 FFmpeg를 kill하고 다음 작업으로
+- SIGINT/SIGTERM: 새 작업은 안 가져가고 진행 중인 작업만 끝내고 종료
+"""
+
+from __future__ import annotations
+
+import argparse
+import signal
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from backend.app.core.logger import get_logger
+from backend.app.services import supervisor
+from backend.app.services.job_queue import (
+    ClaimedJob,
+    JobQueue,
+    QueueReporter,
+    default_worker_id,
+    get_queue,
+)
+from backend.app.services.pipeline import GenerateRequest, run_generate
+
+logger = get_logger(__name__)
+
+
+def _run_generate_job(job: ClaimedJob, reporter: QueueReporter) -> Dict[str, Any]:
+    p = job.payload
+    return run_generate(
+        Path(p["job_dir"]),
+        [Path(x) for x in p["img_paths"]],
+        GenerateRequest(**p["req"]),
+        reporter=reporter,
+    )
+
+
+# 작업 종류(kind) -> 처리 함수
+HANDLERS: Dict[str, Callable[[ClaimedJob, QueueReporter], Dict[str, Any]]] = {
+    "generate": _run_generate_job,
+}
+
+
+def _heartbeat_loop(queue: JobQueue, job_id: str, worker_id: str, stop: threading.Event) -> None:
+    # lease의 1/3 간격으로 연장 (두 번 놓쳐도 만료 전)
+    interval = max(1.0, queue.lease_sec / 3)
+    while not stop.wait(interval):
+        if not queue.heartbeat(job_id, worker_id):
+            logger.warning("lease 상실 또는 취소(job=%s, worker=%s) - 진행 중인 프로세스 종료", job_id, worker_id)
+            supervisor.cancel(job_id)
+            return
+
+
+def process_one(queue: JobQueue, worker_id: str) -> bool:
+    """
+    작업 1건 가져와서 처리. 가져온 작업이 없으면 False
+    """
+    job = queue.claim(worker_id)
+    if job is None:
+        return False
+
+    logger.info("작업 시작(job=%s, kind=%s, 시도 %d/%d)", job.job_id, job.kind, job.attempts, job.max_attempts)
+    stop = threading.Event()
+    hb = threading.Thread(
+        target=_heartbeat_loop, args=(queue, job.job_id, worker_id, stop), name="job-heartbeat", daemon=True
+    )
+    hb.start()
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise ValueError(f"알 수 없는 작업 종류: {job.kind}")
+        with supervisor.cancel_scope(job.job_id):
+            result = handler(job, QueueReporter(queue, job.job_id, worker_id))
+    except supervisor.ProcessCancelled:
+        # 취소/lease 상실: 큐 상태는 이미 다른 쪽(취소 요청/새 워커)이 갖고 있음
+        logger.info("작업 중단(job=%s)", job.job_id)
+    except Exception as e:
+        logger.exception("작업 실패(job=%s)", job.job_id)
+        retry = queue.fail(job.job_id, worker_id, str(e))
+        logger.info("작업 %s(job=%s)", "재시도 예약" if retry else "최종 실패", job.job_id)
+    else:
+        queue.complete(job.job_id, worker_id, result or {})
+        logger.info("작업 완료(job=%s)", job.job_id)
+    finally:
+        stop.set()
+        hb.join(timeout=5)
+    return True
+
+
+def run_worker(*, worker_id: str, poll_sec: float, once: bool, stop: threading.Event) -> None:
+    queue = get_queue()
+    logger.info("워커 시작(worker=%s, queue=%s)", worker_id, queue.path)
+    while not stop.is_set():
+        if process_one(queue, worker_id):
+            if once:
+                return
+            continue
+        if once:
+            return
+        stop.wait(poll_sec)
+    logger.info("워커 종료(worker=%s)", worker_id)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="SQLite 작업 큐 렌더 워커")
+    ap.add_argument("--id", default=None, help="워커 ID (기본: 호스트명:pid:랜덤)")
+    ap.add_argument("--poll", type=float, default=1.0, help="큐가 비었을 때 재확인 간격(초)")
+    ap.add_argument("--threads", type=int, default=1, help="이 프로세스에서 동시에 처리할 작업 수")
+    ap.add_argument("--once", action="store_true", help="1건만 처리하고 종료")
+    args = ap.parse_args()
+
+    stop = threading.Event()
+
+    def _shutdown(*_):
+        logger.info("종료 신호 받음 - 진행 중인 작업만 끝내고 종료")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    base_id = args.id or default_worker_id()
+    n = max(1, args.threads)
+    threads = [
+        threading.Thread(
+            target=run_worker,
+            kwargs=dict(
+                worker_id=base_id if n == 1 else f"{base_id}/{i}",
+                poll_sec=args.poll,
+                once=args.once,
+                stop=stop,
+            ),
+            name=f"worker-{i}",
+        )
+        for i in range(n)
+    ]
+    for t in threads:
+        t.start()
+    # 메인 스레드는 신호를 받아야 하므로 짧게 끊어서 join
+    for t in threads:
+        while t.is_alive():
+            t.join(timeout=0.5)
+
+
+if __name__ == "__main__":
+    main()
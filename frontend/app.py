@@ -1,8 +1,77 @@
+import json
+import time
+
 import requests
 import streamlit as st
 
 API_BASE = "http://127.0.0.1:8000"
 
+# 진행 바에 보여줄 단계 이름
+STAGE_LABELS = {
+    "queued": "대기 중",
+    "waiting": "렌더 순서 대기 중",
+    "start": "시작",
+    "slideshow": "컷 렌더",
+    "preview": "미리보기 렌더",
+    "render": "최종 렌더",
+    "done": "완료",
+}
+
+
+def _progress_text(status: dict) -> str:
+    # "최종 렌더 · 42% · 38 fps · x1.9" (렌더 중이면 FFmpeg 속도까지)
+    stage = status.get("stage", "")
+    label = STAGE_LABELS.get(stage, stage)
+    parts = [label, f"{status.get('progress', 0.0) * 100:.0f}%"]
+    detail = status.get("detail") or {}
+    if detail.get("stage") == stage:
+        if detail.get("fps"):
+            parts.append(f"{detail['fps']:.0f} fps")
+        if detail.get("speed"):
+            parts.append(f"x{detail['speed']:.1f}")
+    return " · ".join(parts)
+
+
+def _show_status(status: dict, bar, preview_slot, shown: dict) -> None:
+    bar.progress(min(1.0, max(0.0, status.get("progress", 0.0))), text=_progress_text(status))
+    if status.get("preview_url") and not shown.get("preview"):
+        shown["preview"] = True
+        with preview_slot.container():
+            st.write("**미리보기:** (최종본 렌더 중)")
+            st.video(f"{API_BASE}{status['preview_url']}")
+
+
+def _watch_job(job_id: str, bar, preview_slot) -> dict:
+    # 진행 상황 스트림(SSE)을 끝날 때까지 읽고 마지막 상태 리턴
+    status, shown = {}, {}
+    with requests.get(f"{API_BASE}/api/jobs/{job_id}/events", stream=True, timeout=(10, 60)) as r:
+        r.raise_for_status()
+        for line in r.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue  # 빈 줄(이벤트 구분)/keepalive 주석
+            status = json.loads(line[len("data:"):])
+            _show_status(status, bar, preview_slot, shown)
+    return status
+
+
+def _poll_job(job_id: str, bar, preview_slot, timeout_sec: float = 600) -> dict:
+    # 스트림을 못 쓸 때: 2초마다 상태 조회
+    status, shown = {}, {}
+    deadline = time.time() + timeout_sec
+    while time.time() < deadline:
+        try:
+            r = requests.get(f"{API_BASE}/api/jobs/{job_id}", timeout=10)
+            r.raise_for_status()
+            status = r.json()
+        except Exception:
+            status = {}
+        _show_status(status, bar, preview_slot, shown)
+        if status.get("status") in ("done", "failed", "cancelled"):
+            break
+        time.sleep(2)
+    return status
+
+
 st.set_page_config(page_title="🍜 AI 유튜브 숏폼 광고영상 제작 프로그램", layout="centered")
 
 st.title("🍜 AI 유튜브 숏폼 광고 영상 프로그램")
@@ -26,6 +95,18 @@ with col2:
     benefit = st.text_input("혜택 예: 오픈이벤트/1+1/사이드 증정", value="")
     cta = st.text_input("방문/주문 유도 문구 예: 네이버예약 ㄱㄱ?", value="")
 
+preview = st.checkbox("⚡ 미리보기 먼저 보기 (저화질 미리보기 후 최종본 자동 렌더)", value=True)
+variants = st.multiselect(
+    "🅰️🅱️ 톤 A/B 테스트 (선택한 톤별 영상을 한 번에 생성, 미리보기는 생략)",
+    ["힙", "감성", "고급", "가성비"],
+    default=[],
+)
+aspects = st.multiselect(
+    "📐 추가 화면비 (9:16 기본 + 피드용 화면비를 한 번에 생성)",
+    ["1:1", "4:5", "16:9"],
+    default=[],
+)
+
 make_btn = st.button("🎬 영상 만들기", type="primary")
 
 if make_btn:
@@ -48,16 +129,40 @@ if make_btn:
         "location": location.strip() or "",
         "benefit": benefit.strip() or "",
         "cta": cta.strip() or "",
+        "preview": "true" if preview else "false",
+        "variants": ",".join(variants),
+        "aspects": ",".join(aspects),
     }
 
-    with st.spinner("영상 생성 중... (수 초~수십 초)"):
-        try:
-            r = requests.post(f"{API_BASE}/api/generate", files=files, data=data, timeout=600)
-            r.raise_for_status()
-            out = r.json()
-        except Exception as e:
-            st.error(f"요청 실패: {e}")
-            st.stop()
+    # 비동기 작업으로 제출 -> 진행 상황 스트림(SSE)으로 진행 바 갱신 -> 끝나면 결과 조회
+    try:
+        r = requests.post(f"{API_BASE}/api/jobs", files=files, data=data, timeout=60)
+        r.raise_for_status()
+        job_id = r.json()["job_id"]
+    except Exception as e:
+        st.error(f"요청 실패: {e}")
+        st.stop()
+
+    bar = st.progress(0.0, text="대기 중...")
+    preview_slot = st.empty()
+    try:
+        status = _watch_job(job_id, bar, preview_slot)
+    except Exception:
+        # 프록시 등으로 스트림이 안 되면 상태 폴링으로
+        status = _poll_job(job_id, bar, preview_slot)
+
+    if status.get("status") != "done":
+        st.error(f"영상 생성 실패: {status.get('error') or status.get('stage', '시간 초과')}")
+        st.stop()
+    bar.progress(1.0, text="완료")
+
+    try:
+        r = requests.get(f"{API_BASE}/api/jobs/{job_id}/result", timeout=10)
+        r.raise_for_status()
+        out = r.json()
+    except Exception as e:
+        st.error(f"결과 조회 실패: {e}")
+        st.stop()
 
     st.success("완료!")
     st.write("**생성 문구(내레이션/자막 동일):**")
@@ -66,6 +171,22 @@ if make_btn:
     st.write("**해시태그:**", " ".join(out.get("hashtags", [])))
 
     video_url = out.get("video_url")
+
     if video_url:
+        st.write("**최종 영상:**")
         st.video(f"{API_BASE}{video_url}")
         st.markdown(f"[결과 영상 열기]({API_BASE}{video_url})")
+    if out.get("hls_url"):
+        st.markdown(f"[HLS 스트리밍 (master.m3u8)]({API_BASE}{out['hls_url']})")
+
+    # 톤 변형 결과 (0번은 위의 최종 영상과 같음)
+    for v in out.get("variants", [])[1:]:
+        st.write(f"**톤 변형: {v.get('tone', '')}**")
+        st.text(v.get("caption_text", ""))
+        st.write("**해시태그:**", " ".join(v.get("hashtags", [])))
+        st.video(f"{API_BASE}{v['video_url']}")
+
+    # 추가 화면비 결과
+    for a in out.get("aspects", []):
+        st.write(f"**화면비 {a.get('aspect', '')}:**")
+        st.video(f"{API_BASE}{a['video_url']}")
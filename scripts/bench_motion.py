@@ -0,0 +1,60 @@
+"""
+모션 백엔드 벤치마크: FFmpeg zoompan vs OpenCV(warpAffine + rawvideo stdin)
+
+사용법 (프로젝트 루트에서)
+    python -m scripts.bench_motion path/to/photo.jpg [--cuts 4] [--repeat 2]
+
+- 같은 사진으로 컷 cuts개(프리셋 0~3 순환)를 두 백엔드로 각각 렌더해서 wall time 비교
+- video._render_segment를 직접 부르므로 세그먼트 캐시를 거치지 않음 (매번 실제 렌더 시간)
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from backend.app.core.config import settings
+from backend.app.services import video
+from backend.app.services.motion import load_canvas
+
+
+def _bench(backend: str, image: Path, cuts: int, repeat: int, out_dir: Path) -> float:
+    total = float(settings.VIDEO_SECONDS)
+    fps = 30
+    w, h = video._video_size()
+
+    best = float("inf")
+    for r in range(repeat):
+        t0 = time.perf_counter()
+        canvas = load_canvas(image, w, h) if backend == "opencv" else None
+        for i in range(cuts):
+            video._render_segment(
+                image, i, out_dir / f"{backend}_{r}_{i}.mp4",
+                total=total, fps=fps, n=settings.VIDEO_SEGMENTS, canvas=canvas,
+            )
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="zoompan vs opencv 모션 백엔드 비교")
+    ap.add_argument("image", type=Path)
+    ap.add_argument("--cuts", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=2)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        results = {b: _bench(b, args.image, args.cuts, args.repeat, out_dir) for b in ("zoompan", "opencv")}
+
+    per_cut = settings.VIDEO_SECONDS / settings.VIDEO_SEGMENTS
+    print(f"size={settings.VIDEO_SIZE} cuts={args.cuts} (컷당 {per_cut:.2f}s)")
+    for b, sec in results.items():
+        print(f"  {b:8s} {sec:7.2f}s  ({sec / args.cuts:.2f}s/컷)")
+    print(f"  speedup  x{results['zoompan'] / results['opencv']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+자막 PNG 캐시 회귀 테스트
+
+- 캐시 hit은 작업 폴더로 하드링크해서 꺼내므로, 같은 경로에 다른 문구를 그리면
+  캐시 파일(같은 inode)이 덮어써지던 문제 (재자막에서 caption_XX.png 재사용)
+"""
+
+from __future__ import annotations
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from backend.app.services import captions  # noqa: E402
+from backend.app.services.cache import DiskCache  # noqa: E402
+
+
+@pytest.fixture
+def caption_cache(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path / "cache", 64 * 1024 * 1024, suffix=".png")
+    monkeypatch.setattr(captions, "_caption_cache", cache)
+    return cache
+
+
+def _pixels(path):
+    with Image.open(path) as im:
+        return im.convert("RGBA").tobytes()
+
+
+def test_rerender_same_path_keeps_cached_bitmap(tmp_path, caption_cache):
+    out = tmp_path / "job" / "caption_00.png"
+
+    captions.render_caption("첫 번째 문구", out)
+    first = _pixels(out)
+
+    # 같은 자리(caption_00.png)에 다른 문구 -> 캐시 miss로 새로 그림
+    captions.render_caption("완전히 다른 두 번째 문구", out)
+    assert _pixels(out) != first
+
+    # 처음 문구는 다시 캐시 hit -> 처음 그림 그대로여야 함
+    captions.render_caption("첫 번째 문구", out)
+    assert _pixels(out) == first